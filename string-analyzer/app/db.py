@@ -1,7 +1,17 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.pool import QueuePool
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from anyio import CapacityLimiter, to_thread
+from app.utils.metrics import Gauge, db_queries, db_query_duration, record_stage, registry, stage
+import functools
 import os
+import sqlite3
+import threading
+import time
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -19,29 +29,306 @@ else:
     if DATABASE_URL.startswith("postgres://"):
         DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
-# Handle SQLite-specific connection arguments
-connect_args = {}
-if DATABASE_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
+# Optional hash-partitioned storage: comma-separated database URLs, one per
+# shard. Records are placed by shard_for(sha256_hash); only append new URLs,
+# then run python -m app.models.sharding --rebalance. Every shard must use
+# the same database type. Defaults to the single DATABASE_URL.
+DATABASE_SHARDS = [
+    url.strip().replace("postgres://", "postgresql://", 1)
+    for url in os.getenv("DATABASE_SHARDS", "").split(",") if url.strip()
+] or [DATABASE_URL]
 
-# Create SQLAlchemy engine
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+# Read-through cache for record lookups by hash (RECORD_CACHE_SIZE=0 disables it).
+# Set RECORD_CACHE_URL to a redis:// URL to share the cache between workers.
+RECORD_CACHE_SIZE = int(os.getenv("RECORD_CACHE_SIZE", "10000"))
+RECORD_CACHE_TTL = float(os.getenv("RECORD_CACHE_TTL", "300"))
+RECORD_CACHE_URL = os.getenv("RECORD_CACHE_URL")
 
-# Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Store new character frequency maps in the packed binary format instead of JSON
+COMPACT_FREQUENCY_MAPS = os.getenv("COMPACT_FREQUENCY_MAPS", "false").lower() in ("1", "true", "yes")
+
+# Connection pool settings (ignored for in-memory SQLite, which uses a single connection)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# Per-statement time limit in milliseconds (0 disables it). PostgreSQL cancels
+# longer statements; SQLite waits this long for a locked database.
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+
+# Apply pending migrations when a worker starts. Off by default: run
+# python -m app.models.migrations once per deploy, and workers only check
+# the schema version at startup.
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "false").lower() in ("1", "true", "yes")
+
+# Pragmas applied to every SQLite connection. WAL lets readers run alongside
+# the single writer, and synchronous=NORMAL is durable under WAL.
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "cache_size": os.getenv("SQLITE_CACHE_SIZE", "-20000"),
+    "temp_store": "MEMORY",
+    "busy_timeout": str(DB_STATEMENT_TIMEOUT_MS),
+}
+
+# Functions registered on every SQLite connection. unicode_lower is str.lower,
+# since SQLite's own lower() only folds ASCII letters.
+SQLITE_FUNCTIONS = {
+    "unicode_lower": lambda value: value.lower() if isinstance(value, str) else value,
+}
+
+class PoolMetrics:
+    """Thread-safe counters for connection pool checkouts and wait times"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+    
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        """Record the time one caller waited for a pooled connection"""
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+    
+    def increment(self, name: str) -> None:
+        """Increment the connects, checkouts or checkins counter"""
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Current counters plus the live occupancy summed over the pools created so far"""
+        pools = [shard_engine.pool for shard_engine in engines.created()]
+        with self._lock:
+            stats = {
+                "pool_class": type(pools[0]).__name__ if pools else None,
+                "shards": len(engines),
+                "pools_created": len(pools),
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "wait_seconds_avg": round(self.wait_seconds_total / self.checkouts, 6) if self.checkouts else 0.0,
+            }
+        if all(isinstance(pool, QueuePool) for pool in pools):
+            stats.update({
+                "size": sum(pool.size() for pool in pools),
+                "checked_out": sum(pool.checkedout() for pool in pools),
+                "idle": sum(pool.checkedin() for pool in pools),
+                "overflow": sum(pool.overflow() for pool in pools),
+            })
+        return stats
+
+pool_metrics = PoolMetrics()
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection"""
+    
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        waited = time.perf_counter() - start
+        pool_metrics.record_wait(waited)
+        record_stage("pool_wait", waited)
+        return connection
+
+def _engine_options(url: str) -> Dict[str, Any]:
+    """create_engine arguments for one database: driver connect_args and pool settings"""
+    options: Dict[str, Any] = {}
+    is_sqlite = url.startswith("sqlite")
+    if is_sqlite:
+        options["connect_args"] = {"check_same_thread": False, "timeout": DB_STATEMENT_TIMEOUT_MS / 1000}
+    elif url.startswith("postgresql") and DB_STATEMENT_TIMEOUT_MS:
+        options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    
+    if not (is_sqlite and (":memory:" in url or url.rstrip("/") == "sqlite:")):
+        options.update({
+            "poolclass": MeteredQueuePool,
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "pool_timeout": DB_POOL_TIMEOUT,
+            "pool_recycle": DB_POOL_RECYCLE,
+            "pool_pre_ping": DB_POOL_PRE_PING,
+        })
+    return options
+
+def _on_connect(dbapi_connection, connection_record):
+    """Count new connections and apply SQLite pragmas and functions to each one"""
+    pool_metrics.increment("connects")
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+        for name, function in SQLITE_FUNCTIONS.items():
+            dbapi_connection.create_function(name, 1, function, deterministic=True)
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    pool_metrics.increment("checkouts")
+
+def _on_checkin(dbapi_connection, connection_record):
+    pool_metrics.increment("checkins")
+
+def _before_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+    connection.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+    """Count each statement and time it, globally and for the current request"""
+    elapsed = time.perf_counter() - connection.info["query_start"].pop()
+    kind = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+    db_queries.inc(statement=kind)
+    db_query_duration.observe(elapsed, statement=kind)
+    record_stage("sql", elapsed)
+
+def _create_engine(url: str) -> Engine:
+    """Create an engine with the pool settings and metering listeners"""
+    shard_engine = create_engine(url, **_engine_options(url))
+    event.listen(shard_engine, "connect", _on_connect)
+    event.listen(shard_engine, "checkout", _on_checkout)
+    event.listen(shard_engine, "checkin", _on_checkin)
+    event.listen(shard_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(shard_engine, "after_cursor_execute", _after_cursor_execute)
+    return shard_engine
+
+class _LazyShards(Sequence):
+    """
+    One object per shard, each created on first use
+
+    Importing the application therefore creates no engine and imports no
+    database driver, and a worker only opens pools for the shards it uses.
+    """
+    
+    def __init__(self, factory: Callable[[int], Any]):
+        self._factory = factory
+        self._items: List[Any] = [None] * len(DATABASE_SHARDS)
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._items)
+    
+    def __getitem__(self, shard: int) -> Any:
+        item = self._items[shard]
+        if item is None:
+            with self._lock:
+                item = self._items[shard]
+                if item is None:
+                    item = self._items[shard] = self._factory(shard)
+        return item
+    
+    def created(self) -> List[Any]:
+        """Objects created so far, without creating the others"""
+        return [item for item in self._items if item is not None]
+
+# One engine per shard, created on first use; shard 0 is also the default engine
+engines: _LazyShards = _LazyShards(lambda shard: _create_engine(DATABASE_SHARDS[shard]))
+SHARD_COUNT = len(DATABASE_SHARDS)
+
+def shard_for(hash_value: str) -> int:
+    """
+    Shard that stores the record with this SHA-256 hash
+    
+    Uses jump consistent hashing on the first 64 bits of the hash, so
+    appending a shard to DATABASE_SHARDS moves only about 1/N of the
+    records, all of them onto the new shard.
+    
+    Args:
+        hash_value: Hex SHA-256 hash of the string
+        
+    Returns:
+        int: Index into DATABASE_SHARDS
+    """
+    if SHARD_COUNT == 1:
+        return 0
+    key = int(hash_value[:16], 16)
+    bucket, candidate = -1, 0
+    while candidate < SHARD_COUNT:
+        bucket = candidate
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        candidate = int((bucket + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return bucket
+
+def _checked_out() -> Optional[int]:
+    """Connections checked out across every shard's pool"""
+    pools = [shard_engine.pool for shard_engine in engines.created() if isinstance(shard_engine.pool, QueuePool)]
+    return sum(pool.checkedout() for pool in pools) if pools else None
+
+registry.register(Gauge(
+    "db_pool_checked_out", "Connections currently checked out of the pool",
+    _checked_out
+))
+registry.register(Gauge(
+    "db_pool_wait_seconds_total", "Total time spent waiting for pooled connections",
+    lambda: pool_metrics.wait_seconds_total
+))
+registry.register(Gauge(
+    "db_pool_timeouts", "Checkouts that timed out waiting for a connection",
+    lambda: pool_metrics.timeouts
+))
+
+# Create a session factory per shard; SessionLocal opens shard 0. Objects keep
+# their loaded state after commit, so building a response does not check out
+# another connection to reload them.
+shard_sessions: _LazyShards = _LazyShards(lambda shard: sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engines[shard]
+))
+
+def __getattr__(name: str) -> Any:
+    """engine and SessionLocal (shard 0) are created on first access, like the others"""
+    if name == "engine":
+        return engines[0]
+    if name == "SessionLocal":
+        return shard_sessions[0]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Create Base class
 Base = declarative_base()
 
+# Number of worker threads allowed to run blocking database calls at once.
+# Defaults to one shard's pool capacity, so threads never queue on the pool
+# itself; queries that fan out to every shard use their own threads.
+DB_THREADPOOL_SIZE = int(os.getenv("DB_THREADPOOL_SIZE", str(DB_POOL_SIZE + DB_MAX_OVERFLOW)))
+
+_db_limiter: Optional[CapacityLimiter] = None
+
+async def run_db(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a blocking database function in a bounded worker thread pool.
+    Keeps async route handlers from stalling the event loop.
+    Usage:
+        record = await run_db(get_string_by_hash, hash_value)
+    """
+    global _db_limiter
+    if _db_limiter is None:
+        _db_limiter = CapacityLimiter(DB_THREADPOOL_SIZE)
+    # Timed as a request stage named after the function, e.g. get_string_by_hash
+    with stage(func.__name__):
+        return await to_thread.run_sync(functools.partial(func, *args, **kwargs), limiter=_db_limiter)
+
 def get_db():
     """
-    Dependency function to get database session.
+    Dependency function to get a request-scoped database session.
+    Pass it to the app.models.database functions so a request's lookups
+    and writes share one session and one pooled connection.
     Usage with FastAPI:
         @app.get("/")
-        def read_items(db: Session = Depends(get_db)):
-            ...
+        async def read_items(db: Session = Depends(get_db)):
+            return await run_db(get_all_strings, db=db)
     """
-    db = SessionLocal()
+    db = shard_sessions[0]()
     try:
         yield db
     finally:
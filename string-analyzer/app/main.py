@@ -1,35 +1,91 @@
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
 from app.routes.string_routes import router
+from app.db import AUTO_MIGRATE
 from app.models.database import init_db
+from app.models.migrations import check_schema
+from app.utils import ingest, metrics, profiling
+from app.utils.executor import shutdown_pool
+from app.utils.responses import FastJSONResponse
+from app.utils.static_assets import PrecompressedStaticFiles
 import os
+import time
 
 # Initialize FastAPI application
 app = FastAPI(
     title="String Analyzer API",
     description="An API for analyzing strings and performing various string operations",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # Get the directory where this file is located
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 STATIC_DIR = os.path.join(BASE_DIR, "static")
 
-# Mount static files
-app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
+# Mount static files, served from memory under content-hashed names
+static_files = PrecompressedStaticFiles(directory=STATIC_DIR, url_prefix="/static")
+app.mount("/static", static_files, name="static")
 
-# Initialize database tables on startup
+# Check the database schema on startup (static assets are built on first use)
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database tables when the application starts"""
-    init_db()
+    """Check (or, with AUTO_MIGRATE, migrate) the schema and start the write-behind writer if enabled"""
+    if AUTO_MIGRATE:
+        init_db()
+    else:
+        check_schema()
+    if ingest.WRITE_BEHIND:
+        ingest.start()
+
+# Flush queued records and stop analysis worker processes on shutdown
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Write every queued record, then shut down the analysis process pool"""
+    await ingest.stop()
+    shutdown_pool()
+
+# Per-request stage timings, Server-Timing header, metrics and sampled profiling
+@app.middleware("http")
+async def timing_middleware(request: Request, call_next):
+    """
+    Time each request by stage (analysis, database calls, SQL, pool wait,
+    serialization), report the breakdown in a Server-Timing header and
+    record it in the /metrics histograms.
+    """
+    timing = metrics.RequestTiming()
+    token = metrics.current_timing.set(timing)
+    profiler = profiling.start()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        metrics.current_timing.reset(token)
+        total = time.perf_counter() - timing.start
+        
+        # Label by route template, not raw path, to bound label cardinality
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        profiling.finish(profiler, total, f"{request.method} {route}")
+        metrics.http_requests.inc(method=request.method, route=route, status=status_code)
+        metrics.http_request_duration.observe(total, method=request.method, route=route)
+        for stage, (seconds, _) in timing.stages.items():
+            metrics.stage_duration.observe(seconds, route=route, stage=stage)
+    
+    response.headers["Server-Timing"] = timing.server_timing(total)
+    return response
+
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Expose request, stage, SQL and pool metrics in the Prometheus text format"""
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
 
 # Root route - serve the main HTML page
 @app.get("/")
-async def read_root():
-    """Serve the main web interface"""
-    return FileResponse(os.path.join(STATIC_DIR, "index.html"))
+async def read_root(request: Request):
+    """Serve the main web interface (revalidated on every visit; its assets are cached for good)"""
+    return await static_files.get_response("index.html", request.scope)
 
 # Include the string routes
 app.include_router(router, prefix="/api/v1")
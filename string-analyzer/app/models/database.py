@@ -1,10 +1,48 @@
-from sqlalchemy import Column, String, Text, Integer, Boolean, DateTime, JSON, and_, or_
+from sqlalchemy import Column, String, Text, Integer, BigInteger, Boolean, DateTime, JSON, LargeBinary, ForeignKey, Index, and_, or_, delete, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, defer
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.sql import func
-from typing import Dict, Any, Optional, List
-from app.db import Base, SessionLocal, engine
+from typing import Dict, Any, Callable, Optional, List, Iterable, Iterator, Mapping, Tuple, TypeVar
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import copy_context
+from datetime import datetime
+from app.db import Base, SHARD_COUNT, engines, shard_for, shard_sessions, COMPACT_FREQUENCY_MAPS, RECORD_CACHE_SIZE, RECORD_CACHE_TTL, RECORD_CACHE_URL
+from app.utils.cache import create_cache
+from app.utils.frequency_codec import decode_frequency_map, encode_frequency_map
+from app.utils import similarity
+from app.models import search
 from fastapi import HTTPException, status
+import base64
+import heapq
+import io
+import json
 import uuid
 
+# Maximum number of hashes per IN (...) lookup, kept below SQLite's bound-parameter limit
+HASH_LOOKUP_CHUNK_SIZE = 500
+
+# Rows fetched per round trip when streaming results
+STREAM_BATCH_SIZE = 500
+
+# Character filters matching fewer records than this are resolved by record ID
+SELECTIVE_CHARACTER_LIMIT = 5000
+
+# Most LSH candidates re-ranked by exact similarity per similarity query
+SIMILAR_CANDIDATE_LIMIT = 1000
+
+# Bulk inserts of at least this many rows bypass per-row statement handling
+# (COPY on PostgreSQL, a raw executemany on SQLite)
+BULK_INSERT_MIN_ROWS = 1000
+
+# SQLite stores server_default=func.now() as "YYYY-MM-DD HH:MM:SS"; bind datetimes
+# in the same format so keyset comparisons on created_at match stored values
+SQLiteTimestamp = sqlite.DATETIME(
+    storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+)
+
 class StringRecord(Base):
     """SQLAlchemy model for string records"""
     __tablename__ = "string_records"
@@ -15,73 +53,771 @@ class StringRecord(Base):
     is_palindrome = Column(Boolean, nullable=False)
     unique_characters = Column(Integer, nullable=False)
     word_count = Column(Integer, nullable=False)
+    # JSON map, or JSON null when the packed form below is used
     character_frequency_map = Column(JSON, nullable=False)
+    character_frequency_blob = Column(LargeBinary, nullable=True)
     sha256_hash = Column(String(64), unique=True, index=True, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    created_at = Column(
+        DateTime(timezone=True).with_variant(SQLiteTimestamp, "sqlite"),
+        server_default=func.now(),
+        nullable=False
+    )
+
+    @property
+    def frequency_map(self) -> Dict[str, int]:
+        """Character frequency map, decoded from whichever column holds it"""
+        if self.character_frequency_blob is not None:
+            return decode_frequency_map(self.character_frequency_blob)
+        return self.character_frequency_map
+
+    # Secondary indexes for the list filters. Equality filters lead and the
+    # keyset columns follow, so a filtered page is read in order and stops
+    # at the limit instead of sorting every match. Existing databases
+    # receive these through app.models.migrations.
+    __table_args__ = (
+        Index("ix_string_records_created_at_id", "created_at", "id"),
+        Index("ix_string_records_is_palindrome_created_at_id", "is_palindrome", "created_at", "id"),
+        Index("ix_string_records_word_count_created_at_id", "word_count", "created_at", "id"),
+    )
+
+class StringCharacter(Base):
+    """Inverted index from each character to the records containing it"""
+    __tablename__ = "string_characters"
+
+    record_id = Column(String(36), ForeignKey("string_records.id", ondelete="CASCADE"), primary_key=True)
+    character = Column(String(8), primary_key=True)
+    count = Column(Integer, nullable=False)
+
+    # Covers character lookups, minimum-count ranges and the record_id join
+    __table_args__ = (
+        Index("ix_string_characters_character_count", "character", "count", "record_id"),
+    )
+
+class StringStat(Base):
+    """Corpus-wide counters, kept in step with string_records on every write"""
+    __tablename__ = "string_stats"
+
+    # kind is one of STAT_KINDS; key is the bucket within it
+    kind = Column(String(16), primary_key=True)
+    key = Column(String(16), primary_key=True)
+    value = Column(Integer, nullable=False)
+
+class StringSimilarityBucket(Base):
+    """MinHash LSH bucket of each record per band, for near-duplicate lookups"""
+    __tablename__ = "string_similarity_buckets"
+
+    record_id = Column(String(36), ForeignKey("string_records.id", ondelete="CASCADE"), primary_key=True)
+    band = Column(Integer, primary_key=True)
+    bucket = Column(BigInteger, nullable=False)
+
+    # Candidate lookup: every record sharing a (band, bucket) pair
+    __table_args__ = (
+        Index("ix_string_similarity_buckets_band_bucket", "band", "bucket", "record_id"),
+    )
+
+# Counter kinds stored in string_stats: corpus totals ("strings",
+# "palindromes", "characters"), records per length bucket, records per
+# word count, total occurrences per character, and the records version
+STAT_KINDS = ("total", "length", "word_count", "character", "version")
+
+# Counter bumped by every record insert and delete, never decremented or
+# rebuilt, so list responses can be versioned without reading records
+VERSION_COUNTER = ("version", "records")
+
+# Read-through cache of record columns, keyed by sha256_hash
+record_cache = create_cache(RECORD_CACHE_SIZE, RECORD_CACHE_TTL, RECORD_CACHE_URL)
+
+@contextmanager
+def _session(db: Optional[Session] = None, shard: int = 0) -> Iterator[Session]:
+    """
+    Use the caller's request-scoped session if it is bound to the shard,
+    or open one on that shard for this call only
+    """
+    if db is not None and (SHARD_COUNT == 1 or db.get_bind() is engines[shard]):
+        yield db
+        return
+    db = shard_sessions[shard]()
+    try:
+        yield db
+    finally:
+        db.close()
+
+T = TypeVar("T")
+
+# Threads that run one query per shard when a read fans out
+_fanout_pool: Optional[ThreadPoolExecutor] = None
+
+def _each_shard(db: Optional[Session], work: Callable[[Session], T]) -> List[T]:
+    """
+    Run work against every shard and return the results in shard order
+    
+    With several shards the calls run in parallel, each in its own session
+    (the request-scoped one for shard 0) and with the caller's context, so
+    their SQL time still counts toward the request's stage timings.
+    """
+    global _fanout_pool
+    if SHARD_COUNT == 1:
+        with _session(db) as session:
+            return [work(session)]
+    
+    if _fanout_pool is None:
+        _fanout_pool = ThreadPoolExecutor(max_workers=4 * SHARD_COUNT, thread_name_prefix="shard-fanout")
+    
+    def run(shard: int) -> T:
+        with _session(db, shard) as session:
+            return work(session)
+    
+    futures = [_fanout_pool.submit(copy_context().run, run, shard) for shard in range(SHARD_COUNT)]
+    return [future.result() for future in futures]
+
+def frequency_columns(character_frequency_map: Dict[str, int], compact: bool = COMPACT_FREQUENCY_MAPS) -> Dict[str, Any]:
+    """
+    Column values storing a frequency map in the configured format
+    
+    Args:
+        character_frequency_map: Lowercased character counts
+        compact: Store the packed binary form instead of JSON
+        
+    Returns:
+        Dict[str, Any]: character_frequency_map and character_frequency_blob values
+    """
+    if compact:
+        return {
+            "character_frequency_map": None,
+            "character_frequency_blob": encode_frequency_map(character_frequency_map)
+        }
+    return {"character_frequency_map": character_frequency_map, "character_frequency_blob": None}
+
+# Columns loaded for each response field; other columns can be deferred
+FIELD_COLUMNS = {
+    "value": [StringRecord.value],
+    "length": [StringRecord.length],
+    "is_palindrome": [StringRecord.is_palindrome],
+    "unique_characters": [StringRecord.unique_characters],
+    "word_count": [StringRecord.word_count],
+    "character_frequency_map": [StringRecord.character_frequency_map, StringRecord.character_frequency_blob],
+    "sha256_hash": [StringRecord.sha256_hash],
+}
+
+def row_frequency_map(row: Mapping[str, Any]) -> Dict[str, int]:
+    """Frequency map of a record's column values, decoded from whichever column holds it"""
+    blob = row.get("character_frequency_blob")
+    if blob is not None:
+        return decode_frequency_map(blob)
+    return row["character_frequency_map"]
+
+def _projection_options(fields: Optional[Iterable[str]]) -> list:
+    """Loader options deferring every column not needed for the requested fields"""
+    if fields is None:
+        return []
+    return [
+        defer(column)
+        for field, columns in FIELD_COLUMNS.items() if field not in fields
+        for column in columns
+    ]
+
+def _row_columns(fields: Optional[Iterable[str]]) -> list:
+    """Table columns to select for the requested fields, always including the keyset columns"""
+    columns = StringRecord.__table__.c
+    if fields is None:
+        return list(columns)
+    needed = {"id", "created_at"}
+    for field in fields:
+        needed.update(attribute.key for attribute in FIELD_COLUMNS.get(field, []))
+    return [column for column in columns if column.key in needed]
+
+def _record_columns(record: StringRecord) -> Dict[str, Any]:
+    """Column values of a record, as stored in the record cache"""
+    return {column.key: getattr(record, column.key) for column in StringRecord.__table__.columns}
+
+def character_rows(record_id: str, character_frequency_map: Dict[str, int]) -> List[Dict[str, Any]]:
+    """
+    Build StringCharacter rows from a record's character frequency map
+    
+    Args:
+        record_id: ID of the owning StringRecord
+        character_frequency_map: Lowercased character counts
+        
+    Returns:
+        List[Dict[str, Any]]: Rows ready for a bulk insert
+    """
+    return [
+        {"record_id": record_id, "character": character, "count": count}
+        for character, count in character_frequency_map.items()
+    ]
+
+def similarity_rows(record_id: str, value: str) -> List[Dict[str, Any]]:
+    """
+    Build StringSimilarityBucket rows from a record's value
+    
+    Args:
+        record_id: ID of the owning StringRecord
+        value: The stored string
+        
+    Returns:
+        List[Dict[str, Any]]: One row per LSH band, ready for a bulk insert
+    """
+    return [
+        {"record_id": record_id, "band": band, "bucket": bucket}
+        for band, bucket in similarity.lsh_buckets(similarity.minhash_signature(value))
+    ]
+
+def length_bucket(length: int) -> int:
+    """Lower bound of the power-of-two length histogram bucket holding length"""
+    return 1 << (length.bit_length() - 1) if length else 0
+
+def stat_deltas(analysis: Dict[str, Any], sign: int = 1) -> Counter:
+    """
+    Counter changes for adding (sign=1) or removing (sign=-1) one record
+    
+    Either way the VERSION_COUNTER goes up by one.
+    
+    Args:
+        analysis: Dictionary with length, is_palindrome, word_count and
+            character_frequency_map
+        sign: 1 when the record is added, -1 when it is removed
+        
+    Returns:
+        Counter: Delta per (kind, key) string_stats row
+    """
+    deltas = Counter({
+        ("total", "strings"): sign,
+        ("total", "palindromes"): sign if analysis["is_palindrome"] else 0,
+        ("total", "characters"): sign * analysis["length"],
+        ("length", str(length_bucket(analysis["length"]))): sign,
+        ("word_count", str(analysis["word_count"])): sign,
+        VERSION_COUNTER: 1,
+    })
+    for character, count in analysis["character_frequency_map"].items():
+        deltas[("character", character)] += sign * count
+    return deltas
+
+def _upsert_insert(dialect: str) -> Callable[..., Any]:
+    """insert() construct with ON CONFLICT support for SQLite or PostgreSQL"""
+    if dialect == "sqlite":
+        return sqlite.insert
+    # Imported on first use so SQLite deployments never load the PostgreSQL dialect
+    from sqlalchemy.dialects import postgresql
+    return postgresql.insert
+
+def apply_stat_deltas(db, deltas: Counter) -> None:
+    """
+    Add deltas to the string_stats counters inside the caller's transaction
+    
+    SQLite and PostgreSQL use a single INSERT ... ON CONFLICT DO UPDATE;
+    other databases fall back to an UPDATE per counter, inserting when
+    the counter does not exist yet.
+    """
+    table = StringStat.__table__
+    rows = [{"kind": kind, "key": key, "value": value} for (kind, key), value in deltas.items() if value]
+    if not rows:
+        return
+    
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        statement = _upsert_insert(dialect)(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.kind, table.c.key],
+            set_={"value": table.c.value + statement.excluded.value}
+        )
+        db.execute(statement, rows)
+        return
+    
+    for row in rows:
+        updated = db.execute(
+            table.update()
+            .where(table.c.kind == row["kind"], table.c.key == row["key"])
+            .values(value=table.c.value + row["value"])
+        )
+        if updated.rowcount == 0:
+            db.execute(table.insert().values(**row))
+
+# Characters escaped with a backslash in PostgreSQL's COPY text format
+COPY_TEXT_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+def _copy_value(column, value) -> str:
+    """Encode one value as a field of PostgreSQL's COPY text format (\\N is NULL)"""
+    if isinstance(column.type, JSON):
+        value = json.dumps(value)
+    elif value is None:
+        return "\\N"
+    elif isinstance(value, bool):
+        value = "t" if value else "f"
+    elif isinstance(value, bytes):
+        value = "\\x" + value.hex()
+    elif isinstance(value, datetime):
+        value = value.isoformat()
+    return str(value).translate(COPY_TEXT_ESCAPES)
+
+def _copy_text(columns, rows: List[Dict[str, Any]]) -> io.StringIO:
+    """COPY FROM STDIN input for rows: one tab-separated line per row"""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_copy_value(column, row[column.key]) for column in columns))
+        buffer.write("\n")
+    buffer.seek(0)
+    return buffer
+
+def _bulk_insert(db: Session, table, rows: List[Dict[str, Any]]) -> None:
+    """
+    Insert rows with the same keys inside the caller's transaction
+    
+    Large batches skip SQLAlchemy's per-row parameter handling: PostgreSQL
+    (psycopg2) streams them with COPY FROM STDIN and SQLite receives the
+    row dicts in one DBAPI executemany. Anything else is a regular
+    executemany INSERT.
+    """
+    if not rows:
+        return
+    
+    bind = db.get_bind()
+    dialect = bind.dialect
+    if len(rows) < BULK_INSERT_MIN_ROWS or dialect.name not in ("postgresql", "sqlite"):
+        db.execute(insert(table), rows)
+        return
+    
+    columns = [table.c[key] for key in rows[0]]
+    connection = db.connection()
+    
+    quote = dialect.identifier_preparer.quote
+    names = ", ".join(quote(column.name) for column in columns)
+    
+    if dialect.name == "sqlite":
+        # sqlite3 binds :name placeholders from the row dicts; only columns
+        # whose type converts values (JSON, timestamps) are copied
+        processors = {}
+        for column in columns:
+            process = column.type.dialect_impl(dialect).bind_processor(dialect)
+            if process is not None:
+                processors[column.key] = process
+        if processors:
+            rows = [{**row, **{key: process(row[key]) for key, process in processors.items()}} for row in rows]
+        placeholders = ", ".join(f":{column.key}" for column in columns)
+        connection.exec_driver_sql(f"INSERT INTO {quote(table.name)} ({names}) VALUES ({placeholders})", rows)
+        return
+    
+    cursor = connection.connection.cursor()
+    try:
+        if not hasattr(cursor, "copy_expert"):
+            db.execute(insert(table), rows)
+            return
+        
+        # Text format, where \N is NULL (in CSV format a quoted empty field is an empty value)
+        cursor.copy_expert(
+            f"COPY {quote(table.name)} ({names}) FROM STDIN WITH (FORMAT text)", _copy_text(columns, rows)
+        )
+    finally:
+        cursor.close()
 
-def add_string(analysis: Dict[str, Any]) -> StringRecord:
+def add_string(analysis: Dict[str, Any], db: Optional[Session] = None) -> Optional[StringRecord]:
     """
-    Add a new string record to the database
+    Add a new string record to the database unless its hash is already stored
+    
+    The duplicate check and the insert are one statement (INSERT ... ON
+    CONFLICT DO NOTHING RETURNING on SQLite and PostgreSQL), so concurrent
+    submissions of the same string create exactly one record. Other
+    databases insert inside a savepoint and treat a unique-constraint
+    violation as a duplicate.
     
     Args:
         analysis: Dictionary containing string analysis results
+        db: Request-scoped session (a new one is opened when omitted)
         
     Returns:
-        StringRecord: Created database record
+        Optional[StringRecord]: Created record, or None if the hash already exists
         
     Raises:
         HTTPException: If database operation fails
     """
-    try:
-        db = SessionLocal()
-        
-        # Create new record
-        new_record = StringRecord(
-            id=str(uuid.uuid4()),
-            value=analysis["text"],
-            length=analysis["length"],
-            is_palindrome=analysis["is_palindrome"],
-            unique_characters=analysis["unique_characters"],
-            word_count=analysis["word_count"],
-            character_frequency_map=analysis["character_frequency_map"],
-            sha256_hash=analysis["sha256_hash"]
-        )
+    table = StringRecord.__table__
+    row = {
+        "id": str(uuid.uuid4()),
+        "value": analysis["text"],
+        "length": analysis["length"],
+        "is_palindrome": analysis["is_palindrome"],
+        "unique_characters": analysis["unique_characters"],
+        "word_count": analysis["word_count"],
+        "sha256_hash": analysis["sha256_hash"],
+        **frequency_columns(analysis["character_frequency_map"])
+    }
+    
+    with _session(db, shard_for(row["sha256_hash"])) as db:
+        try:
+            # Insert the record, skipping it if the hash is already stored
+            dialect = db.get_bind().dialect.name
+            if dialect in ("sqlite", "postgresql"):
+                statement = (
+                    _upsert_insert(dialect)(table)
+                    .values(**row)
+                    .on_conflict_do_nothing(index_elements=[table.c.sha256_hash])
+                    .returning(table.c.created_at)
+                )
+                created_at = db.execute(statement).scalar()
+            else:
+                try:
+                    with db.begin_nested():
+                        created_at = db.execute(table.insert().values(**row).returning(table.c.created_at)).scalar()
+                except IntegrityError:
+                    created_at = None
+            
+            if created_at is None:
+                db.rollback()
+                return None
+            
+            # Add its character, similarity and search index rows and counter updates, then commit
+            db.execute(insert(StringCharacter), character_rows(row["id"], analysis["character_frequency_map"]))
+            db.execute(insert(StringSimilarityBucket), similarity_rows(row["id"], row["value"]))
+            search.index_values(db, [(row["id"], row["value"])])
+            apply_stat_deltas(db, stat_deltas(analysis))
+            db.commit()
+            
+            return StringRecord(created_at=created_at, **row)
+            
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to add string record: {str(e)}"
+            )
+
+def add_strings_bulk(analyses: List[Dict[str, Any]], db: Optional[Session] = None) -> List[Dict[str, Any]]:
+    """
+    Add many string records to the database in a single transaction per shard
+    
+    Existing hashes are fetched with chunked IN (...) lookups, and all new
+    rows are written with one bulk INSERT (see _bulk_insert) before a
+    single commit. Repeated values inside the batch
+    are reported as duplicates of the first one. With several shards each
+    shard's records are committed separately, so a failure can leave the
+    records of earlier shards stored.
+    
+    Args:
+        analyses: List of dictionaries containing string analysis results.
+            Imports may also set "id" and "created_at" to keep a record's
+            original values; set created_at on all analyses or on none.
+        db: Request-scoped session (a new one is opened when omitted)
         
-        # Add and commit
-        db.add(new_record)
-        db.commit()
-        db.refresh(new_record)
+    Returns:
+        List[Dict[str, Any]]: One entry per input with "status" ("created"
+        or "duplicate"), "sha256_hash" and, for created rows, "id"
         
-        return new_record
+    Raises:
+        HTTPException: If database operation fails
+    """
+    # Group the inputs by shard, remembering their positions
+    positions: Dict[int, List[int]] = {}
+    for index, analysis in enumerate(analyses):
+        positions.setdefault(shard_for(analysis["sha256_hash"]), []).append(index)
+    
+    results: List[Dict[str, Any]] = [None] * len(analyses)
+    for shard, indexes in positions.items():
+        shard_results = _add_strings_to_shard([analyses[index] for index in indexes], shard, db)
+        for index, result in zip(indexes, shard_results):
+            results[index] = result
+    return results
+
+def _add_strings_to_shard(analyses: List[Dict[str, Any]], shard: int, db: Optional[Session] = None) -> List[Dict[str, Any]]:
+    """Add string records that all belong to one shard in a single transaction (see add_strings_bulk)"""
+    with _session(db, shard) as db:
+        try:
+            # Look up every distinct hash that is already stored
+            hashes = list({analysis["sha256_hash"] for analysis in analyses})
+            existing = set()
+            for start in range(0, len(hashes), HASH_LOOKUP_CHUNK_SIZE):
+                chunk = hashes[start:start + HASH_LOOKUP_CHUNK_SIZE]
+                existing.update(
+                    db.scalars(select(StringRecord.sha256_hash).where(StringRecord.sha256_hash.in_(chunk)))
+                )
+            
+            # Build rows for new hashes only
+            results = []
+            rows = []
+            index_rows = []
+            bucket_rows = []
+            deltas = Counter()
+            for analysis in analyses:
+                hash_value = analysis["sha256_hash"]
+                if hash_value in existing:
+                    results.append({"status": "duplicate", "sha256_hash": hash_value})
+                    continue
+            
+                existing.add(hash_value)
+                record_id = analysis.get("id") or str(uuid.uuid4())
+                row = {
+                    "id": record_id,
+                    "value": analysis["text"],
+                    "length": analysis["length"],
+                    "is_palindrome": analysis["is_palindrome"],
+                    "unique_characters": analysis["unique_characters"],
+                    "word_count": analysis["word_count"],
+                    "sha256_hash": hash_value,
+                    **frequency_columns(analysis["character_frequency_map"])
+                }
+                if "created_at" in analysis:
+                    row["created_at"] = analysis["created_at"]
+                rows.append(row)
+                index_rows.extend(character_rows(record_id, analysis["character_frequency_map"]))
+                bucket_rows.extend(similarity_rows(record_id, analysis["text"]))
+                deltas.update(stat_deltas(analysis))
+                results.append({"status": "created", "sha256_hash": hash_value, "id": record_id})
+            
+            # Insert records, their index rows and counter updates, then commit once
+            if rows:
+                _bulk_insert(db, StringRecord.__table__, rows)
+                _bulk_insert(db, StringCharacter.__table__, index_rows)
+                _bulk_insert(db, StringSimilarityBucket.__table__, bucket_rows)
+                search.index_values(db, ((row["id"], row["value"]) for row in rows))
+                apply_stat_deltas(db, deltas)
+            db.commit()
+            
+            return results
+            
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to add string records: {str(e)}"
+            )
+
+def get_record_columns(hash_value: str, db: Optional[Session] = None) -> Optional[Dict[str, Any]]:
+    """
+    Retrieve the column values of a string record by its SHA-256 hash
+
+    Lookups go through record_cache first. Misses select the row with a
+    Core query, so no ORM instance is built on either path. Only stored
+    rows are cached, so inserts leave the cache alone and only
+    delete_string invalidates it.
+
+    Args:
+        hash_value: SHA-256 hash of the string
+        db: Request-scoped session (a new one is opened when omitted)
+
+    Returns:
+        Optional[Dict[str, Any]]: Column values keyed by column name, or None
+    """
+    cached = record_cache.get(hash_value)
+    if cached is not None:
+        return cached
+    
+    version = record_cache.version(hash_value)
+    table = StringRecord.__table__
+    with _session(db, shard_for(hash_value)) as db:
+        row = db.execute(select(*table.c).where(table.c.sha256_hash == hash_value)).mappings().first()
+        if row is None:
+            return None
+        columns = dict(row)
+        record_cache.set(hash_value, columns, version)
+        return columns
+
+def get_string_by_hash(hash_value: str, db: Optional[Session] = None) -> Optional[StringRecord]:
+    """
+    Retrieve a string record by its SHA-256 hash
+
+    Returns a detached StringRecord built from get_record_columns, which
+    serves it from record_cache when possible.
+
+    Args:
+        hash_value: SHA-256 hash of the string
+        db: Request-scoped session (a new one is opened when omitted)
+
+    Returns:
+        Optional[StringRecord]: Found record or None
+    """
+    columns = get_record_columns(hash_value, db)
+    return StringRecord(**columns) if columns is not None else None
+
+def encode_cursor(created_at: datetime, record_id: str) -> str:
+    """
+    Encode a keyset position as an opaque pagination cursor
+    
+    Args:
+        created_at: created_at of the last record on the current page
+        record_id: id of that record
         
-    except Exception as e:
-        db.rollback()
+    Returns:
+        str: URL-safe cursor pointing just past the record
+    """
+    payload = json.dumps([created_at.isoformat(), record_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Decode a pagination cursor produced by encode_cursor
+    
+    Args:
+        cursor: Opaque cursor string
+        
+    Returns:
+        Tuple[datetime, str]: (created_at, id) keyset position
+        
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        created_at, record_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), str(record_id)
+    except Exception:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to add string record: {str(e)}"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
         )
-    finally:
-        db.close()
 
-def get_string_by_hash(hash_value: str) -> Optional[StringRecord]:
+def encode_search_cursor(rank: float, record_id: str) -> str:
     """
-    Retrieve a string record by its SHA-256 hash
+    Encode a position in ranked search results as an opaque pagination cursor
     
     Args:
-        hash_value: SHA-256 hash of the string
+        rank: Search rank of the last record on the current page
+        record_id: id of that record
         
     Returns:
-        Optional[StringRecord]: Found record or None
+        str: URL-safe cursor pointing just past the record
+    """
+    payload = json.dumps(["rank", rank, record_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def decode_search_cursor(cursor: str) -> Tuple[float, str]:
+    """
+    Decode a pagination cursor produced by encode_search_cursor
+    
+    Raises:
+        HTTPException: If the cursor is malformed or not a search cursor
     """
     try:
-        db = SessionLocal()
-        return db.query(StringRecord).filter(StringRecord.sha256_hash == hash_value).first()
-    finally:
-        db.close()
+        kind, rank, record_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if kind != "rank":
+            raise ValueError(kind)
+        return float(rank), str(record_id)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+def _next_cursor(created_at: datetime, record_id: str, rank: Optional[float] = None) -> str:
+    """Cursor after the last row of a page, by rank for search results"""
+    if rank is not None:
+        return encode_search_cursor(rank, record_id)
+    return encode_cursor(created_at, record_id)
+
+def _row_order(row: Mapping[str, Any]) -> tuple:
+    """Sort key of a column-values row in _filtered_query's order"""
+    if row.get("search_rank") is not None:
+        return (-row["search_rank"], row["id"])
+    return (row["created_at"], row["id"])
+
+def _record_order(row) -> tuple:
+    """Sort key of a (StringRecord[, search_rank]) result row in _filtered_query's order"""
+    if len(row) > 1:
+        return (-row[1], row[0].id)
+    return (row[0].created_at, row[0].id)
 
-def get_all_strings(filters: Dict[str, Any] = None) -> List[StringRecord]:
+def _merge_ordered(results: List[list], key: Callable[[Any], tuple]) -> list:
+    """Merge per-shard results, each already sorted by key, into one sorted list"""
+    if len(results) == 1:
+        return results[0]
+    return list(heapq.merge(*results, key=key))
+
+def _has_characters(db, characters: str, min_count: int = 1):
+    """
+    Match records containing any of the characters at least min_count times
+    
+    A bounded count over the covering index decides the plan: rare
+    characters become an IN (...) over their few record IDs, common ones a
+    correlated EXISTS that lets the ordered scan stop as soon as the page
+    is full.
+    """
+    matches = select(StringCharacter.record_id).where(
+        StringCharacter.character.in_({character.lower() for character in characters}),
+        StringCharacter.count >= min_count
+    )
+    probe = select(func.count()).select_from(matches.limit(SELECTIVE_CHARACTER_LIMIT).subquery())
+    
+    if db.scalar(probe) < SELECTIVE_CHARACTER_LIMIT:
+        return StringRecord.id.in_(matches)
+    return matches.where(StringCharacter.record_id == StringRecord.id).exists()
+
+def _filtered_query(db, filters: Dict[str, Any], cursor: Optional[str] = None, columns: Optional[list] = None):
+    """
+    Build a keyset-ordered select for the given filters, starting after cursor
+    
+    Selects StringRecord entities, or only the given table columns when
+    columns is passed. With a "search" filter the matches are ordered by
+    search rank instead, and a search_rank column is added.
     """
-    Retrieve all string records with optional filters
+    query = select(*columns) if columns is not None else select(StringRecord)
+    
+    # Apply filters
+    if filters.get("is_palindrome") is not None:
+        query = query.where(StringRecord.is_palindrome == filters["is_palindrome"])
+        
+    if filters.get("min_length") is not None:
+        query = query.where(StringRecord.length >= filters["min_length"])
+        
+    if filters.get("max_length") is not None:
+        query = query.where(StringRecord.length <= filters["max_length"])
+        
+    if filters.get("word_count") is not None:
+        query = query.where(StringRecord.word_count == filters["word_count"])
+        
+    if filters.get("min_word_count") is not None:
+        query = query.where(StringRecord.word_count >= filters["min_word_count"])
+        
+    if filters.get("max_word_count") is not None:
+        query = query.where(StringRecord.word_count <= filters["max_word_count"])
+        
+    # Character filters are answered from the string_characters index.
+    # Frequency maps are lowercased, so matching is case-insensitive.
+    if filters.get("contains_character") is not None:
+        query = query.where(_has_characters(db, filters["contains_character"]))
+    
+    if filters.get("contains_all") is not None:
+        for character in set(filters["contains_all"]):
+            query = query.where(_has_characters(db, character))
+    
+    if filters.get("contains_any") is not None:
+        query = query.where(_has_characters(db, filters["contains_any"]))
+    
+    for character, min_count in (filters.get("min_character_counts") or {}).items():
+        query = query.where(_has_characters(db, character, min_count))
+    
+    # Substring search joins the ranked matches and pages by (rank, id)
+    if filters.get("search"):
+        matches = search.match_query(db, filters["search"], StringRecord.__table__).subquery()
+        query = (
+            query.join(matches, matches.c.record_id == StringRecord.id)
+            .add_columns(matches.c.rank.label("search_rank"))
+        )
+        if cursor is not None:
+            rank, record_id = decode_search_cursor(cursor)
+            query = query.where(or_(
+                matches.c.rank < rank,
+                and_(matches.c.rank == rank, StringRecord.id > record_id)
+            ))
+        return query.order_by(matches.c.rank.desc(), StringRecord.id)
+    
+    # Resume after the cursor position
+    if cursor is not None:
+        created_at, record_id = decode_cursor(cursor)
+        query = query.where(or_(
+            StringRecord.created_at > created_at,
+            and_(StringRecord.created_at == created_at, StringRecord.id > record_id)
+        ))
+    
+    return query.order_by(StringRecord.created_at, StringRecord.id)
+
+def get_all_strings(
+    filters: Dict[str, Any] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[Iterable[str]] = None,
+    db: Optional[Session] = None
+) -> Tuple[List[StringRecord], Optional[str]]:
+    """
+    Retrieve a page of string records with optional filters
+    
+    Records are ordered by (created_at, id) and paginated by keyset, so
+    each page costs the same regardless of how deep into the table it is.
     
     Args:
         filters: Dictionary of filter parameters
@@ -89,10 +825,23 @@ def get_all_strings(filters: Dict[str, Any] = None) -> List[StringRecord]:
             - min_length: int
             - max_length: int
             - word_count: int
+            - min_word_count: int
+            - max_word_count: int
             - contains_character: str
+            - contains_all: str, every character must be present
+            - contains_any: str, at least one character must be present
+            - min_character_counts: Dict[str, int], minimum occurrences per character
+            - search: str, terms that must all occur as substrings; results
+              are ordered by search rank instead of (created_at, id)
+        limit: Maximum number of records to return (None for all)
+        cursor: Cursor returned by a previous call to continue from
+        fields: Response fields the caller will read; columns for other
+            fields are not loaded (None loads everything)
+        db: Request-scoped session (a new one is opened when omitted)
             
     Returns:
-        List[StringRecord]: List of matching records
+        Tuple[List[StringRecord], Optional[str]]: Matching records and the
+        cursor for the next page (None when there are no more records)
         
     Raises:
         HTTPException: If database operation fails
@@ -100,77 +849,365 @@ def get_all_strings(filters: Dict[str, Any] = None) -> List[StringRecord]:
     if filters is None:
         filters = {}
         
+    def fetch(session: Session) -> list:
+        query = _filtered_query(session, filters, cursor).options(*_projection_options(fields))
+        
+        # Fetch one extra row to know whether another page exists
+        if limit is not None:
+            query = query.limit(limit + 1)
+        
+        return session.execute(query).all()
+    
     try:
-        db = SessionLocal()
-        query = db.query(StringRecord)
+        # Each shard returns its first rows in page order; merge them
+        rows = _merge_ordered(_each_shard(db, fetch), _record_order)
         
-        # Apply filters
-        if filters.get("is_palindrome") is not None:
-            query = query.filter(StringRecord.is_palindrome == filters["is_palindrome"])
-            
-        if filters.get("min_length") is not None:
-            query = query.filter(StringRecord.length >= filters["min_length"])
-            
-        if filters.get("max_length") is not None:
-            query = query.filter(StringRecord.length <= filters["max_length"])
-            
-        if filters.get("word_count") is not None:
-            query = query.filter(StringRecord.word_count == filters["word_count"])
-            
-        if filters.get("contains_character") is not None:
-            query = query.filter(StringRecord.value.contains(filters["contains_character"]))
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = _next_cursor(last[0].created_at, last[0].id, last[1] if len(last) > 1 else None)
         
-        return query.all()
+        return [row[0] for row in rows], next_cursor
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retrieve string records: {str(e)}"
         )
-    finally:
-        db.close()
 
-def delete_string(hash_value: str) -> bool:
+def get_string_rows(
+    filters: Dict[str, Any] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[Iterable[str]] = None,
+    db: Optional[Session] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
     """
-    Delete a string record by its SHA-256 hash
+    Retrieve a page of column values with optional filters
+    
+    Same filtering and keyset pagination as get_all_strings, but selects
+    only the table columns behind the requested fields and returns plain
+    dicts instead of ORM instances, for responses built straight from rows.
     
     Args:
-        hash_value: SHA-256 hash of the string to delete
+        filters: Dictionary of filter parameters (see get_all_strings)
+        limit: Maximum number of rows to return (None for all)
+        cursor: Cursor returned by a previous call to continue from
+        fields: Response fields the caller will read (None selects every column)
+        db: Request-scoped session (a new one is opened when omitted)
         
     Returns:
-        bool: True if deleted, False if not found
+        Tuple[List[Dict[str, Any]], Optional[str]]: Column values keyed by
+        column name, and the cursor for the next page (None when done)
+        
+    Raises:
+        HTTPException: If database operation fails
+    """
+    if filters is None:
+        filters = {}
+    
+    def fetch(session: Session) -> List[Dict[str, Any]]:
+        query = _filtered_query(session, filters, cursor, _row_columns(fields))
+        
+        # Fetch one extra row to know whether another page exists
+        if limit is not None:
+            query = query.limit(limit + 1)
+        
+        return [dict(row) for row in session.execute(query).mappings()]
+    
+    try:
+        # Each shard returns its first rows in page order; merge them
+        rows = _merge_ordered(_each_shard(db, fetch), _row_order)
+        
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _next_cursor(rows[-1]["created_at"], rows[-1]["id"], rows[-1].get("search_rank"))
+        
+        return rows, next_cursor
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to retrieve string records: {str(e)}"
+        )
+
+def explain_filters(filters: Dict[str, Any] = None) -> List[str]:
+    """
+    Show the database query plan for a set of list filters
+    
+    Args:
+        filters: Dictionary of filter parameters (see get_all_strings)
+        
+    Returns:
+        List[str]: One line per plan step as reported by the database
+    """
+    with engines[0].connect() as connection:
+        query = _filtered_query(connection, filters or {})
+        sql = str(query.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+        
+        if connection.dialect.name == "sqlite":
+            rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")
+            return [row[-1] for row in rows]
+        rows = connection.exec_driver_sql(f"EXPLAIN {sql}")
+        return [row[0] for row in rows]
+
+def iter_strings(
+    filters: Dict[str, Any] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[Iterable[str]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the column values of string records matching the filters
+    
+    Rows are fetched STREAM_BATCH_SIZE at a time through a server-side
+    cursor (yield_per), so memory use does not grow with the result size.
+    Only the columns behind the requested fields are selected, and no ORM
+    instances are built. With several shards each one is streamed through
+    its own session and the streams are merged in order. Sessions stay open
+    until the iterator is exhausted or closed.
+    
+    Args:
+        filters: Dictionary of filter parameters (see get_all_strings)
+        cursor: Cursor to start streaming after
+        fields: Response fields to load (see get_string_rows)
+        
+    Yields:
+        Dict[str, Any]: Column values of matching records in (created_at, id) order
+    """
+    if filters is None:
+        filters = {}
+    
+    def shard_rows(shard: int) -> Iterator[Dict[str, Any]]:
+        db = shard_sessions[shard]()
+        try:
+            query = (
+                _filtered_query(db, filters, cursor, _row_columns(fields))
+                .execution_options(yield_per=STREAM_BATCH_SIZE)
+            )
+            for row in db.execute(query).mappings():
+                yield dict(row)
+        finally:
+            db.close()
+    
+    if SHARD_COUNT == 1:
+        yield from shard_rows(0)
+        return
+    
+    # One open cursor per shard, merged into a single ordered stream
+    yield from heapq.merge(*(shard_rows(shard) for shard in range(SHARD_COUNT)), key=_row_order)
+
+def find_similar(
+    value: str,
+    k: int = 10,
+    min_similarity: float = 0.0,
+    fields: Optional[Iterable[str]] = None,
+    db: Optional[Session] = None
+) -> List[Dict[str, Any]]:
+    """
+    Find the stored strings most similar to value
+    
+    Candidates are the records sharing at least one MinHash LSH bucket with
+    value, found through the (band, bucket) index instead of a table scan;
+    on each shard, the SIMILAR_CANDIDATE_LIMIT sharing the most buckets are then re-ranked
+    by exact Jaccard similarity of their character shingles. Matches above
+    about 0.7 similarity are almost always found; below about 0.4 they are
+    usually missed.
+    
+    Args:
+        value: String to compare against
+        k: Maximum number of results
+        min_similarity: Smallest similarity to return, between 0 and 1
+        fields: Response fields the caller will read (None selects every column)
+        db: Request-scoped session (a new one is opened when omitted)
+        
+    Returns:
+        List[Dict[str, Any]]: Column values of the closest records plus a
+        "similarity" score, most similar first
         
     Raises:
         HTTPException: If database operation fails
     """
+    table = StringRecord.__table__
+    buckets = StringSimilarityBucket.__table__
+    query_shingles = similarity.shingles(value)
+    pairs = similarity.lsh_buckets(similarity.minhash_signature(value))
+    
+    columns = _row_columns(None if fields is None else [*fields, "value"])
+    
+    def shard_matches(session: Session) -> List[Dict[str, Any]]:
+        # Records sharing the most buckets first
+        matches = func.count().label("matches")
+        candidate_ids = session.scalars(
+            select(buckets.c.record_id)
+            .where(or_(*(and_(buckets.c.band == band, buckets.c.bucket == bucket) for band, bucket in pairs)))
+            .group_by(buckets.c.record_id)
+            .order_by(matches.desc())
+            .limit(SIMILAR_CANDIDATE_LIMIT)
+        ).all()
+        
+        # Re-rank the candidates by exact similarity
+        scored = []
+        for start in range(0, len(candidate_ids), HASH_LOOKUP_CHUNK_SIZE):
+            chunk = candidate_ids[start:start + HASH_LOOKUP_CHUNK_SIZE]
+            for row in session.execute(select(*columns).where(table.c.id.in_(chunk))).mappings():
+                score = similarity.jaccard(query_shingles, similarity.shingles(row["value"]))
+                if score >= min_similarity:
+                    scored.append({**row, "similarity": round(score, 4)})
+        return scored
+    
     try:
-        db = SessionLocal()
+        scored = [row for rows in _each_shard(db, shard_matches) for row in rows]
+        scored.sort(key=lambda row: (-row["similarity"], row["id"]))
+        return scored[:k]
         
-        # Find the record
-        record = db.query(StringRecord).filter(StringRecord.sha256_hash == hash_value).first()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to find similar strings: {str(e)}"
+        )
+
+def get_stats(db: Optional[Session] = None) -> Dict[str, Any]:
+    """
+    Aggregate statistics over every stored string
+    
+    Reads the string_stats counters only (summed over the shards), so the
+    cost depends on the number of distinct buckets and characters, not on
+    the number of records.
+    
+    Args:
+        db: Request-scoped session (a new one is opened when omitted)
+        
+    Returns:
+        Dict[str, Any]: Totals, palindrome ratio, average length, length
+        histogram, word-count distribution and character frequencies
+        
+    Raises:
+        HTTPException: If database operation fails
+    """
+    def shard_counters(session: Session) -> list:
+        return session.execute(select(StringStat.kind, StringStat.key, StringStat.value)).all()
+    
+    try:
+        # Sum each shard's counters
+        counters = {kind: Counter() for kind in STAT_KINDS}
+        for rows in _each_shard(db, shard_counters):
+            for kind, key, value in rows:
+                counters[kind][key] += value
+        counters = {kind: {key: value for key, value in values.items() if value} for kind, values in counters.items()}
         
-        if not record:
-            return False
+        totals = counters["total"]
+        strings = totals.get("strings", 0)
+        palindromes = totals.get("palindromes", 0)
+        characters = totals.get("characters", 0)
         
-        # Delete the record
-        db.delete(record)
-        db.commit()
+        buckets = sorted(int(key) for key in counters["length"])
+        word_counts = sorted(int(key) for key in counters["word_count"])
         
-        return True
+        return {
+            "total_strings": strings,
+            "palindromes": palindromes,
+            "palindrome_ratio": palindromes / strings if strings else 0.0,
+            "total_characters": characters,
+            "average_length": characters / strings if strings else 0.0,
+            "length_histogram": [
+                {
+                    "min_length": bucket,
+                    "max_length": max(bucket * 2 - 1, 0),
+                    "count": counters["length"][str(bucket)]
+                }
+                for bucket in buckets
+            ],
+            "word_count_distribution": {
+                str(word_count): counters["word_count"][str(word_count)] for word_count in word_counts
+            },
+            "character_frequencies": dict(
+                sorted(counters["character"].items(), key=lambda item: (-item[1], item[0]))
+            )
+        }
         
     except Exception as e:
-        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to delete string record: {str(e)}"
+            detail=f"Failed to retrieve statistics: {str(e)}"
         )
-    finally:
-        db.close()
+
+def get_version(db: Optional[Session] = None) -> int:
+    """
+    Current records version: the number of inserts and deletes so far
+    
+    Read from the VERSION_COUNTER row of each shard (a primary key lookup),
+    so it is cheap enough to check before running a list query. Any write
+    that can change a list or stats response changes it.
+    
+    Args:
+        db: Request-scoped session (a new one is opened when omitted)
+        
+    Returns:
+        int: Version summed over the shards (0 for an empty database)
+    """
+    kind, key = VERSION_COUNTER
+    
+    def shard_version(session: Session) -> int:
+        return session.scalar(select(StringStat.value).where(StringStat.kind == kind, StringStat.key == key)) or 0
+    
+    return sum(_each_shard(db, shard_version))
+
+def delete_string(hash_value: str, db: Optional[Session] = None) -> bool:
+    """
+    Delete a string record by its SHA-256 hash
+    
+    Args:
+        hash_value: SHA-256 hash of the string to delete
+        db: Request-scoped session (a new one is opened when omitted)
+        
+    Returns:
+        bool: True if deleted, False if not found
+        
+    Raises:
+        HTTPException: If database operation fails
+    """
+    with _session(db, shard_for(hash_value)) as db:
+        try:
+            # Find the record
+            record = db.query(StringRecord).filter(StringRecord.sha256_hash == hash_value).first()
+            
+            if not record:
+                return False
+            
+            # Delete the record and its index rows, and take it out of the counters
+            db.execute(delete(StringCharacter).where(StringCharacter.record_id == record.id))
+            db.execute(delete(StringSimilarityBucket).where(StringSimilarityBucket.record_id == record.id))
+            search.unindex_value(db, record.id)
+            apply_stat_deltas(db, stat_deltas({
+                "length": record.length,
+                "is_palindrome": record.is_palindrome,
+                "word_count": record.word_count,
+                "character_frequency_map": record.frequency_map
+            }, sign=-1))
+            db.delete(record)
+            db.commit()
+            record_cache.delete(hash_value)
+            
+            return True
+            
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to delete string record: {str(e)}"
+            )
 
 # Create all tables
 def init_db():
-    """Initialize the database by creating all tables"""
-    Base.metadata.create_all(bind=engine)
+    """Initialize the database by applying any pending schema migrations"""
+    from app.models.migrations import run_migrations
+    run_migrations()
 
 if __name__ == "__main__":
     init_db()
\ No newline at end of file
@@ -0,0 +1,36 @@
+"""
+Show which index the database uses for each list filter combination.
+
+    python -m app.models.explain
+"""
+from itertools import combinations
+from typing import Any, Dict, List
+from app.models.database import explain_filters, init_db
+
+# Representative value for each list filter
+SAMPLE_FILTERS: Dict[str, Dict[str, Any]] = {
+    "is_palindrome": {"is_palindrome": True},
+    "length_range": {"min_length": 5, "max_length": 20},
+    "word_count": {"word_count": 2},
+    "contains_character": {"contains_character": "e"},
+    "search": {"search": "error code"},
+}
+
+def filter_matrix() -> List[Dict[str, Any]]:
+    """Every combination of the sample filters, from no filter to all of them"""
+    names = list(SAMPLE_FILTERS)
+    matrix = []
+    for size in range(len(names) + 1):
+        for combo in combinations(names, size):
+            filters: Dict[str, Any] = {}
+            for name in combo:
+                filters.update(SAMPLE_FILTERS[name])
+            matrix.append(filters)
+    return matrix
+
+if __name__ == "__main__":
+    init_db()
+    for filters in filter_matrix():
+        print(filters or "(no filters)")
+        for line in explain_filters(filters):
+            print(f"    {line}")
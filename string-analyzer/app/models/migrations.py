@@ -0,0 +1,338 @@
+"""
+Lightweight schema migrations.
+
+Each migration runs once, in version order, inside a single transaction
+and is recorded in the schema_migrations table. Apply pending migrations
+(once per deploy; workers only check the schema version at startup unless
+AUTO_MIGRATE is set):
+    python -m app.models.migrations
+Check the schema version without changing anything:
+    python -m app.models.migrations --check
+Convert stored frequency maps to the packed format (or back to JSON):
+    python -m app.models.migrations --compact-frequency-maps
+    python -m app.models.migrations --expand-frequency-maps
+Recompute the string_stats counters from the stored records:
+    python -m app.models.migrations --rebuild-stats
+Re-index every stored value for substring search:
+    python -m app.models.migrations --rebuild-search
+"""
+from sqlalchemy import Column, Integer, String, DateTime, bindparam, delete, insert, inspect, select, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateColumn
+from sqlalchemy.sql import func
+from typing import Callable, List, Tuple
+from collections import Counter
+from app.db import Base, engines
+from app.models.database import VERSION_COUNTER, StringCharacter, StringRecord, StringSimilarityBucket, StringStat, character_rows, frequency_columns, length_bucket, similarity_rows
+from app.models import search
+from app.utils.frequency_codec import decode_frequency_map
+import sys
+
+# Records read per batch when backfilling derived data
+BACKFILL_BATCH_SIZE = 1000
+
+class SchemaMigration(Base):
+    """Applied schema migration versions"""
+    __tablename__ = "schema_migrations"
+
+    version = Column(Integer, primary_key=True)
+    description = Column(String(255), nullable=False)
+    applied_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+def _create_tables(connection: Connection) -> None:
+    """Create every table (and its indexes) that does not exist yet"""
+    Base.metadata.create_all(bind=connection)
+
+def _add_filter_indexes(connection: Connection) -> None:
+    """Add the list filter indexes to databases created before they existed"""
+    for index in StringRecord.__table__.indexes:
+        index.create(bind=connection, checkfirst=True)
+
+def _add_character_index(connection: Connection) -> None:
+    """Create string_characters and backfill it from stored frequency maps"""
+    StringCharacter.__table__.create(bind=connection, checkfirst=True)
+    
+    query = select(StringRecord.id, StringRecord.character_frequency_map).order_by(StringRecord.id)
+    last_id = ""
+    while True:
+        batch = connection.execute(query.where(StringRecord.id > last_id).limit(BACKFILL_BATCH_SIZE)).all()
+        if not batch:
+            break
+        rows = [row for record_id, frequency_map in batch for row in character_rows(record_id, frequency_map)]
+        if rows:
+            connection.execute(insert(StringCharacter), rows)
+        last_id = batch[-1][0]
+
+def _add_column(connection: Connection, column: Column) -> None:
+    """Add a model column to an existing table unless it is already there"""
+    table = column.table
+    existing = {c["name"] for c in inspect(connection).get_columns(table.name)}
+    if column.name not in existing:
+        ddl = CreateColumn(column).compile(dialect=connection.dialect)
+        connection.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {ddl}")
+
+def _add_frequency_blob(connection: Connection) -> None:
+    """Add the packed character_frequency_blob column"""
+    _add_column(connection, StringRecord.__table__.c.character_frequency_blob)
+
+def _rebuild_stats(connection: Connection) -> None:
+    """Replace the string_stats counters with totals aggregated from the records"""
+    counters = Counter()
+    
+    strings, palindromes, characters = connection.execute(
+        select(
+            func.count(),
+            func.count().filter(StringRecord.is_palindrome.is_(True)),
+            func.coalesce(func.sum(StringRecord.length), 0)
+        )
+    ).one()
+    counters[("total", "strings")] = strings
+    counters[("total", "palindromes")] = palindromes
+    counters[("total", "characters")] = characters
+    
+    for length, count in connection.execute(
+        select(StringRecord.length, func.count()).group_by(StringRecord.length)
+    ):
+        counters[("length", str(length_bucket(length)))] += count
+    
+    for word_count, count in connection.execute(
+        select(StringRecord.word_count, func.count()).group_by(StringRecord.word_count)
+    ):
+        counters[("word_count", str(word_count))] = count
+    
+    # string_characters already holds every record's character counts
+    for character, count in connection.execute(
+        select(StringCharacter.character, func.sum(StringCharacter.count)).group_by(StringCharacter.character)
+    ):
+        counters[("character", character)] = count
+    
+    # Keep the records version: it must never repeat an earlier value
+    connection.execute(delete(StringStat).where(StringStat.kind != VERSION_COUNTER[0]))
+    rows = [{"kind": kind, "key": key, "value": value} for (kind, key), value in counters.items() if value]
+    if rows:
+        connection.execute(insert(StringStat), rows)
+
+def _add_stats(connection: Connection) -> None:
+    """Create string_stats and fill it from the existing records"""
+    StringStat.__table__.create(bind=connection, checkfirst=True)
+    _rebuild_stats(connection)
+
+def _add_similarity_index(connection: Connection) -> None:
+    """Create string_similarity_buckets and backfill it from stored values"""
+    StringSimilarityBucket.__table__.create(bind=connection, checkfirst=True)
+    
+    query = select(StringRecord.id, StringRecord.value).order_by(StringRecord.id)
+    last_id = ""
+    while True:
+        batch = connection.execute(query.where(StringRecord.id > last_id).limit(BACKFILL_BATCH_SIZE)).all()
+        if not batch:
+            break
+        rows = [row for record_id, value in batch for row in similarity_rows(record_id, value)]
+        connection.execute(insert(StringSimilarityBucket), rows)
+        last_id = batch[-1][0]
+
+def _backfill_search(connection: Connection) -> None:
+    """Add every stored value to the search index"""
+    query = select(StringRecord.id, StringRecord.value).order_by(StringRecord.id)
+    last_id = ""
+    while True:
+        batch = connection.execute(query.where(StringRecord.id > last_id).limit(BACKFILL_BATCH_SIZE)).all()
+        if not batch:
+            break
+        search.index_values(connection, batch)
+        last_id = batch[-1][0]
+
+def _add_search_index(connection: Connection) -> None:
+    """Create the substring search index the database supports and fill it"""
+    search.create_search_index(connection)
+    _backfill_search(connection)
+
+# (version, description, migration function), in the order they must run
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "Create base tables", _create_tables),
+    (2, "Add filter and keyset indexes to string_records", _add_filter_indexes),
+    (3, "Add string_characters inverted index", _add_character_index),
+    (4, "Add packed character_frequency_blob column", _add_frequency_blob),
+    (5, "Add string_stats aggregate counters", _add_stats),
+    (6, "Add string_similarity_buckets MinHash LSH index", _add_similarity_index),
+    (7, "Add substring search index", _add_search_index),
+]
+
+def get_schema_version(connection: Connection) -> int:
+    """
+    Return the highest applied migration version
+    
+    Args:
+        connection: Open database connection
+        
+    Returns:
+        int: Latest applied version, or 0 for an unmigrated database
+    """
+    if not connection.dialect.has_table(connection, SchemaMigration.__tablename__):
+        return 0
+    return connection.scalar(select(func.max(SchemaMigration.version))) or 0
+
+def check_schema() -> None:
+    """
+    Verify that every shard has all migrations applied
+    
+    Runs at startup in place of the migrations themselves: one version
+    query per shard, and nothing is created or altered.
+    
+    Raises:
+        RuntimeError: If a shard is behind the latest migration
+    """
+    latest = MIGRATIONS[-1][0]
+    for shard, shard_engine in enumerate(engines):
+        with shard_engine.connect() as connection:
+            version = get_schema_version(connection)
+        if version < latest:
+            raise RuntimeError(
+                f"Database shard {shard} is at schema version {version}, expected {latest}; "
+                "run python -m app.models.migrations (or set AUTO_MIGRATE=true)"
+            )
+
+def run_migrations() -> List[int]:
+    """
+    Apply all pending migrations to every shard
+    
+    Returns:
+        List[int]: Versions applied by this call on any shard
+    """
+    applied_now = set()
+    for shard_engine in engines:
+        applied_now.update(_migrate(shard_engine))
+    return sorted(applied_now)
+
+def _migrate(shard_engine: Engine) -> List[int]:
+    """Apply pending migrations to one database and return the versions applied"""
+    applied_now = []
+    with shard_engine.begin() as connection:
+        SchemaMigration.__table__.create(bind=connection, checkfirst=True)
+        applied = set(connection.scalars(select(SchemaMigration.version)))
+        
+        for version, description, migrate in MIGRATIONS:
+            if version in applied:
+                continue
+            migrate(connection)
+            connection.execute(insert(SchemaMigration).values(version=version, description=description))
+            applied_now.append(version)
+    
+    return applied_now
+
+def convert_frequency_maps(compact: bool) -> int:
+    """
+    Rewrite stored frequency maps in the packed binary or the JSON format
+    
+    Rows are converted in batches of BACKFILL_BATCH_SIZE, one transaction
+    per batch, so the command can be interrupted and re-run safely.
+    
+    Args:
+        compact: Convert to the packed form (True) or back to JSON (False)
+        
+    Returns:
+        int: Number of rows rewritten
+    """
+    run_migrations()
+    pending = StringRecord.character_frequency_blob.is_(None) if compact else StringRecord.character_frequency_blob.is_not(None)
+    query = (
+        select(StringRecord.id, StringRecord.character_frequency_map, StringRecord.character_frequency_blob)
+        .where(pending)
+        .order_by(StringRecord.id)
+        .limit(BACKFILL_BATCH_SIZE)
+    )
+    statement = (
+        update(StringRecord.__table__)
+        .where(StringRecord.__table__.c.id == bindparam("record_id"))
+        .values(
+            character_frequency_map=bindparam("map"),
+            character_frequency_blob=bindparam("blob")
+        )
+    )
+    
+    converted = 0
+    for shard_engine in engines:
+        converted += _convert_shard_frequency_maps(shard_engine, query, statement, compact)
+    return converted
+
+def _convert_shard_frequency_maps(shard_engine: Engine, query, statement, compact: bool) -> int:
+    """Rewrite one shard's pending frequency maps (see convert_frequency_maps)"""
+    converted = 0
+    last_id = ""
+    while True:
+        with shard_engine.begin() as connection:
+            batch = connection.execute(query.where(StringRecord.id > last_id)).all()
+            if not batch:
+                return converted
+            rows = []
+            for record_id, frequency_map, blob in batch:
+                if blob is not None:
+                    frequency_map = decode_frequency_map(blob)
+                columns = frequency_columns(frequency_map, compact)
+                rows.append({
+                    "record_id": record_id,
+                    "map": columns["character_frequency_map"],
+                    "blob": columns["character_frequency_blob"]
+                })
+            connection.execute(statement, rows)
+        converted += len(batch)
+        last_id = batch[-1][0]
+
+def rebuild_stats() -> None:
+    """
+    Recompute every string_stats counter from scratch
+    
+    Runs in one transaction per shard, so readers see either the old or
+    the new counters. Use it after loading rows outside the application.
+    """
+    run_migrations()
+    for shard_engine in engines:
+        with shard_engine.begin() as connection:
+            _rebuild_stats(connection)
+
+def rebuild_search() -> None:
+    """
+    Re-index every stored value for substring search
+    
+    Runs in one transaction per shard. Use it after loading rows outside
+    the application.
+    """
+    run_migrations()
+    for shard_engine in engines:
+        with shard_engine.begin() as connection:
+            search.clear_index(connection)
+            _backfill_search(connection)
+
+if __name__ == "__main__":
+    # --compact-frequency-maps / --expand-frequency-maps convert existing rows
+    if "--compact-frequency-maps" in sys.argv or "--expand-frequency-maps" in sys.argv:
+        count = convert_frequency_maps("--compact-frequency-maps" in sys.argv)
+        print(f"Converted {count} frequency maps")
+        sys.exit()
+    
+    # --rebuild-stats recomputes the aggregate counters
+    if "--rebuild-stats" in sys.argv:
+        rebuild_stats()
+        print("Rebuilt aggregate statistics")
+        sys.exit()
+    
+    # --rebuild-search re-indexes stored values for substring search
+    if "--rebuild-search" in sys.argv:
+        rebuild_search()
+        print("Rebuilt search index")
+        sys.exit()
+    
+    # --check exits non-zero when migrations are pending
+    if "--check" in sys.argv:
+        try:
+            check_schema()
+        except RuntimeError as e:
+            sys.exit(str(e))
+        print("Database schema is up to date")
+        sys.exit()
+    
+    versions = run_migrations()
+    if versions:
+        print(f"Applied migrations: {', '.join(str(v) for v in versions)}")
+    else:
+        print("Database schema is up to date")
@@ -0,0 +1,246 @@
+"""
+Substring search over stored values.
+
+The index used depends on what the database supports, decided when
+migration 7 runs:
+
+- "fts5": SQLite FTS5 table with the trigram tokenizer (SQLite 3.34+)
+- "pg_trgm": PostgreSQL GIN trigram index on string_records.value
+- "trigram": portable trigram -> record inverted index table
+
+Every backend answers the same query: a list of terms (whitespace
+separated, or a "quoted phrase"), each of which must occur in the value
+as a case-insensitive substring. Matches are ranked best first.
+"""
+from sqlalchemy import Column, Float, Index, Integer, MetaData, String, Table, and_, cast, column, delete, func, insert, literal, literal_column, select, table, text
+from sqlalchemy.sql import Select
+from typing import Iterable, List, Optional, Set, Tuple
+from app.db import engines
+import hashlib
+import re
+import sqlite3
+
+# Terms shorter than this cannot use a trigram index and are checked with LIKE
+MIN_INDEXED_TERM = 3
+
+FTS_TABLE = "string_search"
+PG_TRGM_INDEX = "ix_string_records_value_trgm"
+
+# The fallback index lives outside Base.metadata so that databases using
+# FTS5 or pg_trgm never create it
+search_metadata = MetaData()
+
+search_trigrams = Table(
+    "string_search_trigrams",
+    search_metadata,
+    Column("record_id", String(36), primary_key=True),
+    Column("trigram", String(12), primary_key=True),
+    Index("ix_string_search_trigrams_trigram", "trigram", "record_id"),
+)
+
+# FTS5 columns; the value is stored again so the index needs no triggers
+_fts = table(FTS_TABLE, column("rowid", Integer), column("record_id", String), column("value", String))
+
+_TERM = re.compile(r'"([^"]+)"|(\S+)')
+
+# Backend in use, detected on first use
+_backend: Optional[str] = None
+
+def search_terms(query: str) -> List[str]:
+    """Split a search query into terms, keeping "quoted phrases" together"""
+    return [phrase or word for phrase, word in _TERM.findall(query)]
+
+def trigrams(text_value: str) -> Set[str]:
+    """Distinct lowercased 3-character substrings of a value"""
+    lowered = text_value.lower()
+    return {lowered[i:i + 3] for i in range(len(lowered) - 2)}
+
+def _lowered(value_column):
+    """
+    The column lowercased the way trigrams() lowercases values
+
+    SQLite's lower() only folds ASCII, so SQLite connections use the
+    unicode_lower function app.db registers (Python's str.lower).
+    """
+    if engines[0].dialect.name == "sqlite":
+        return func.unicode_lower(value_column)
+    return func.lower(value_column)
+
+def _like_pattern(term: str) -> str:
+    """LIKE pattern matching term anywhere, with wildcards escaped"""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+def _fts_rowid(record_id: str) -> int:
+    """Stable 63-bit FTS5 rowid for a record, so deletes are a rowid lookup"""
+    return int.from_bytes(hashlib.blake2b(record_id.encode(), digest_size=8).digest(), "big") >> 1
+
+def fts5_trigram_available() -> bool:
+    """Whether the linked SQLite library has FTS5 with the trigram tokenizer"""
+    try:
+        probe = sqlite3.connect(":memory:")
+        try:
+            probe.execute("CREATE VIRTUAL TABLE probe USING fts5(value, tokenize='trigram')")
+        finally:
+            probe.close()
+        return True
+    except sqlite3.Error:
+        return False
+
+def search_backend(db) -> str:
+    """
+    Return the search backend this database was migrated to
+
+    Args:
+        db: Session or connection to inspect
+
+    Returns:
+        str: "fts5", "pg_trgm" or "trigram"
+    """
+    global _backend
+    if _backend is None:
+        if engines[0].dialect.name == "sqlite" and db.scalar(
+            text("SELECT count(*) FROM sqlite_master WHERE name = :name"), {"name": FTS_TABLE}
+        ):
+            _backend = "fts5"
+        elif engines[0].dialect.name == "postgresql" and db.scalar(
+            text("SELECT count(*) FROM pg_indexes WHERE indexname = :name"), {"name": PG_TRGM_INDEX}
+        ):
+            _backend = "pg_trgm"
+        else:
+            _backend = "trigram"
+    return _backend
+
+def create_search_index(connection) -> str:
+    """
+    Create the best search index the database supports
+
+    Args:
+        connection: Connection inside the migration transaction
+
+    Returns:
+        str: Backend created (see search_backend)
+    """
+    global _backend
+    _backend = None
+
+    if engines[0].dialect.name == "sqlite" and fts5_trigram_available():
+        connection.exec_driver_sql(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+            "USING fts5(record_id UNINDEXED, value, tokenize='trigram')"
+        )
+        return "fts5"
+
+    if engines[0].dialect.name == "postgresql":
+        # Creating the extension needs privileges the application role may lack
+        try:
+            with connection.begin_nested():
+                connection.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+                connection.exec_driver_sql(
+                    f"CREATE INDEX IF NOT EXISTS {PG_TRGM_INDEX} "
+                    "ON string_records USING gin (value gin_trgm_ops)"
+                )
+            return "pg_trgm"
+        except Exception:
+            pass
+
+    search_metadata.create_all(bind=connection)
+    return "trigram"
+
+def index_values(db, rows: Iterable[Tuple[str, str]]) -> None:
+    """
+    Add records to the search index inside the caller's transaction
+
+    Args:
+        db: Session or connection
+        rows: (record_id, value) pairs
+    """
+    rows = list(rows)
+    if not rows:
+        return
+
+    backend = search_backend(db)
+    if backend == "fts5":
+        db.execute(
+            insert(_fts),
+            [{"rowid": _fts_rowid(record_id), "record_id": record_id, "value": value} for record_id, value in rows]
+        )
+    elif backend == "trigram":
+        trigram_rows = [
+            {"record_id": record_id, "trigram": trigram}
+            for record_id, value in rows for trigram in trigrams(value)
+        ]
+        if trigram_rows:
+            db.execute(insert(search_trigrams), trigram_rows)
+    # pg_trgm: the GIN index on string_records is maintained by PostgreSQL
+
+def unindex_value(db, record_id: str) -> None:
+    """Remove a record from the search index inside the caller's transaction"""
+    backend = search_backend(db)
+    if backend == "fts5":
+        db.execute(delete(_fts).where(_fts.c.rowid == _fts_rowid(record_id)))
+    elif backend == "trigram":
+        db.execute(delete(search_trigrams).where(search_trigrams.c.record_id == record_id))
+
+def clear_index(db) -> None:
+    """Remove every record from the search index (before a full rebuild)"""
+    backend = search_backend(db)
+    if backend == "fts5":
+        db.execute(delete(_fts))
+    elif backend == "trigram":
+        db.execute(delete(search_trigrams))
+
+def match_query(db, query: str, records: Table) -> Select:
+    """
+    Select (record_id, rank) for every record matching the search query
+
+    Higher ranks are better: negated BM25 for FTS5, trigram similarity to
+    the whole query for pg_trgm, and the share of the value covered by the
+    terms for the trigram fallback.
+
+    Args:
+        db: Session or connection
+        query: Search query (see search_terms)
+        records: The string_records table
+
+    Returns:
+        Select: Query with record_id and rank columns
+    """
+    terms = search_terms(query)
+    indexed = [term for term in terms if len(term) >= MIN_INDEXED_TERM]
+    short = [term for term in terms if len(term) < MIN_INDEXED_TERM]
+    backend = search_backend(db)
+
+    if backend == "fts5":
+        conditions = [_fts.c.value.like(_like_pattern(term), escape="\\") for term in short]
+        rank = literal(0.0, Float)
+        if indexed:
+            # Each term is a quoted FTS5 string: a substring match under the trigram tokenizer
+            expression = " ".join('"' + term.replace('"', '""') + '"' for term in indexed)
+            conditions.append(literal_column(FTS_TABLE).op("MATCH")(expression))
+            rank = -func.bm25(literal_column(FTS_TABLE))
+        return select(_fts.c.record_id, rank.label("rank")).where(*conditions)
+
+    if backend == "pg_trgm":
+        return select(
+            records.c.id.label("record_id"),
+            cast(func.similarity(records.c.value, query), Float).label("rank")
+        ).where(*(records.c.value.ilike(_like_pattern(term), escape="\\") for term in terms))
+
+    # Trigram fallback: candidates hold every trigram of every term, then
+    # each term, lowercased in Python like the indexed trigrams, is checked as a substring
+    conditions = [_lowered(records.c.value).like(_like_pattern(term.lower()), escape="\\") for term in terms]
+    grams = set().union(*(trigrams(term) for term in indexed)) if indexed else set()
+    if grams:
+        candidates = (
+            select(search_trigrams.c.record_id)
+            .where(search_trigrams.c.trigram.in_(grams))
+            .group_by(search_trigrams.c.record_id)
+            .having(func.count() == len(grams))
+        )
+        conditions.append(records.c.id.in_(candidates))
+    covered = sum(len(term) for term in terms)
+    return select(
+        records.c.id.label("record_id"),
+        (literal(covered, Float) / cast(records.c.length, Float)).label("rank")
+    ).where(and_(*conditions))
@@ -0,0 +1,149 @@
+"""
+Inspect and rebalance hash-partitioned storage.
+
+Records live on shard_for(sha256_hash) of the DATABASE_SHARDS list. After
+appending URLs to DATABASE_SHARDS, move the records whose shard changed:
+    python -m app.models.sharding --rebalance
+Without arguments, print how many records each shard holds, how many
+of them belong elsewhere and which shards still need migrations (such as
+a newly appended one; --rebalance applies them):
+    python -m app.models.sharding
+
+Each batch is copied to its new shard and committed there before it is
+deleted from the old one, so an interrupted run leaves at most a batch
+stored twice, and re-running the command finishes the move. Records that
+have not been moved yet are not found by lookups, so pause writes (or
+accept misses for those records) while it runs.
+"""
+from collections import Counter
+from typing import Any, Dict, List
+from sqlalchemy import delete, insert, select
+from app.db import SHARD_COUNT, engines, shard_for, shard_sessions
+from app.models import search
+from app.models.database import (
+    HASH_LOOKUP_CHUNK_SIZE, StringCharacter, StringRecord, StringSimilarityBucket,
+    apply_stat_deltas, character_rows, row_frequency_map, similarity_rows, stat_deltas
+)
+from app.models.migrations import MIGRATIONS, get_schema_version, run_migrations
+import sys
+
+# Records read per batch while scanning a shard
+REBALANCE_BATCH_SIZE = 1000
+
+def _record_deltas(rows: List[Dict[str, Any]], sign: int) -> Counter:
+    """Counter changes for adding (sign=1) or removing (sign=-1) stored rows"""
+    deltas = Counter()
+    for row in rows:
+        deltas.update(stat_deltas({
+            "length": row["length"],
+            "is_palindrome": row["is_palindrome"],
+            "word_count": row["word_count"],
+            "character_frequency_map": row_frequency_map(row)
+        }, sign))
+    return deltas
+
+def _copy_records(shard: int, rows: List[Dict[str, Any]]) -> None:
+    """Insert stored rows and their index rows on a shard, skipping hashes it already has"""
+    with shard_sessions[shard]() as db:
+        hashes = [row["sha256_hash"] for row in rows]
+        existing = set()
+        for start in range(0, len(hashes), HASH_LOOKUP_CHUNK_SIZE):
+            chunk = hashes[start:start + HASH_LOOKUP_CHUNK_SIZE]
+            existing.update(db.scalars(select(StringRecord.sha256_hash).where(StringRecord.sha256_hash.in_(chunk))))
+        rows = [row for row in rows if row["sha256_hash"] not in existing]
+        if not rows:
+            return
+
+        db.execute(insert(StringRecord), rows)
+        db.execute(insert(StringCharacter), [
+            index_row for row in rows for index_row in character_rows(row["id"], row_frequency_map(row))
+        ])
+        db.execute(insert(StringSimilarityBucket), [
+            bucket_row for row in rows for bucket_row in similarity_rows(row["id"], row["value"])
+        ])
+        search.index_values(db, ((row["id"], row["value"]) for row in rows))
+        apply_stat_deltas(db, _record_deltas(rows, 1))
+        db.commit()
+
+def _remove_records(shard: int, rows: List[Dict[str, Any]]) -> None:
+    """Delete stored rows and their index rows from a shard"""
+    record_ids = [row["id"] for row in rows]
+    with shard_sessions[shard]() as db:
+        db.execute(delete(StringCharacter).where(StringCharacter.record_id.in_(record_ids)))
+        db.execute(delete(StringSimilarityBucket).where(StringSimilarityBucket.record_id.in_(record_ids)))
+        for record_id in record_ids:
+            search.unindex_value(db, record_id)
+        apply_stat_deltas(db, _record_deltas(rows, -1))
+        db.execute(delete(StringRecord).where(StringRecord.id.in_(record_ids)))
+        db.commit()
+
+def shard_report() -> List[Dict[str, Any]]:
+    """
+    Count the records on each shard and those that belong on another one
+
+    Nothing is created or altered: a shard without the string_records
+    table (a new, unmigrated one) reports no records.
+
+    Returns:
+        List[Dict[str, Any]]: {"shard", "records", "misplaced",
+            "migrations_pending"} per shard
+    """
+    latest = MIGRATIONS[-1][0]
+    report = []
+    for shard in range(SHARD_COUNT):
+        with engines[shard].connect() as connection:
+            version = get_schema_version(connection)
+            hashes = []
+            if connection.dialect.has_table(connection, StringRecord.__tablename__):
+                hashes = connection.scalars(select(StringRecord.sha256_hash)).all()
+        report.append({
+            "shard": shard,
+            "records": len(hashes),
+            "misplaced": sum(1 for hash_value in hashes if shard_for(hash_value) != shard),
+            "migrations_pending": version < latest
+        })
+    return report
+
+def rebalance() -> int:
+    """
+    Move every record stored on the wrong shard to shard_for(sha256_hash)
+
+    Returns:
+        int: Number of records moved
+    """
+    run_migrations()
+    table = StringRecord.__table__
+    moved = 0
+    for shard in range(SHARD_COUNT):
+        last_id = ""
+        while True:
+            with shard_sessions[shard]() as db:
+                batch = [
+                    dict(row) for row in db.execute(
+                        select(*table.c).where(table.c.id > last_id).order_by(table.c.id).limit(REBALANCE_BATCH_SIZE)
+                    ).mappings()
+                ]
+            if not batch:
+                break
+            last_id = batch[-1]["id"]
+
+            # Group misplaced rows by their new shard; copy first, then delete
+            targets: Dict[int, List[Dict[str, Any]]] = {}
+            for row in batch:
+                target = shard_for(row["sha256_hash"])
+                if target != shard:
+                    targets.setdefault(target, []).append(row)
+            for target, rows in targets.items():
+                _copy_records(target, rows)
+                _remove_records(shard, rows)
+                moved += len(rows)
+    return moved
+
+if __name__ == "__main__":
+    if "--rebalance" in sys.argv:
+        print(f"Moved {rebalance()} records")
+        sys.exit()
+
+    for entry in shard_report():
+        pending = ", migrations pending" if entry["migrations_pending"] else ""
+        print(f"shard {entry['shard']}: {entry['records']} records, {entry['misplaced']} misplaced{pending}")
@@ -0,0 +1,436 @@
+"""
+Bulk export and import of stored records.
+
+Export every record to a file:
+    python -m app.models.transfer export strings.parquet
+Import a file written by export (e.g. into a new environment):
+    python -m app.models.transfer import strings.parquet
+
+The format follows the file extension (.csv, .parquet or .arrow) unless
+--format csv|parquet|arrow is given. Parquet and Arrow IPC need pyarrow.
+
+Imported records keep their id, created_at and stored metrics when the
+SHA-256 of the value matches sha256_hash and the metrics are consistent
+with the value; other rows are analyzed again.
+Hashes that are already stored are skipped, so an import can be re-run.
+"""
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional
+from fastapi import HTTPException, status
+from app.models.database import add_strings_bulk, iter_strings, row_frequency_map
+from app.utils import analyzer
+import csv
+import importlib.util
+import io
+import json
+import os
+import sys
+import threading
+
+# Optional: only CSV is available without pyarrow. It is imported by the first
+# Parquet or Arrow transfer (see _load_pyarrow), not by every worker at startup.
+PYARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+pa = None
+pq = None
+SCHEMA = None
+_pyarrow_lock = threading.Lock()
+
+FORMATS = ("csv", "parquet", "arrow")
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+# Records per CSV chunk or Arrow record batch (Parquet row group) when exporting
+EXPORT_BATCH_SIZE = 10000
+
+# Records analyzed and inserted per transaction when importing
+IMPORT_BATCH_SIZE = 5000
+
+# Columns written by export and read by import, in file order
+COLUMNS = (
+    "id", "value", "length", "is_palindrome", "unique_characters", "word_count",
+    "character_frequency_map", "sha256_hash", "created_at",
+)
+
+# Stored metrics an import needs to skip analysis
+METRIC_COLUMNS = ("length", "is_palindrome", "unique_characters", "word_count", "character_frequency_map")
+
+def _load_pyarrow() -> None:
+    """Import pyarrow and build the export SCHEMA, once"""
+    global pa, pq, SCHEMA
+    with _pyarrow_lock:
+        if pa is not None:
+            return
+        import pyarrow
+        import pyarrow.parquet
+        pq = pyarrow.parquet
+        SCHEMA = pyarrow.schema([
+            ("id", pyarrow.string()),
+            ("value", pyarrow.string()),
+            ("length", pyarrow.int64()),
+            ("is_palindrome", pyarrow.bool_()),
+            ("unique_characters", pyarrow.int64()),
+            ("word_count", pyarrow.int64()),
+            ("character_frequency_map", pyarrow.map_(pyarrow.string(), pyarrow.int64())),
+            ("sha256_hash", pyarrow.string()),
+            ("created_at", pyarrow.timestamp("us", tz="UTC")),
+        ])
+        pa = pyarrow
+
+def check_format(file_format: str) -> str:
+    """
+    Validate an export/import format name
+
+    Raises:
+        HTTPException: 400 for an unknown format, 501 if it needs pyarrow
+            and pyarrow is not installed
+    """
+    if file_format not in FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid format; choose from: {', '.join(FORMATS)}"
+        )
+    if file_format != "csv" and not PYARROW_AVAILABLE:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail=f"The {file_format} format requires pyarrow"
+        )
+    return file_format
+
+def format_for_path(path: str) -> str:
+    """Format named by a file's extension (see FORMATS)"""
+    extension = os.path.splitext(path)[1].lstrip(".").lower()
+    return {"pq": "parquet", "ipc": "arrow", "arrows": "arrow"}.get(extension, extension)
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Timezone-aware UTC datetime; naive values (SQLite) are already UTC"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+def _export_record(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Exported column values of a stored row"""
+    return {
+        "id": row["id"],
+        "value": row["value"],
+        "length": row["length"],
+        "is_palindrome": row["is_palindrome"],
+        "unique_characters": row["unique_characters"],
+        "word_count": row["word_count"],
+        "character_frequency_map": row_frequency_map(row),
+        "sha256_hash": row["sha256_hash"],
+        "created_at": _utc(row["created_at"]),
+    }
+
+def _batches(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Group exported records into lists of at most size"""
+    batch = []
+    for row in rows:
+        batch.append(_export_record(row))
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _csv_chunks(rows: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """CSV header and rows; frequency maps are JSON objects"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(COLUMNS)
+    for batch in _batches(rows, EXPORT_BATCH_SIZE):
+        for record in batch:
+            record["is_palindrome"] = "true" if record["is_palindrome"] else "false"
+            record["character_frequency_map"] = json.dumps(record["character_frequency_map"], ensure_ascii=False)
+            record["created_at"] = record["created_at"].isoformat() if record["created_at"] else ""
+            writer.writerow([record[column] for column in COLUMNS])
+        yield buffer.getvalue().encode("utf-8", "surrogatepass")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8", "surrogatepass")
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands written bytes back to the exporter in chunks"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def take(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+def _arrow_chunks(rows: Iterable[Dict[str, Any]], file_format: str) -> Iterator[bytes]:
+    """Parquet (one row group per batch) or Arrow IPC stream bytes"""
+    _load_pyarrow()
+    sink = _ChunkSink()
+    if file_format == "parquet":
+        writer = pq.ParquetWriter(sink, SCHEMA, compression="zstd")
+    else:
+        writer = pa.ipc.new_stream(sink, SCHEMA)
+
+    for batch in _batches(rows, EXPORT_BATCH_SIZE):
+        for record in batch:
+            record["character_frequency_map"] = list(record["character_frequency_map"].items())
+        writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=SCHEMA))
+        chunk = sink.take()
+        if chunk:
+            yield chunk
+    writer.close()
+    yield sink.take()
+
+def _encode(rows: Iterable[Dict[str, Any]], file_format: str) -> Iterator[bytes]:
+    """Encode stored rows in the given format"""
+    if file_format == "csv":
+        return _csv_chunks(rows)
+    return _arrow_chunks(rows, file_format)
+
+def export_chunks(file_format: str, filters: Dict[str, Any] = None) -> Iterator[bytes]:
+    """
+    Stream every record matching the filters as CSV, Parquet or Arrow IPC
+
+    Records are read with iter_strings, so memory stays bounded by one
+    EXPORT_BATCH_SIZE batch whatever the table size.
+
+    Args:
+        file_format: One of FORMATS
+        filters: Same filters as get_all_strings (default: every record)
+
+    Returns:
+        Iterator[bytes]: Consecutive pieces of the file
+
+    Raises:
+        HTTPException: See check_format
+    """
+    check_format(file_format)
+    return _encode(iter_strings(filters or {}), file_format)
+
+def export_file(path: str, file_format: Optional[str] = None) -> int:
+    """
+    Export every record to a file
+
+    Returns:
+        int: Number of records written
+    """
+    file_format = check_format(file_format or format_for_path(path))
+    count = 0
+
+    def counted(rows: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        nonlocal count
+        for row in rows:
+            count += 1
+            yield row
+
+    with open(path, "wb") as handle:
+        for chunk in _encode(counted(iter_strings({})), file_format):
+            handle.write(chunk)
+    return count
+
+def _parse_int(text: Optional[str]) -> Optional[int]:
+    """Integer cell, or None if it is empty or invalid"""
+    try:
+        return int(text)
+    except (TypeError, ValueError):
+        return None
+
+def _parse_bool(text: Optional[str]) -> Optional[bool]:
+    """true/false (or 1/0) cell, or None"""
+    return {"true": True, "false": False, "1": True, "0": False}.get((text or "").strip().lower())
+
+def _parse_json(text: Optional[str]) -> Optional[Dict[str, int]]:
+    """JSON object cell, or None"""
+    try:
+        value = json.loads(text)
+    except (TypeError, ValueError):
+        return None
+    return value if isinstance(value, dict) else None
+
+def _parse_datetime(text: Optional[str]) -> Optional[datetime]:
+    """ISO 8601 timestamp cell, or None"""
+    try:
+        return datetime.fromisoformat(text)
+    except (TypeError, ValueError):
+        return None
+
+# Parser per CSV column; unparseable cells become None
+CSV_PARSERS = {
+    "id": lambda text: text or None,
+    "value": lambda text: text,
+    "length": _parse_int,
+    "is_palindrome": _parse_bool,
+    "unique_characters": _parse_int,
+    "word_count": _parse_int,
+    "character_frequency_map": _parse_json,
+    "sha256_hash": lambda text: text or None,
+    "created_at": _parse_datetime,
+}
+
+def _read_csv(file: BinaryIO) -> Iterator[List[Dict[str, Any]]]:
+    """Parsed CSV records, IMPORT_BATCH_SIZE at a time"""
+    reader = csv.DictReader(io.TextIOWrapper(file, encoding="utf-8", errors="surrogatepass", newline=""))
+    if reader.fieldnames is None or "value" not in reader.fieldnames:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="CSV import needs a header row with a value column"
+        )
+    batch = []
+    for row in reader:
+        batch.append({column: parse(row.get(column)) for column, parse in CSV_PARSERS.items()})
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _read_arrow(file: BinaryIO, file_format: str) -> Iterator[List[Dict[str, Any]]]:
+    """Records from a Parquet file or Arrow IPC stream, IMPORT_BATCH_SIZE at a time"""
+    _load_pyarrow()
+    try:
+        if file_format == "parquet":
+            batches = pq.ParquetFile(file).iter_batches(batch_size=IMPORT_BATCH_SIZE)
+        else:
+            batches = pa.ipc.open_stream(file)
+        for batch in batches:
+            records = batch.to_pylist()
+            for record in records:
+                # Arrow maps come back as (key, value) pairs
+                if isinstance(record.get("character_frequency_map"), list):
+                    record["character_frequency_map"] = dict(record["character_frequency_map"])
+            yield records
+    except pa.ArrowException as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid {file_format} file: {str(e)}"
+        )
+
+def _verified_metrics(value: str, record: Dict[str, Any]) -> bool:
+    """
+    Whether a row's stored metrics can be stored as given for its value
+
+    Imports are not authenticated, so every metric must have the right type
+    and equal what analysis computes; each check is a single pass over the
+    value, so a verified row still skips hashing it into a new analysis.
+    """
+    length, unique_characters, word_count = (record.get(name) for name in ("length", "unique_characters", "word_count"))
+    counts = record.get("character_frequency_map")
+    if type(record.get("is_palindrome")) is not bool or not isinstance(counts, dict):
+        # type() rather than isinstance: True would pass as the integer 1
+        return False
+    if not all(type(number) is int for number in (length, unique_characters, word_count, *counts.values())):
+        return False
+    return (
+        length == len(value)
+        and unique_characters == len(set(value))
+        and word_count == len(value.split())
+        and counts == Counter(value.lower())
+        and record["is_palindrome"] == analyzer.analyze_string(value, ["is_palindrome"])["is_palindrome"]
+    )
+
+def _import_batch(records: List[Dict[str, Any]], summary: Dict[str, int]) -> None:
+    """Turn records into analyses, keeping verified metrics, and store them"""
+    analyses = []
+    reanalyze = []
+    now = datetime.now(timezone.utc)
+    for record in records:
+        value = record.get("value")
+        if not isinstance(value, str) or not value:
+            summary["invalid"] += 1
+            continue
+
+        analysis = {
+            "text": value,
+            "id": record.get("id") or None,
+            "created_at": _utc(record.get("created_at")) or now,
+        }
+        hash_value = analyzer.compute_sha256(value)
+        if record.get("sha256_hash") == hash_value and _verified_metrics(value, record):
+            analysis.update({name: record[name] for name in METRIC_COLUMNS}, sha256_hash=hash_value)
+            summary["verified"] += 1
+        else:
+            reanalyze.append(analysis)
+            summary["reanalyzed"] += 1
+        analyses.append(analysis)
+
+    for analysis, metrics in zip(reanalyze, analyzer.analyze_many([analysis["text"] for analysis in reanalyze])):
+        analysis.update(metrics)
+
+    if analyses:
+        for outcome in add_strings_bulk(analyses):
+            summary[outcome["status"]] += 1
+
+def import_file(file: BinaryIO, file_format: str) -> Dict[str, int]:
+    """
+    Import records from a file written by export (or any file with its columns)
+
+    Only value is required. Rows whose sha256_hash matches the value and
+    whose metrics pass _verified_metrics are stored without analysis; the
+    others are analyzed. Each IMPORT_BATCH_SIZE batch is committed on its own.
+
+    Args:
+        file: Binary file object (Parquet needs it to be seekable)
+        file_format: One of FORMATS
+
+    Returns:
+        Dict[str, int]: Counts of created, duplicate, verified, reanalyzed
+        and invalid rows
+
+    Raises:
+        HTTPException: 400 if the file cannot be read, see also check_format
+    """
+    check_format(file_format)
+    summary = {"created": 0, "duplicate": 0, "verified": 0, "reanalyzed": 0, "invalid": 0}
+    batches = _read_csv(file) if file_format == "csv" else _read_arrow(file, file_format)
+    try:
+        for records in batches:
+            _import_batch(records, summary)
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid {file_format} file: {str(e)}"
+        )
+    return summary
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    file_format = None
+    if "--format" in args:
+        position = args.index("--format")
+        file_format = args[position + 1]
+        del args[position:position + 2]
+
+    if len(args) != 2 or args[0] not in ("export", "import"):
+        print("Usage: python -m app.models.transfer export|import PATH [--format csv|parquet|arrow]")
+        sys.exit(2)
+
+    command, path = args
+    try:
+        if command == "export":
+            print(f"Exported {export_file(path, file_format)} records to {path}")
+        else:
+            from app.models.migrations import run_migrations
+            run_migrations()
+            with open(path, "rb") as handle:
+                summary = import_file(handle, check_format(file_format or format_for_path(path)))
+            print(", ".join(f"{key}: {value}" for key, value in summary.items()))
+    except HTTPException as e:
+        print(e.detail)
+        sys.exit(1)
@@ -1,10 +1,46 @@
 from app.utils.filters import parse_nlp_filter
-from fastapi import APIRouter, HTTPException, status, Body, Path, Query
+from fastapi import APIRouter, HTTPException, status, Depends, Path, Query, Request
+from anyio import to_thread
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Dict, Any, Optional, List
-from app.utils import analyzer
-from app.models.database import add_string, get_string_by_hash, get_all_strings, delete_string, StringRecord
+from sqlalchemy.orm import Session
+from typing import Dict, Any, Callable, Optional, Iterable, Iterator, List, Tuple
+from app.utils import analyzer, executor, ingest
+from app.models import transfer
+from app.utils.metrics import stage
+from app.utils.responses import FastJSONResponse, dumps, etag_matches, not_modified
+from app.db import get_db, pool_metrics, run_db
+from app.models.database import record_cache, add_string, add_strings_bulk, find_similar, get_record_columns, get_string_rows, get_stats, get_version, iter_strings, delete_string, row_frequency_map, StringRecord
 from hashlib import sha256
+import json
+import os
+import tempfile
+
+# Upper bound on the number of values accepted by the batch endpoint
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "10000"))
+
+# Page size limits for the list endpoint
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Longest accepted ?q= search query
+MAX_SEARCH_LENGTH = 200
+
+# Result limits for the similarity endpoint
+DEFAULT_SIMILAR_RESULTS = 10
+MAX_SIMILAR_RESULTS = 100
+
+# NDJSON lines sent per chunk when streaming; each chunk costs a thread hop
+STREAM_CHUNK_ROWS = 200
+
+# Import bodies larger than this are spooled to a temporary file
+IMPORT_SPOOL_SIZE = 64 * 1024 * 1024
+
+# A stored record never changes (its hash is its content), so clients and
+# proxies may keep it; responses derived from many records are revalidated
+# against the records version on every use
+RECORD_CACHE_CONTROL = os.getenv("HTTP_RECORD_CACHE_CONTROL", "public, max-age=31536000, immutable")
+VERSIONED_CACHE_CONTROL = "no-cache"
 
 # Pydantic models for request/response validation
 class StringAnalyzeRequest(BaseModel):
@@ -44,59 +80,545 @@ class StringAnalysisResponse(BaseModel):
 # Create router instance
 router = APIRouter(prefix="/strings", tags=["Strings"])
 
+
+# Response fields clients can select with ?fields=, and how to read each
+# one from a row's column values
+RECORD_FIELDS = {
+    "id": lambda row: row["id"],
+    "value": lambda row: row["value"],
+    "length": lambda row: row["length"],
+    "is_palindrome": lambda row: row["is_palindrome"],
+    "unique_characters": lambda row: row["unique_characters"],
+    "word_count": lambda row: row["word_count"],
+    "character_frequency_map": row_frequency_map,
+    "sha256_hash": lambda row: row["sha256_hash"],
+    "created_at": lambda row: row["created_at"].isoformat() if row["created_at"] else None,
+}
+
+# Fields of a full StringAnalysisResponse
+RESPONSE_FIELDS = list(StringAnalysisResponse.model_fields)
+
+
+def _record_to_response(record: StringRecord) -> StringAnalysisResponse:
+    """Build the API response model from a stored record"""
+    return StringAnalysisResponse(
+        id=record.id,
+        value=record.value,
+        length=record.length,
+        is_palindrome=record.is_palindrome,
+        unique_characters=record.unique_characters,
+        word_count=record.word_count,
+        character_frequency_map=record.frequency_map,
+        sha256_hash=record.sha256_hash
+    )
+
+
+def _row_to_dict(row: Dict[str, Any], fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Convert a row's column values to a JSON-serializable dictionary of the requested fields"""
+    return {field: RECORD_FIELDS[field](row) for field in (fields or RECORD_FIELDS)}
+
+
+def _ndjson_chunks(rows: Iterable[Dict[str, Any]], fields: Optional[List[str]]) -> Iterator[bytes]:
+    """Encode rows as NDJSON, STREAM_CHUNK_ROWS lines per chunk"""
+    lines = []
+    for row in rows:
+        lines.append(dumps(_row_to_dict(row, fields)))
+        if len(lines) >= STREAM_CHUNK_ROWS:
+            yield b"\n".join(lines) + b"\n"
+            lines = []
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+
+def _record_etag(hash_value: str, fields: Optional[List[str]]) -> str:
+    """Strong ETag of a record response: its hash, plus the field selection if any"""
+    if fields is None:
+        return f'"{hash_value}"'
+    return f'"{hash_value}.{sha256(",".join(fields).encode()).hexdigest()[:16]}"'
+
+
+def _version_etag(request: Request, version: int) -> str:
+    """ETag of a response computed from many records: the records version and the normalized query"""
+    query = sorted(request.query_params.multi_items())
+    digest = sha256(dumps([request.url.path, query])).hexdigest()[:16]
+    return f'"v{version}.{digest}"'
+
+
+def _versioned_read(request: Request, db: Session, read: Optional[Callable[..., Any]], *args: Any) -> Tuple[str, Any]:
+    """
+    Compute the version ETag and, unless If-None-Match matches it, run read(*args, db)
+    
+    Both happen in one run_db call, and the session is closed before it
+    returns: a request never holds a pooled connection while it waits for
+    another worker thread, which would let concurrent requests exhaust the pool.
+    
+    Args:
+        request: Request whose query and If-None-Match the ETag is checked against
+        db: Request-scoped session
+        read: Database function taking db as its last argument, or None for the ETag alone
+        *args: Arguments passed to read before db
+        
+    Returns:
+        Tuple[str, Any]: The ETag, and read's result (None when not modified)
+    """
+    try:
+        etag = _version_etag(request, get_version(db))
+        if read is None or etag_matches(request, etag):
+            return etag, None
+        # Timed under the read's own name, as a separate run_db call would be
+        with stage(read.__name__):
+            return etag, read(*args, db)
+    finally:
+        db.close()
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma-separated ?fields= projection, validating each name"""
+    if fields is None:
+        return None
+    
+    selected = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in selected if field not in RECORD_FIELDS]
+    if not selected or unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid fields; choose from: {', '.join(RECORD_FIELDS)}"
+        )
+    return selected
+
+
 @router.post("/", status_code=status.HTTP_201_CREATED)
-async def create_string_record(request: StringAnalyzeRequest):
+async def create_string_record(request: StringAnalyzeRequest, db: Session = Depends(get_db)):
     """
     Create a new string record with analysis
     
     - Validates input string through Pydantic model
     - Analyzes the string using analyzer utility
-    - Checks for duplicates using SHA256 hash
-    - Stores results in database
+    - Stores results in database with a single insert that skips
+      existing hashes, so concurrent duplicates cannot both succeed
     - Returns analyzed data with 201 Created status
+    
+    With WRITE_BEHIND enabled the record is queued instead and written in
+    a background batch; the response is 202 Accepted with the hash, whose
+    progress GET /strings/ingest/{sha256_hash} reports.
+    
+    Raises:
+        HTTPException: 409 if the string is already stored
+        HTTPException: 503 if the write-behind queue is full
     """
-    # Analyze the string
-    analysis = analyzer.analyze_string(request.value)
+    # Analyze the string (large inputs run in a worker process)
+    analysis = await executor.analyze(request.value)
+    
+    # Add analysis text field
+    analysis["text"] = request.value
+    
+    # Write-behind: acknowledge now, persist with the next batch
+    if ingest.WRITE_BEHIND:
+        await ingest.enqueue(analysis)
+        return FastJSONResponse(
+            {"status": "queued", "sha256_hash": analysis["sha256_hash"]},
+            status_code=status.HTTP_202_ACCEPTED
+        )
     
-    # Check for duplicate using hash
-    existing_record = get_string_by_hash(analysis["sha256_hash"])
-    if existing_record:
+    # Store the analysis in database; None means the hash already exists
+    record = await run_db(add_string, analysis, db)
+    if record is None:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="This string has already been analyzed and stored"
         )
     
-    # Add analysis text field
-    analysis["text"] = request.value
+    # Return success response with analyzed data
+    return _record_to_response(record)
+
+
+async def _read_batch_items(request: Request) -> List[Any]:
+    """
+    Read batch items from a JSON array or an NDJSON request body.
     
-    # Store the analysis in database
-    record = add_string(analysis)
+    A JSON body may be a bare array or an object with a "values" array.
+    NDJSON bodies (application/x-ndjson) hold one JSON value per line.
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
     
-    # Return success response with analyzed data
-    return StringAnalysisResponse(
-        id=record.id,
-        value=record.value,
-        length=record.length,
-        is_palindrome=record.is_palindrome,
-        unique_characters=record.unique_characters,
-        word_count=record.word_count,
-        character_frequency_map=record.character_frequency_map,
-        sha256_hash=record.sha256_hash
+    try:
+        if "ndjson" in content_type or "jsonlines" in content_type:
+            items = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            items = json.loads(body)
+            if isinstance(items, dict):
+                items = items.get("values")
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid batch body: {str(e)}"
+        )
+    
+    if not isinstance(items, list) or not items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Batch body must be a non-empty JSON array or NDJSON stream"
+        )
+    
+    if len(items) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch exceeds the maximum of {MAX_BATCH_SIZE} values"
+        )
+    
+    return items
+
+
+@router.post("/batch", response_model=Dict[str, Any])
+async def create_string_records_batch(request: Request, db: Session = Depends(get_db)):
+    """
+    Create many string records in one request.
+    
+    - Accepts a JSON array (or {"values": [...]}) or an NDJSON body
+    - Each item is either a string or an object with a "value" key
+    - Analyzes all valid items, then checks duplicates and inserts
+      new records in a single transaction
+    - Returns a per-item status: created, duplicate or error
+    """
+    items = await _read_batch_items(request)
+    
+    results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    values = []
+    positions = []
+    
+    # Collect every valid item
+    for index, item in enumerate(items):
+        value = item.get("value") if isinstance(item, dict) else item
+        if not isinstance(value, str) or not value:
+            results[index] = {
+                "index": index,
+                "status": "error",
+                "detail": "Item must be a non-empty string or an object with a non-empty 'value'"
+            }
+            continue
+        
+        values.append(value)
+        positions.append(index)
+    
+    # Analyze them together (large batches are spread across worker processes)
+    analyses = await executor.analyze_batch(values)
+    for value, analysis in zip(values, analyses):
+        analysis["text"] = value
+    
+    # Store all analyses in one transaction
+    if analyses:
+        for index, outcome in zip(positions, await run_db(add_strings_bulk, analyses, db)):
+            results[index] = {"index": index, **outcome}
+    
+    summary = {"created": 0, "duplicate": 0, "error": 0}
+    for result in results:
+        summary[result["status"]] += 1
+    
+    return {
+        "status": "success",
+        "count": len(results),
+        "summary": summary,
+        "results": results
+    }
+
+
+@router.post("/analyze-stream", response_model=Dict[str, Any])
+async def analyze_string_stream(request: Request):
+    """
+    Analyze a large UTF-8 request body without storing it.
+    
+    - Reads the raw body (e.g. curl --data-binary @file.log) chunk by chunk
+    - Updates every metric incrementally, so memory stays bounded
+      regardless of input size; each chunk is analyzed in a worker
+      thread, in order, so the event loop keeps serving other requests
+    - Returns the same metrics as stored records, without id or value
+    
+    Raises:
+        HTTPException: 400 if the body is empty or not valid UTF-8
+    """
+    stream_analyzer = analyzer.StreamAnalyzer()
+    try:
+        async for chunk in request.stream():
+            await to_thread.run_sync(stream_analyzer.update, chunk)
+        analysis = stream_analyzer.result()
+    except UnicodeDecodeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Body is not valid UTF-8: {str(e)}"
+        )
+    
+    if analysis["length"] == 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Body must not be empty"
+        )
+    
+    return analysis
+
+
+@router.get("/stats", response_model=Dict[str, Any])
+async def get_string_stats(request: Request, db: Session = Depends(get_db)):
+    """
+    Aggregate statistics across every stored string.
+    
+    - Totals, palindrome ratio and average length
+    - Length histogram in power-of-two buckets
+    - Word-count distribution and total occurrences per character
+    
+    Served from counters updated in the same transaction as each write,
+    so the cost does not grow with the number of stored strings. The ETag
+    follows the records version; If-None-Match gets a 304 until a write.
+    """
+    etag, stats = await run_db(_versioned_read, request, db, get_stats)
+    if etag_matches(request, etag):
+        return not_modified(etag, VERSIONED_CACHE_CONTROL)
+    
+    return FastJSONResponse(stats, headers={"ETag": etag, "Cache-Control": VERSIONED_CACHE_CONTROL})
+
+
+@router.get("/cache/stats", response_model=Dict[str, Any])
+async def get_cache_stats():
+    """Return hit, miss and eviction counters for the record lookup cache"""
+    return record_cache.stats()
+
+
+@router.get("/pool/stats", response_model=Dict[str, Any])
+async def get_pool_stats():
+    """Return checkout counts, wait times and occupancy for the database connection pool"""
+    return pool_metrics.stats()
+
+
+@router.get("/ingest/stats", response_model=Dict[str, Any])
+async def get_ingest_stats():
+    """Return depth, capacity and batching settings of the write-behind queue"""
+    return ingest.stats()
+
+
+@router.get("/ingest/{sha256_hash}", response_model=Dict[str, Any])
+async def get_ingest_status(
+    sha256_hash: str = Path(..., min_length=64, max_length=64, description="SHA-256 hash returned by POST /strings/"),
+    db: Session = Depends(get_db)
+):
+    """
+    Report whether a string accepted by POST /strings/ has been persisted.
+    
+    Status is "queued" while the record waits for its batch, "failed" if
+    its batch could not be written (resubmit it), and "persisted" once it
+    is stored. Queued and failed records are tracked per process.
+    
+    Raises:
+        HTTPException: 404 if the hash is neither queued nor stored
+    """
+    pending = ingest.pending_status(sha256_hash)
+    if pending is not None:
+        return {"sha256_hash": sha256_hash, **pending}
+    
+    if await run_db(get_record_columns, sha256_hash, db) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="String is neither queued nor stored"
+        )
+    return {"sha256_hash": sha256_hash, "status": "persisted"}
+
+
+@router.get("/by-hash/{sha256_hash}", response_model=StringAnalysisResponse)
+async def get_string_analysis_by_hash(
+    request: Request,
+    sha256_hash: str = Path(
+        ...,
+        pattern="^[0-9a-f]{64}$",
+        description="Lowercase hex SHA-256 hash of the stored string"
+    ),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. value,length"),
+    db: Session = Depends(get_db)
+):
+    """
+    Retrieve analysis for a stored string by its SHA-256 hash.
+    
+    Skips hashing and analysis entirely, so the cost is a single indexed
+    lookup. The ETag is the hash; a matching If-None-Match gets a 304
+    without touching the database.
+    
+    Raises:
+        HTTPException: 400 if fields names an unknown field
+        HTTPException: 404 if no string with this hash is stored
+    """
+    selected_fields = _parse_fields(fields)
+    etag = _record_etag(sha256_hash, selected_fields)
+    if etag_matches(request, etag):
+        return not_modified(etag, RECORD_CACHE_CONTROL)
+    
+    row = await run_db(get_record_columns, sha256_hash, db)
+    
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="String not found in database"
+        )
+    
+    return FastJSONResponse(
+        _row_to_dict(row, selected_fields or RESPONSE_FIELDS),
+        headers={"ETag": etag, "Cache-Control": RECORD_CACHE_CONTROL}
+    )
+
+
+@router.get("/filter-by-natural-language", response_model=Dict[str, Any])
+async def filter_nlp(
+    request: Request,
+    query: str = Query(..., description="Natural language filter, e.g. 'single word palindromic strings'"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum records per page"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. value,length"),
+    db: Session = Depends(get_db)
+):
+    """
+    Interpret natural language filter queries and return matching records.
+    Example: ?query=single word palindromic strings
+    
+    The parsed filters run through the same indexed, keyset-paginated
+    query as the list endpoint, with the same ETag revalidation.
+    
+    Raises:
+        HTTPException: 400 if the query cannot be interpreted
+        HTTPException: 422 if the parsed filters conflict
+    """
+    filters = parse_nlp_filter(query)
+    selected_fields = _parse_fields(fields)
+    
+    etag, page = await run_db(_versioned_read, request, db, get_string_rows, filters, limit, cursor, selected_fields)
+    if etag_matches(request, etag):
+        return not_modified(etag, VERSIONED_CACHE_CONTROL)
+    
+    rows, next_cursor = page
+    results_dict = [_row_to_dict(row, selected_fields) for row in rows]
+    
+    return FastJSONResponse({
+        "status": "success",
+        "interpreted_query": {
+            "original": query,
+            "parsed_filters": filters
+        },
+        "count": len(results_dict),
+        "next_cursor": next_cursor,
+        "results": results_dict
+    }, headers={"ETag": etag, "Cache-Control": VERSIONED_CACHE_CONTROL})
+
+
+@router.get("/similar", response_model=Dict[str, Any])
+async def get_similar_strings(
+    request: Request,
+    value: str = Query(..., min_length=1, description="String to find near-duplicates of"),
+    k: int = Query(DEFAULT_SIMILAR_RESULTS, ge=1, le=MAX_SIMILAR_RESULTS, description="Maximum number of results"),
+    min_similarity: float = Query(0.0, ge=0.0, le=1.0, description="Smallest Jaccard similarity to return"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. value,length"),
+    db: Session = Depends(get_db)
+):
+    """
+    Find the stored strings most similar to a value.
+    Example: ?value=Hello, World&k=5
+    
+    Similarity is the Jaccard similarity of lowercased 3-character
+    shingles. Candidates come from a MinHash LSH index maintained on every
+    insert and delete, so query time does not grow with the number of
+    stored strings; close matches (similarity above about 0.7) are almost
+    always found, distant ones may be missed.
+    
+    Raises:
+        HTTPException: 400 if fields names an unknown field
+    """
+    selected_fields = _parse_fields(fields)
+    
+    etag, rows = await run_db(_versioned_read, request, db, find_similar, value, k, min_similarity, selected_fields)
+    if etag_matches(request, etag):
+        return not_modified(etag, VERSIONED_CACHE_CONTROL)
+    
+    results = [
+        {**_row_to_dict(row, selected_fields), "similarity": row["similarity"]}
+        for row in rows
+    ]
+    
+    return FastJSONResponse({
+        "status": "success",
+        "query": value,
+        "count": len(results),
+        "results": results
+    }, headers={"ETag": etag, "Cache-Control": VERSIONED_CACHE_CONTROL})
+
+
+@router.get("/export")
+async def export_strings(
+    file_format: str = Query("csv", alias="format", description="csv, parquet or arrow (Arrow IPC stream)")
+):
+    """
+    Download every stored record as one file.
+    
+    - Streams CSV, Parquet or Arrow IPC, reading records in batches, so
+      memory use does not grow with the table
+    - The file can be loaded again with POST /strings/import
+    
+    Raises:
+        HTTPException: 400 for an unknown format, 501 if the format needs
+            pyarrow and it is not installed
+    """
+    # Sync iterator runs in the thread pool, one batch of records at a time
+    chunks = transfer.export_chunks(file_format)
+    return StreamingResponse(
+        chunks,
+        media_type=transfer.MEDIA_TYPES[file_format],
+        headers={"Content-Disposition": f'attachment; filename="strings.{file_format}"'}
     )
 
 
+@router.post("/import", response_model=Dict[str, Any])
+async def import_strings(
+    request: Request,
+    file_format: str = Query("csv", alias="format", description="csv, parquet or arrow (Arrow IPC stream)")
+):
+    """
+    Load records from a file produced by GET /strings/export.
+    
+    - Send the file as the raw request body (curl --data-binary @file)
+    - Rows whose sha256_hash matches their value and whose metrics agree
+      with it keep their stored id, created_at and metrics without being
+      analyzed again; other rows are analyzed
+    - Strings that are already stored are reported as duplicates
+    
+    Raises:
+        HTTPException: 400 if the file cannot be read, 501 if the format
+            needs pyarrow and it is not installed
+    """
+    transfer.check_format(file_format)
+    
+    # Spool the body (to disk once it is large); Parquet needs a seekable file
+    with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_SIZE) as body:
+        async for chunk in request.stream():
+            body.write(chunk)
+        body.seek(0)
+        summary = await run_db(transfer.import_file, body, file_format)
+    
+    return {"status": "success", "summary": summary}
+
+
 @router.get("/{string_value}", response_model=StringAnalysisResponse)
 async def get_string_analysis(
+    request: Request,
     string_value: str = Path(
         ...,
         min_length=1,
         description="The string to look up",
         example="Racecar"
-    )
+    ),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. value,length"),
+    db: Session = Depends(get_db)
 ):
     """
     Retrieve analysis for a previously stored string.
     
+    The response carries the string's hash as a strong ETag and may be
+    cached indefinitely; a request whose If-None-Match holds that ETag gets
+    a 304 before any database access.
+    
     Parameters:
         string_value (str): The string to look up in the database
         
@@ -104,46 +626,77 @@ async def get_string_analysis(
         StringAnalysisResponse: Complete analysis of the stored string
         
     Raises:
+        HTTPException: 400 if fields names an unknown field
         HTTPException: 404 if string not found in database
     """
-    # Compute hash for lookup
-    analysis = analyzer.analyze_string(string_value)
-    hash_value = analysis["sha256_hash"]
+    selected_fields = _parse_fields(fields)
+    
+    # Only the hash is needed for lookup
+    hash_value = analyzer.compute_sha256(string_value)
+    etag = _record_etag(hash_value, selected_fields)
+    if etag_matches(request, etag):
+        return not_modified(etag, RECORD_CACHE_CONTROL)
     
-    # Fetch record by hash
-    record = get_string_by_hash(hash_value)
+    # Fetch the record's column values by hash
+    row = await run_db(get_record_columns, hash_value, db)
     
     # Check result
-    if not record:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="String not found in database"
         )
     
-    # Return response
-    return StringAnalysisResponse(
-        id=record.id,
-        value=record.value,
-        length=record.length,
-        is_palindrome=record.is_palindrome,
-        unique_characters=record.unique_characters,
-        word_count=record.word_count,
-        character_frequency_map=record.character_frequency_map,
-        sha256_hash=record.sha256_hash
+    # Serialize straight from the stored values; they need no validation
+    return FastJSONResponse(
+        _row_to_dict(row, selected_fields or RESPONSE_FIELDS),
+        headers={"ETag": etag, "Cache-Control": RECORD_CACHE_CONTROL}
     )
 
 
+def _parse_min_char_counts(values: Optional[List[str]]) -> Optional[Dict[str, int]]:
+    """Parse repeated char:count query values into a {char: count} mapping"""
+    if not values:
+        return None
+    
+    counts = {}
+    for value in values:
+        character, _, count = value.rpartition(":")
+        if len(character) != 1 or not count.isdigit():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid min_char_count '{value}', expected char:count"
+            )
+        counts[character] = int(count)
+    return counts
+
+
 @router.get("/", response_model=Dict[str, Any])
 async def list_strings(
+    request: Request,
     is_palindrome: Optional[bool] = Query(None, description="Filter by palindrome status"),
     min_length: Optional[int] = Query(None, ge=0, description="Minimum string length"),
     max_length: Optional[int] = Query(None, ge=0, description="Maximum string length"),
     word_count: Optional[int] = Query(None, ge=0, description="Filter by word count"),
     contains_character: Optional[str] = Query(None, min_length=1, max_length=1, 
-                                           description="Filter by character presence")
+                                           description="Filter by character presence"),
+    contains_all: Optional[str] = Query(None, min_length=1, description="Every one of these characters must be present"),
+    contains_any: Optional[str] = Query(None, min_length=1, description="At least one of these characters must be present"),
+    min_char_count: Optional[List[str]] = Query(None, description="Minimum occurrences as char:count, e.g. e:3 (repeatable)"),
+    q: Optional[str] = Query(None, min_length=1, max_length=MAX_SEARCH_LENGTH,
+                             description='Substring search: every term must occur, "quoted phrases" kept together'),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum records per page"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor"),
+    stream: bool = Query(False, description="Stream every matching record as NDJSON instead of a page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. value,length"),
+    db: Session = Depends(get_db)
 ):
     """
-    Retrieve all string records with optional filters.
+    Retrieve string records with optional filters, one page at a time.
+    
+    Responses carry an ETag derived from the records version and the
+    query; If-None-Match with it gets a 304 until a string is created or
+    deleted, without running the query.
     
     Parameters:
         is_palindrome: Filter by palindrome status
@@ -151,11 +704,21 @@ async def list_strings(
         max_length: Maximum string length
         word_count: Filter by exact word count
         contains_character: Filter by character presence
+        contains_all: Require every listed character
+        contains_any: Require at least one listed character
+        min_char_count: Require a character to occur at least N times (char:N)
+        q: Case-insensitive substring search; results are ordered by relevance
+        limit: Maximum number of records per page
+        cursor: Continue after the page that returned this cursor
+        stream: Return all matching records as application/x-ndjson
+        fields: Comma-separated subset of record fields to return
         
     Returns:
-        Dict containing filtered results and metadata
+        Dict containing filtered results, metadata and next_cursor,
+        or an NDJSON stream with one record per line
         
     Raises:
+        HTTPException: 400 if the cursor, fields or a min_char_count value is invalid
         HTTPException: 500 if database operation fails
     """
     try:
@@ -165,36 +728,47 @@ async def list_strings(
             "max_length": max_length,
             "word_count": word_count,
             "contains_character": contains_character,
+            "contains_all": contains_all,
+            "contains_any": contains_any,
+            "min_character_counts": _parse_min_char_counts(min_char_count),
+            "search": (q or "").strip() or None,
         }
+        selected_fields = _parse_fields(fields)
+        
+        # Read the version before the rows: a write in between only makes the ETag older.
+        # A stream reads its rows in its own sessions, so only the version is read here.
+        read = None if stream else get_string_rows
+        etag, page = await run_db(_versioned_read, request, db, read, filters, limit, cursor, selected_fields)
+        if etag_matches(request, etag):
+            return not_modified(etag, VERSIONED_CACHE_CONTROL)
+        cache_headers = {"ETag": etag, "Cache-Control": VERSIONED_CACHE_CONTROL}
+        
+        if stream:
+            # Sync iterator runs in the thread pool, one chunk of rows at a time
+            rows = iter_strings(filters, cursor, selected_fields)
+            return StreamingResponse(
+                _ndjson_chunks(rows, selected_fields), media_type="application/x-ndjson", headers=cache_headers
+            )
 
-        results = get_all_strings(filters)
+        rows, next_cursor = page
         
-        # Convert SQLAlchemy objects to dictionaries
-        results_dict = [
-            {
-                "id": r.id,
-                "value": r.value,
-                "length": r.length,
-                "is_palindrome": r.is_palindrome,
-                "unique_characters": r.unique_characters,
-                "word_count": r.word_count,
-                "character_frequency_map": r.character_frequency_map,
-                "sha256_hash": r.sha256_hash,
-                "created_at": r.created_at.isoformat() if r.created_at else None
-            }
-            for r in results
-        ]
+        # Build response dictionaries straight from the selected columns
+        results_dict = [_row_to_dict(row, selected_fields) for row in rows]
         
         # Remove None values from filters
         applied_filters = {k: v for k, v in filters.items() if v is not None}
 
-        return {
+        # Trusted database values: skip response validation and encode with orjson
+        return FastJSONResponse({
             "status": "success",
             "filters_applied": applied_filters,
             "count": len(results_dict),
+            "next_cursor": next_cursor,
             "results": results_dict
-        }
+        }, headers=cache_headers)
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -203,36 +777,11 @@ async def list_strings(
 
 
 
-@router.get("/filter-by-natural-language")
-def filter_nlp(query: str):
-    """
-    Interpret natural language filter queries and return results.
-    Example: ?query=single word palindromic strings
-    """
-    filters = parse_nlp_filter(query)
-
-    # Here you would apply filters to your data source or DB
-    # For now, let's mock some filtered results:
-    mock_data = ["madam", "racecar", "deed", "hello", "zoom"]
-
-    result = []
-
-    for text in mock_data:
-        if filters.get("is_palindrome") and text != text[::-1]:
-            continue
-        if filters.get("contains_character") and filters["contains_character"] not in text:
-            continue
-        if filters.get("min_length") and len(text) < filters["min_length"]:
-            continue
-        if filters.get("word_count") and len(text.split()) != filters["word_count"]:
-            continue
-        result.append(text)
-
-    return {"filters": filters, "results": result}
-
-
 @router.delete("/{string_value}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_string_record(string_value: str = Path(..., min_length=1, description="The string to delete")):
+async def delete_string_record(
+    string_value: str = Path(..., min_length=1, description="The string to delete"),
+    db: Session = Depends(get_db)
+):
     """
     Delete a string record by its value.
     
@@ -246,12 +795,11 @@ async def delete_string_record(string_value: str = Path(..., min_length=1, descr
         HTTPException: 404 if string not found in database
         HTTPException: 500 if database operation fails
     """
-    # Compute hash for lookup
-    analysis = analyzer.analyze_string(string_value)
-    hash_value = analysis["sha256_hash"]
+    # Only the hash is needed for lookup
+    hash_value = analyzer.compute_sha256(string_value)
     
     # Attempt to delete the record
-    deleted = delete_string(hash_value)
+    deleted = await run_db(delete_string, hash_value, db)
     
     if not deleted:
         raise HTTPException(
@@ -22,6 +22,13 @@ const wordCountInput = document.getElementById('wordCount');
 const applyFiltersBtn = document.getElementById('applyFilters');
 const clearFiltersBtn = document.getElementById('clearFilters');
 const refreshHistoryBtn = document.getElementById('refreshHistory');
+const loadMoreBtn = document.getElementById('loadMore');
+
+// Pagination state
+const PAGE_SIZE = 50;
+let currentFilters = {};
+let nextCursor = null;
+let loadedItems = [];
 
 // Theme Management
 function initTheme() {
@@ -199,12 +206,22 @@ closeResults.addEventListener('click', () => {
 
 // Load History
 async function loadHistory(filters = {}) {
+    currentFilters = filters;
+    nextCursor = null;
+    loadedItems = [];
+    loadMoreBtn.style.display = 'none';
     historyLoading.style.display = 'block';
     emptyState.style.display = 'none';
     historyGrid.innerHTML = '<div class="loading" id="historyLoading"><i class="fas fa-spinner fa-spin"></i> Loading history...</div>';
     
+    await loadHistoryPage();
+}
+
+// Load the next page of history for the current filters
+async function loadHistoryPage() {
     try {
         // Build query params
+        const filters = currentFilters;
         const params = new URLSearchParams();
         if (filters.is_palindrome !== undefined) {
             params.append('is_palindrome', filters.is_palindrome);
@@ -218,8 +235,12 @@ async function loadHistory(filters = {}) {
         if (filters.word_count) {
             params.append('word_count', filters.word_count);
         }
+        params.append('limit', PAGE_SIZE);
+        if (nextCursor) {
+            params.append('cursor', nextCursor);
+        }
         
-        const url = `${API_BASE}/strings/${params.toString() ? '?' + params.toString() : ''}`;
+        const url = `${API_BASE}/strings/?${params.toString()}`;
         const response = await fetch(url);
         
         if (!response.ok) {
@@ -227,8 +248,12 @@ async function loadHistory(filters = {}) {
         }
         
         const data = await response.json();
-        displayHistory(data.results);
-        updateStats(data.results);
+        displayHistory(data.results, loadedItems.length > 0);
+        loadedItems = loadedItems.concat(data.results);
+        updateStats();
+        
+        nextCursor = data.next_cursor;
+        loadMoreBtn.style.display = nextCursor ? 'inline-flex' : 'none';
         
     } catch (error) {
         console.error('Error:', error);
@@ -242,10 +267,12 @@ async function loadHistory(filters = {}) {
 }
 
 // Display History
-function displayHistory(items) {
-    historyGrid.innerHTML = '';
+function displayHistory(items, append = false) {
+    if (!append) {
+        historyGrid.innerHTML = '';
+    }
     
-    if (items.length === 0) {
+    if (items.length === 0 && !append) {
         emptyState.style.display = 'block';
         return;
     }
@@ -282,12 +309,19 @@ function displayHistory(items) {
 }
 
 // Update Stats
-function updateStats(items) {
-    const totalAnalyzed = items.length;
-    const palindromeCount = items.filter(item => item.is_palindrome).length;
-    
-    document.getElementById('totalAnalyzed').textContent = totalAnalyzed;
-    document.getElementById('palindromeCount').textContent = palindromeCount;
+async function updateStats() {
+    try {
+        const response = await fetch(`${API_BASE}/strings/stats`);
+        if (!response.ok) {
+            throw new Error('Failed to load stats');
+        }
+        const stats = await response.json();
+        
+        document.getElementById('totalAnalyzed').textContent = stats.total_strings;
+        document.getElementById('palindromeCount').textContent = stats.palindromes;
+    } catch (error) {
+        console.error('Error:', error);
+    }
 }
 
 // Delete String
@@ -349,6 +383,13 @@ clearFiltersBtn.addEventListener('click', () => {
     showToast('Filters cleared');
 });
 
+// Load More History
+loadMoreBtn.addEventListener('click', async () => {
+    loadMoreBtn.disabled = true;
+    await loadHistoryPage();
+    loadMoreBtn.disabled = false;
+});
+
 // Refresh History
 refreshHistoryBtn.addEventListener('click', () => {
     loadHistory();
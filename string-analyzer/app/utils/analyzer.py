@@ -1,8 +1,44 @@
 from collections import Counter
+from functools import lru_cache
+from typing import BinaryIO, Iterable, List, Optional, Union
+import codecs
 import hashlib
 import string
 
-def analyze_string(text: str) -> dict:
+try:
+    import numpy as np
+except ImportError:  # optional: analyze_many falls back to analyze_string
+    np = None
+
+# Modulus for the rolling palindrome hashes (Mersenne prime 2**127 - 1)
+PALINDROME_HASH_MODULUS = (1 << 127) - 1
+
+# Bytes read per chunk by analyze_file
+FILE_CHUNK_SIZE = 1 << 20
+
+# Strings per vectorized block in analyze_many
+VECTOR_BLOCK_SIZE = 2048
+
+def compute_sha256(text: str) -> str:
+    """Return the SHA-256 hex digest of the UTF-8 encoded text"""
+    return hashlib.sha256(text.encode()).hexdigest()
+
+def _is_palindrome(text: str) -> bool:
+    """Palindrome check ignoring case and non-alphanumeric characters"""
+    cleaned = ''.join(ch.lower() for ch in text if ch.isalnum())
+    return cleaned == cleaned[::-1]
+
+# Metric name -> function computing it; analyze_string returns them in this order
+METRICS = {
+    "length": len,
+    "is_palindrome": _is_palindrome,
+    "unique_characters": lambda text: len(set(text)),
+    "word_count": lambda text: len(text.split()),
+    "sha256_hash": compute_sha256,
+    "character_frequency_map": lambda text: dict(Counter(text.lower())),
+}
+
+def analyze_string(text: str, metrics: Optional[Iterable[str]] = None) -> dict:
     """
     Analyze a string and return key metrics:
     - length
@@ -11,41 +47,253 @@ def analyze_string(text: str) -> dict:
     - word_count
     - sha256_hash
     - character_frequency_map
+
+    Pass metrics to compute only the named subset; each metric is
+    computed independently, so skipped ones cost nothing.
     """
+    if metrics is None:
+        metrics = METRICS
+    
+    unknown = set(metrics) - METRICS.keys()
+    if unknown:
+        raise ValueError(f"Unknown metrics: {', '.join(sorted(unknown))}")
 
-    # --- 1️⃣ Basic properties ---
+    return {name: METRICS[name](text) for name in METRICS if name in metrics}
 
-    length = len(text)
-    words = text.split()
-    word_count = len(words)
-    unique_characters = set(text)
-    
-    # --- 2️⃣ Palindrome check (normalized) ---
-    cleaned = ''.join(ch.lower() for ch in text if ch.isalnum())
-    is_palindrome = cleaned == cleaned[::-1]
+def analyze_many(texts: List[str]) -> List[dict]:
+    """
+    Analyze a batch of strings; results equal [analyze_string(t) for t in texts].
+
+    With NumPy installed, ASCII strings are packed into one code-point
+    buffer with offsets, and unique characters, word counts and palindrome
+    status are computed for the whole batch at once. Frequency maps stay
+    on Counter, which builds the output dicts faster than converting
+    histogram rows and keeps their key order. Strings with non-ASCII
+    characters (whose case mapping can change length or depend on
+    context) and installs without NumPy use analyze_string.
+    """
+    if np is None:
+        return [analyze_string(text) for text in texts]
 
-    # --- 3️⃣ SHA256 hash ---
-    sha256_hash = hashlib.sha256(text.encode()).hexdigest()
+    results: List[Optional[dict]] = [None] * len(texts)
+    ascii_positions = []
+    for position, text in enumerate(texts):
+        if text.isascii():
+            ascii_positions.append(position)
+        else:
+            results[position] = analyze_string(text)
 
-    # --- 4️⃣ Character frequency map ---
-    character_frequency_map = dict(Counter(text.lower()))
-    
-    # --- 5️⃣ Bundle results ---
-    result = {
-        "length": length,
-        "is_palindrome": is_palindrome,
-        "unique_characters": len(unique_characters),
-        "word_count": word_count,
-        "sha256_hash": sha256_hash,
-        "character_frequency_map": character_frequency_map
-    }
-    return result
+    if ascii_positions:
+        batch = [texts[position] for position in ascii_positions]
+        for position, result in zip(ascii_positions, _analyze_ascii_batch(batch)):
+            results[position] = result
+    return results
+
+if np is not None:
+    # Per-code-point lookup tables for ASCII
+    _ASCII_SPACE = np.array([chr(c).isspace() for c in range(128)])
+    _ASCII_ALNUM = np.array([chr(c).isalnum() for c in range(128)])
+    _ASCII_LOWER = np.array([ord(chr(c).lower()) for c in range(128)], dtype=np.int64)
+
+def _segment_ids(lengths):
+    """Index of the owning string for every position of a packed buffer"""
+    return np.repeat(np.arange(len(lengths)), lengths)
+
+def _analyze_ascii_batch(texts: List[str]) -> List[dict]:
+    """Vectorized analyze_string for lists of ASCII strings"""
+    results = []
+    for start in range(0, len(texts), VECTOR_BLOCK_SIZE):
+        results.extend(_analyze_ascii_block(texts[start:start + VECTOR_BLOCK_SIZE]))
+    return results
+
+def _analyze_ascii_block(texts: List[str]) -> List[dict]:
+    """Analyze one block of ASCII strings (bounds the per-string 128-bin histograms)"""
+    count = len(texts)
+    codes = np.frombuffer("".join(texts).encode("ascii"), dtype=np.uint8).astype(np.intp)
+    lengths = np.fromiter(map(len, texts), dtype=np.intp, count=count)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    owner = _segment_ids(lengths)
+    cells = count * 128
+
+    # Unique characters: non-empty bins of the case-sensitive histogram
+    histogram = np.bincount(owner * 128 + codes, minlength=cells).reshape(count, 128)
+    unique_characters = np.count_nonzero(histogram, axis=1).tolist()
+
+    # Word count: non-space characters at the start of a string or after a space
+    is_space = _ASCII_SPACE[codes]
+    after_space = np.ones(len(codes), dtype=bool)
+    after_space[1:] = is_space[:-1]
+    after_space[starts[lengths > 0]] = True
+    word_count = np.bincount(owner[~is_space & after_space], minlength=count).tolist()
+
+    # Palindrome: compare each normalized character with its mirror in the same string
+    alnum = _ASCII_ALNUM[codes]
+    cleaned = _ASCII_LOWER[codes[alnum]]
+    cleaned_lengths = np.bincount(owner[alnum], minlength=count)
+    cleaned_starts = np.concatenate(([0], np.cumsum(cleaned_lengths)[:-1]))
+    cleaned_owner = _segment_ids(cleaned_lengths)
+    mirror = 2 * cleaned_starts[cleaned_owner] + cleaned_lengths[cleaned_owner] - 1 - np.arange(len(cleaned))
+    mismatches = np.bincount(cleaned_owner[cleaned != cleaned[mirror]], minlength=count).tolist()
+
+    sha256 = hashlib.sha256
+    return [
+        {
+            "length": len(text),
+            "is_palindrome": not mismatch,
+            "unique_characters": unique,
+            "word_count": words,
+            "sha256_hash": sha256(text.encode()).hexdigest(),
+            "character_frequency_map": dict(Counter(text.lower())),
+        }
+        for text, mismatch, unique, words in zip(texts, mismatches, unique_characters, word_count)
+    ]
+
+def _hash_digits(text: str) -> int:
+    """Read text as a base-2**32 number (one digit per code point), reduced for hashing"""
+    return int.from_bytes(text.encode("utf-32-be"), "big") % PALINDROME_HASH_MODULUS
+
+@lru_cache(maxsize=None)
+def _case_ignorable(ch: str) -> bool:
+    """Whether str.lower skips ch when looking at the letters around a capital sigma"""
+    # A sigma after a cased letter is final and one after a digit is not;
+    # between the two results only when ch is skipped
+    return ("A" + ch + "Σ").lower()[-1] == "ς" and ("1" + ch + "Σ").lower()[-1] == "σ"
+
+def _last_context(text: str, end: int) -> int:
+    """Index of the last character before end that is not case-ignorable, or -1"""
+    position = end - 1
+    while position >= 0 and _case_ignorable(text[position]):
+        position -= 1
+    return position
+
+class StreamAnalyzer:
+    """
+    Single-pass analyzer for inputs too large to hold in memory.
+
+    Feed chunks with update() and call result() at the end; the result
+    has the same keys and values as analyze_string on the whole text.
+    Memory is bounded by the chunk size plus the character alphabet.
+
+    The palindrome check compares a forward and a reverse polynomial hash
+    of the normalized characters (each code point is one base-2**32 digit,
+    reduced modulo a 127-bit prime), so no reversed copy is ever built.
+
+    str.lower turns a capital sigma into final ς or σ depending on the
+    letters on both sides of it, so each chunk is lowercased after the last
+    non-case-ignorable character before it, and a chunk's trailing sigma is
+    held back until the next such character arrives.
+    """
+
+    def __init__(self):
+        self._sha256 = hashlib.sha256()
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._frequencies = Counter()
+        self._unique = set()
+        self._length = 0
+        self._word_count = 0
+        self._in_word = False
+        self._forward = 0
+        self._reverse = 0
+        self._cleaned_length = 0
+        # Last non-case-ignorable character lowercased so far, and a held-back sigma
+        self._lower_context = ""
+        self._pending_sigma = ""
+
+    def update(self, chunk: Union[str, bytes]) -> None:
+        """Add the next chunk of text (str, or UTF-8 bytes split anywhere)"""
+        if isinstance(chunk, str):
+            self._sha256.update(chunk.encode())
+        else:
+            self._sha256.update(chunk)
+            chunk = self._decoder.decode(chunk)
+        if not chunk:
+            return
+
+        self._length += len(chunk)
+        self._unique.update(chunk)
+        self._count_lowercase(chunk)
+
+        # A word continuing across the chunk boundary is only counted once
+        words = len(chunk.split())
+        if self._in_word and not chunk[0].isspace():
+            words -= 1
+        self._word_count += words
+        self._in_word = not chunk[-1].isspace()
+
+        # Extend forward and reverse hashes of the normalized text
+        cleaned = ''.join(map(str.lower, filter(str.isalnum, chunk)))
+        if cleaned:
+            modulus = PALINDROME_HASH_MODULUS
+            self._forward = (self._forward * pow(2, 32 * len(cleaned), modulus) + _hash_digits(cleaned)) % modulus
+            self._reverse = (_hash_digits(cleaned[::-1]) * pow(2, 32 * self._cleaned_length, modulus) + self._reverse) % modulus
+            self._cleaned_length += len(cleaned)
+
+    def _count_lowercase(self, chunk: str) -> None:
+        """Add the lowercase characters of chunk to the frequency map"""
+        text = self._pending_sigma + chunk
+        last = _last_context(text, len(text))
+        if last < 0:
+            # Only case-ignorable characters, whose lowercase needs no context
+            self._frequencies.update(text.lower())
+            return
+
+        context = self._lower_context
+        if text[last] != "Σ":
+            self._frequencies.update((context + text).lower()[len(context.lower()):] if "Σ" in text else text.lower())
+            self._lower_context, self._pending_sigma = text[last], ""
+            return
+
+        # Lower the text before the trailing sigma with the sigma as its right context
+        self._frequencies.update((context + text[:last + 1]).lower()[len(context.lower()):-1])
+        self._frequencies.update(text[last + 1:].lower())
+        before = _last_context(text, last)
+        if before >= 0:
+            self._lower_context = text[before]
+        self._pending_sigma = "Σ"
+
+    def result(self) -> dict:
+        """Metrics for everything fed so far, in analyze_string's format"""
+        # Raises UnicodeDecodeError if the bytes ended mid-character
+        self._decoder.decode(b"", final=True)
+        frequencies = self._frequencies
+        if self._pending_sigma:
+            # Nothing cased follows the held-back sigma
+            context = self._lower_context
+            frequencies = Counter(frequencies)
+            frequencies.update((context + self._pending_sigma).lower()[len(context.lower()):])
+        return {
+            "length": self._length,
+            "is_palindrome": self._forward == self._reverse,
+            "unique_characters": len(self._unique),
+            "word_count": self._word_count,
+            "sha256_hash": self._sha256.hexdigest(),
+            "character_frequency_map": dict(frequencies),
+        }
+
+def analyze_stream(chunks: Iterable[Union[str, bytes]]) -> dict:
+    """Analyze an iterable of text or UTF-8 byte chunks in a single pass"""
+    stream_analyzer = StreamAnalyzer()
+    for chunk in chunks:
+        stream_analyzer.update(chunk)
+    return stream_analyzer.result()
+
+def analyze_file(file: Union[str, BinaryIO], chunk_size: int = FILE_CHUNK_SIZE) -> dict:
+    """Analyze a UTF-8 file (path or binary file object) chunk by chunk"""
+    if isinstance(file, str):
+        with open(file, "rb") as handle:
+            return analyze_file(handle, chunk_size)
+    return analyze_stream(iter(lambda: file.read(chunk_size), b""))
 
 # Test the function with some example text
 if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1:
+        # python -m app.utils.analyzer <path> streams a file through StreamAnalyzer
+        print(analyze_file(sys.argv[1]))
+        sys.exit()
     test_string = "Hello World!"
     result = analyze_string(test_string)
     print("\nAnalyzing string:", test_string)
     print("\nResults:")
     for key, value in result.items():
-        print(f"{key}: {value}")
\ No newline at end of file
+        print(f"{key}: {value}")
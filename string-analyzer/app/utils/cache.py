@@ -0,0 +1,211 @@
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+import base64
+import json
+import threading
+import time
+
+# Version counters of the local cache; a key shares its counter with about
+# 1/VERSION_STRIPES of the other keys, so a delete rarely discards other reads
+VERSION_STRIPES = 4096
+
+# Lifetime of a key's version in Redis, far longer than any read can take
+VERSION_TTL_SECONDS = 3600
+
+# Store a value only if its key's version is still the one read before the lookup
+SET_IF_VERSION_SCRIPT = """
+if (redis.call('GET', KEYS[1]) or '0') == ARGV[1] then
+    redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+end
+"""
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU cache with a per-entry TTL.
+
+    Deleting a key bumps its version; set() ignores values read before
+    that, so a slow reader cannot re-cache a removed record. Versions are
+    kept in VERSION_STRIPES counters shared by hash, so memory stays bounded.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._versions = [0] * VERSION_STRIPES
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def version(self, key: str) -> int:
+        """Current invalidation version of key, to pass back to set()"""
+        return self._versions[hash(key) % VERSION_STRIPES]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: Dict[str, Any], version: Optional[int] = None) -> None:
+        with self._lock:
+            if version is not None and version != self._versions[hash(key) % VERSION_STRIPES]:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._versions[hash(key) % VERSION_STRIPES] += 1
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._versions = [version + 1 for version in self._versions]
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "local",
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+class RedisCache:
+    """
+    Shared cache backed by any Redis-compatible client (get, set with ex,
+    delete, pipelines and Lua scripts). Values are stored as JSON; expiry
+    and eviction are handled by the server.
+
+    Each key has an INCR counter under version_prefix, bumped by delete();
+    set() stores a value in a Lua script only while the counter still
+    holds the version read before the lookup, in any worker.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        ttl: float,
+        prefix: str = "string-analyzer:record:",
+        version_prefix: str = "string-analyzer:record-version:"
+    ):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.version_prefix = version_prefix
+        self._set_if_version = client.register_script(SET_IF_VERSION_SCRIPT)
+        self.hits = 0
+        self.misses = 0
+
+    def version(self, key: str) -> int:
+        """Current invalidation version of key, to pass back to set()"""
+        return int(self.client.get(self.version_prefix + key) or 0)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw, object_hook=_decode_values)
+
+    def set(self, key: str, value: Dict[str, Any], version: Optional[int] = None) -> None:
+        encoded = json.dumps(value, default=_encode_value)
+        if version is None:
+            self.client.set(self.prefix + key, encoded, ex=max(1, int(self.ttl)))
+            return
+        self._set_if_version(
+            keys=[self.version_prefix + key, self.prefix + key],
+            args=[str(version), encoded, max(1, int(self.ttl))]
+        )
+
+    def delete(self, key: str) -> None:
+        # Bump the version and drop the value in one transaction
+        pipeline = self.client.pipeline()
+        pipeline.incr(self.version_prefix + key)
+        pipeline.expire(self.version_prefix + key, VERSION_TTL_SECONDS)
+        pipeline.delete(self.prefix + key)
+        pipeline.execute()
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(f"{self.prefix}*"):
+            self.client.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "redis",
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": None,
+        }
+
+class NullCache:
+    """Cache stand-in used when caching is disabled"""
+
+    def version(self, key: str) -> int:
+        return 0
+
+    def get(self, key: str) -> None:
+        return None
+
+    def set(self, key: str, value: Dict[str, Any], version: Optional[int] = None) -> None:
+        pass
+
+    def delete(self, key: str) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "disabled"}
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, bytes):
+        return {"__bytes__": base64.b64encode(value).decode()}
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+def _decode_values(obj: Dict[str, Any]) -> Any:
+    if "__datetime__" in obj:
+        return datetime.fromisoformat(obj["__datetime__"])
+    if "__bytes__" in obj:
+        return base64.b64decode(obj["__bytes__"])
+    return obj
+
+def create_cache(max_size: int, ttl: float, url: Optional[str] = None):
+    """
+    Build the configured cache backend.
+
+    Args:
+        max_size: Maximum local entries; 0 disables caching
+        ttl: Entry lifetime in seconds
+        url: Optional redis:// URL for a cache shared between workers
+             (requires the redis package)
+    """
+    if max_size <= 0:
+        return NullCache()
+    if url:
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RECORD_CACHE_URL is set but the redis package is not installed")
+        return RedisCache(redis.Redis.from_url(url), ttl)
+    return LRUCache(max_size, ttl)
@@ -0,0 +1,89 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional
+from app.utils.analyzer import analyze_many, analyze_string
+from app.utils.metrics import stage
+import asyncio
+import multiprocessing
+import os
+
+# Worker processes for CPU-heavy analysis (defaults to one per core)
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", str(os.cpu_count() or 1)))
+
+# Strings at least this long are analyzed in a worker process
+ANALYSIS_OFFLOAD_CHARS = int(os.getenv("ANALYSIS_OFFLOAD_CHARS", "100000"))
+
+# Batches with at least this many strings, or ANALYSIS_OFFLOAD_CHARS characters
+# in total, are split across worker processes
+ANALYSIS_OFFLOAD_BATCH = int(os.getenv("ANALYSIS_OFFLOAD_BATCH", "500"))
+
+# Most strings, and characters, per task when a batch is dispatched to the pool
+# (a string longer than ANALYSIS_CHUNK_CHARS is a task of its own)
+ANALYSIS_CHUNK_SIZE = int(os.getenv("ANALYSIS_CHUNK_SIZE", "250"))
+ANALYSIS_CHUNK_CHARS = int(os.getenv("ANALYSIS_CHUNK_CHARS", "1000000"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+def get_pool() -> ProcessPoolExecutor:
+    """Create the process pool on first use"""
+    global _pool
+    if _pool is None:
+        # spawn avoids forking a process that already runs threads
+        _pool = ProcessPoolExecutor(
+            max_workers=ANALYSIS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+def shutdown_pool() -> None:
+    """Stop the worker processes, if they were started"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+def _chunks(texts: List[str]) -> Iterator[List[str]]:
+    """Split texts, in order, into tasks within ANALYSIS_CHUNK_SIZE and ANALYSIS_CHUNK_CHARS"""
+    chunk: List[str] = []
+    chars = 0
+    for text in texts:
+        if chunk and (len(chunk) >= ANALYSIS_CHUNK_SIZE or chars + len(text) > ANALYSIS_CHUNK_CHARS):
+            yield chunk
+            chunk, chars = [], 0
+        chunk.append(text)
+        chars += len(text)
+    if chunk:
+        yield chunk
+
+def _analyze_chunk(texts: List[str]) -> List[dict]:
+    """Worker task: analyze a chunk of strings"""
+    return analyze_many(texts)
+
+async def analyze(text: str) -> dict:
+    """
+    Analyze one string, in a worker process when it is large.
+    Small strings are analyzed inline, where IPC would cost more than it saves.
+    """
+    with stage("analyze"):
+        if ANALYSIS_WORKERS <= 1 or len(text) < ANALYSIS_OFFLOAD_CHARS:
+            return analyze_string(text)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_pool(), analyze_string, text)
+
+async def analyze_batch(texts: List[str]) -> List[dict]:
+    """
+    Analyze many strings, fanning chunks out across worker processes once
+    the batch reaches ANALYSIS_OFFLOAD_BATCH strings or ANALYSIS_OFFLOAD_CHARS
+    characters, so a few huge strings do not block the event loop either.
+    Results keep input order.
+    """
+    with stage("analyze"):
+        if ANALYSIS_WORKERS <= 1 or (
+            len(texts) < ANALYSIS_OFFLOAD_BATCH and sum(map(len, texts)) < ANALYSIS_OFFLOAD_CHARS
+        ):
+            return _analyze_chunk(texts)
+
+        loop = asyncio.get_running_loop()
+        pool = get_pool()
+        chunks = list(_chunks(texts))
+        results = await asyncio.gather(*(loop.run_in_executor(pool, _analyze_chunk, chunk) for chunk in chunks))
+        return [analysis for chunk_results in results for analysis in chunk_results]
@@ -1,39 +1,153 @@
 from fastapi import HTTPException, status
+from functools import lru_cache
+from typing import Any, Dict, Tuple
+import re
 
-def parse_nlp_filter(query: str) -> dict:
-    if not query:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Empty query")
+# Number words accepted wherever a count is expected
+NUMBER_WORDS = {
+    "zero": 0, "one": 1, "single": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+}
+NUMBER = r"(\d+|" + "|".join(NUMBER_WORDS) + r")"
+CHARS = r"(?:characters?|chars?|letters?)"
+WORDS = r"[\s-]*words?\b"
+NOT_WORDS = rf"(?!{WORDS})"
+
+# Ordinal vowels, e.g. "containing the first vowel"
+VOWEL_ORDINALS = {"first": "a", "second": "e", "third": "i", "fourth": "o", "fifth": "u"}
+
+NOT_PALINDROME_RE = re.compile(r"\b(?:non-?|not\s+)palindrom\w*")
+PALINDROME_RE = re.compile(r"\bpalindrom\w*")
+EXACT_WORDS_RE = re.compile(rf"\b(?:exactly\s+)?{NUMBER}{WORDS}")
+BETWEEN_WORDS_RE = re.compile(rf"\bbetween\s+{NUMBER}\s+and\s+{NUMBER}{WORDS}")
+MORE_WORDS_RE = re.compile(rf"\b(?:longer|more)\s+than\s+{NUMBER}{WORDS}")
+FEWER_WORDS_RE = re.compile(rf"\b(?:shorter|fewer|less)\s+than\s+{NUMBER}{WORDS}")
+AT_LEAST_WORDS_RE = re.compile(rf"\b(?:at\s+least|minimum(?:\s+of)?)\s+{NUMBER}{WORDS}")
+AT_MOST_WORDS_RE = re.compile(rf"\b(?:at\s+most|maximum(?:\s+of)?|up\s+to)\s+{NUMBER}{WORDS}")
+# Length comparisons take a character unit or none; "more than 2 words" is a word count
+BETWEEN_RE = re.compile(rf"\bbetween\s+{NUMBER}\s+and\s+{NUMBER}{NOT_WORDS}\s*{CHARS}?")
+LONGER_RE = re.compile(rf"\b(?:longer|more)\s+than\s+{NUMBER}{NOT_WORDS}")
+SHORTER_RE = re.compile(rf"\b(?:shorter|fewer|less)\s+than\s+{NUMBER}{NOT_WORDS}")
+AT_LEAST_RE = re.compile(rf"\b(?:at\s+least|minimum(?:\s+of)?)\s+{NUMBER}\s*{CHARS}")
+AT_MOST_RE = re.compile(rf"\b(?:at\s+most|maximum(?:\s+of)?|up\s+to)\s+{NUMBER}\s*{CHARS}")
+EXACT_LENGTH_RE = re.compile(rf"\b(?:exactly\s+{NUMBER}\s*{CHARS}|(?:of\s+)?length\s+(?:of\s+)?{NUMBER})")
+CONTAINS_VOWEL_RE = re.compile(r"\bcontain\w*\s+the\s+(first|second|third|fourth|fifth)\s+vowel")
+CONTAINS_RE = re.compile(r"\b(?:contain\w*|with|having|has)\s+(?:the\s+|an?\s+)?(?:letter|character|char)\s+['\"]?(\S)['\"]?")
 
-    query = query.lower()
-    filters = {}
+def _number(token: str) -> int:
+    return NUMBER_WORDS[token] if token in NUMBER_WORDS else int(token)
+
+def _invalid(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+@lru_cache(maxsize=1024)
+def _parse(query: str) -> Tuple[Tuple[str, Any], ...]:
+    """Parse a normalized query; results are cached as immutable tuples"""
+    filters: Dict[str, Any] = {}
 
     # Detect palindromes
-    if "palindromic" in query:
+    if NOT_PALINDROME_RE.search(query):
+        filters["is_palindrome"] = False
+    elif PALINDROME_RE.search(query):
         filters["is_palindrome"] = True
 
-    # Detect word count
-    if "single word" in query or "one word" in query:
-        filters["word_count"] = 1
+    # Detect word count: a range when compared, otherwise exact
+    match = BETWEEN_WORDS_RE.search(query)
+    if match:
+        filters["min_word_count"] = _number(match.group(1))
+        filters["max_word_count"] = _number(match.group(2))
+
+    match = MORE_WORDS_RE.search(query)
+    if match:
+        filters["min_word_count"] = _number(match.group(1)) + 1
+
+    match = FEWER_WORDS_RE.search(query)
+    if match:
+        filters["max_word_count"] = _number(match.group(1)) - 1
+
+    match = AT_LEAST_WORDS_RE.search(query)
+    if match:
+        filters["min_word_count"] = _number(match.group(1))
+
+    match = AT_MOST_WORDS_RE.search(query)
+    if match:
+        filters["max_word_count"] = _number(match.group(1))
+
+    if "min_word_count" not in filters and "max_word_count" not in filters:
+        match = EXACT_WORDS_RE.search(query)
+        if match:
+            filters["word_count"] = _number(match.group(1))
 
     # Detect length
-    if "longer than" in query:
-        try:
-            num = int(query.split("longer than")[1].split()[0])
-            filters["min_length"] = num + 1
-        except:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid length format")
-
-    # Detect 'containing the letter'
-    if "containing the letter" in query:
-        letter = query.split("containing the letter")[-1].strip().split()[0]
-        filters["contains_character"] = letter
+    match = BETWEEN_RE.search(query)
+    if match:
+        filters["min_length"] = _number(match.group(1))
+        filters["max_length"] = _number(match.group(2))
+
+    match = LONGER_RE.search(query)
+    if match:
+        filters["min_length"] = _number(match.group(1)) + 1
+
+    match = SHORTER_RE.search(query)
+    if match:
+        filters["max_length"] = _number(match.group(1)) - 1
+
+    match = AT_LEAST_RE.search(query)
+    if match:
+        filters["min_length"] = _number(match.group(1))
+
+    match = AT_MOST_RE.search(query)
+    if match:
+        filters["max_length"] = _number(match.group(1))
+
+    match = EXACT_LENGTH_RE.search(query)
+    if match:
+        filters["min_length"] = filters["max_length"] = _number(match.group(1) or match.group(2))
+
+    # Detect character presence
+    match = CONTAINS_VOWEL_RE.search(query)
+    if match:
+        filters["contains_character"] = VOWEL_ORDINALS[match.group(1)]
+    else:
+        match = CONTAINS_RE.search(query)
+        if match:
+            filters["contains_character"] = match.group(1)
 
     # Basic validation
     if not filters:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Could not interpret query")
+        raise _invalid("Could not interpret query")
 
-    # Example of conflicting filters (if any)
+    # Conflicting filters
+    if filters.get("max_length") is not None and filters["max_length"] < 0:
+        raise _invalid("Invalid length format")
+    if filters.get("max_word_count") is not None and filters["max_word_count"] < 0:
+        raise _invalid("Invalid word count format")
+    if "min_length" in filters and "max_length" in filters and filters["min_length"] > filters["max_length"]:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Conflicting filters")
+    if (
+        "min_word_count" in filters and "max_word_count" in filters
+        and filters["min_word_count"] > filters["max_word_count"]
+    ):
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Conflicting filters")
     if "min_length" in filters and filters.get("word_count") == 1 and filters["min_length"] > 20:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Conflicting filters")
 
-    return filters
+    return tuple(filters.items())
+
+def parse_nlp_filter(query: str) -> dict:
+    """
+    Translate a natural language query into list filters.
+
+    Examples:
+        "single word palindromic strings" -> {"is_palindrome": True, "word_count": 1}
+        "strings between 5 and 10 characters" -> {"min_length": 5, "max_length": 10}
+        "strings with more than 2 words" -> {"min_word_count": 3}
+        "strings containing the letter z" -> {"contains_character": "z"}
+
+    Parsed filters are cached per normalized query.
+    """
+    if not query or not query.strip():
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Empty query")
+
+    normalized = " ".join(query.lower().split())
+    return dict(_parse(normalized))
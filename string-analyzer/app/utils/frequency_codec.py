@@ -0,0 +1,39 @@
+from array import array
+from typing import Dict
+import struct
+import sys
+
+# Layout: version (1 byte), count width (1 byte), entry count (uint32 LE),
+# counts (entry count x width, little-endian), then the characters as UTF-8.
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<BBI")
+_TYPECODES = {1: "B", 2: "H", 4: "I"}
+
+def encode_frequency_map(frequency_map: Dict[str, int]) -> bytes:
+    """
+    Pack a character frequency map into a compact binary form.
+
+    Counts use the narrowest unsigned width that fits the largest one, and
+    the characters are stored as one UTF-8 string, so an ASCII map costs
+    about two bytes per entry. Key order is preserved.
+    """
+    largest = max(frequency_map.values(), default=0)
+    width = 1 if largest < 1 << 8 else 2 if largest < 1 << 16 else 4
+    counts = array(_TYPECODES[width], frequency_map.values())
+    if sys.byteorder != "little":
+        counts.byteswap()
+    characters = "".join(frequency_map).encode("utf-8", "surrogatepass")
+    return _HEADER.pack(FORMAT_VERSION, width, len(frequency_map)) + counts.tobytes() + characters
+
+def decode_frequency_map(data: bytes) -> Dict[str, int]:
+    """Unpack a map produced by encode_frequency_map"""
+    version, width, entries = _HEADER.unpack_from(data)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported frequency map format version {version}")
+    counts_end = _HEADER.size + entries * width
+    counts = array(_TYPECODES[width])
+    counts.frombytes(data[_HEADER.size:counts_end])
+    if sys.byteorder != "little":
+        counts.byteswap()
+    characters = data[counts_end:].decode("utf-8", "surrogatepass")
+    return dict(zip(characters, counts))
@@ -0,0 +1,203 @@
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set
+from fastapi import HTTPException, status
+from app.db import run_db
+from app.models.database import add_strings_bulk
+from app.utils.metrics import Counter, Gauge, Histogram, registry
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Acknowledge POST /strings/ with 202 and write records in background batches
+WRITE_BEHIND = os.getenv("WRITE_BEHIND", "false").lower() in ("1", "true", "yes")
+
+# Records waiting to be written; producers wait for space when it is full
+WRITE_BEHIND_QUEUE_SIZE = int(os.getenv("WRITE_BEHIND_QUEUE_SIZE", "10000"))
+
+# A batch is written once it holds this many records...
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "500"))
+
+# ...or this many milliseconds after its first record arrived
+WRITE_BEHIND_FLUSH_MS = float(os.getenv("WRITE_BEHIND_FLUSH_MS", "50"))
+
+# Seconds a request waits for queue space before it is rejected with 503
+WRITE_BEHIND_ENQUEUE_TIMEOUT = float(os.getenv("WRITE_BEHIND_ENQUEUE_TIMEOUT", "5"))
+
+# Attempts per batch before its records are reported as failed
+WRITE_BEHIND_RETRIES = 3
+
+# Failed hashes remembered for status polling
+FAILED_HISTORY_SIZE = 10000
+
+_queue: Optional[asyncio.Queue] = None
+_worker: Optional[asyncio.Task] = None
+_closing = False
+
+# Hashes accepted but not yet written, and recent failures with their error
+_queued: Set[str] = set()
+_failed: "OrderedDict[str, str]" = OrderedDict()
+
+# Sentinel that tells the worker to exit once everything before it is written
+_STOP = object()
+
+records_total = registry.register(Counter(
+    "write_behind_records_total", "Records handled by the write-behind queue, by outcome", ("outcome",)
+))
+batch_size = registry.register(Histogram(
+    "write_behind_batch_size", "Records per write-behind batch", (),
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+))
+batch_duration = registry.register(Histogram(
+    "write_behind_batch_duration_seconds", "Time to write one write-behind batch"
+))
+registry.register(Gauge(
+    "write_behind_queue_depth", "Records waiting in the write-behind queue",
+    lambda: _queue.qsize() if _queue is not None else None
+))
+
+def start() -> None:
+    """Create the queue and start the background writer (call from the running event loop)"""
+    global _queue, _worker, _closing
+    if _worker is not None:
+        return
+    _closing = False
+    _queue = asyncio.Queue(maxsize=WRITE_BEHIND_QUEUE_SIZE)
+    _worker = asyncio.get_running_loop().create_task(_run())
+
+async def stop() -> None:
+    """Stop accepting records and wait until every queued record is written"""
+    global _queue, _worker, _closing
+    if _worker is None:
+        return
+    _closing = True
+    await _queue.put(_STOP)
+    await _worker
+    _queue = None
+    _worker = None
+
+async def enqueue(analysis: Dict[str, Any]) -> None:
+    """
+    Queue an analysis for the background writer
+
+    Strings whose hash is already queued are not queued twice.
+
+    Args:
+        analysis: Dictionary containing string analysis results and "text"
+
+    Raises:
+        HTTPException: 503 if the queue stays full for WRITE_BEHIND_ENQUEUE_TIMEOUT
+            seconds or the application is shutting down
+    """
+    hash_value = analysis["sha256_hash"]
+    if _queue is None or _closing:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Ingestion queue is not accepting records"
+        )
+    if hash_value in _queued:
+        return
+
+    # Mark it queued first so the worker never finishes it before it is tracked
+    _queued.add(hash_value)
+    _failed.pop(hash_value, None)
+    try:
+        await asyncio.wait_for(_queue.put(analysis), WRITE_BEHIND_ENQUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        _queued.discard(hash_value)
+        records_total.inc(outcome="rejected")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Ingestion queue is full, retry later",
+            headers={"Retry-After": "1"}
+        )
+
+def pending_status(hash_value: str) -> Optional[Dict[str, Any]]:
+    """
+    Status of a hash known to this process's queue
+
+    Returns:
+        Optional[Dict[str, Any]]: {"status": "queued"} or {"status": "failed",
+        "detail": ...}, or None if the hash is neither queued nor failed
+    """
+    if hash_value in _queued:
+        return {"status": "queued"}
+    if hash_value in _failed:
+        return {"status": "failed", "detail": _failed[hash_value]}
+    return None
+
+def stats() -> Dict[str, Any]:
+    """Queue depth, capacity and batching settings"""
+    return {
+        "enabled": WRITE_BEHIND,
+        "running": _worker is not None,
+        "queued": len(_queued),
+        "queue_depth": _queue.qsize() if _queue is not None else 0,
+        "queue_size": WRITE_BEHIND_QUEUE_SIZE,
+        "batch_size": WRITE_BEHIND_BATCH_SIZE,
+        "flush_ms": WRITE_BEHIND_FLUSH_MS,
+        "failed": len(_failed),
+    }
+
+async def _run() -> None:
+    """Collect batches by size or age and write each in one transaction"""
+    loop = asyncio.get_running_loop()
+    stopping = False
+    while not stopping:
+        item = await _queue.get()
+        if item is _STOP:
+            break
+        batch = [item]
+
+        # Fill the batch until it is full or WRITE_BEHIND_FLUSH_MS has passed
+        deadline = loop.time() + WRITE_BEHIND_FLUSH_MS / 1000
+        while len(batch) < WRITE_BEHIND_BATCH_SIZE:
+            try:
+                item = _queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(_queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            if item is _STOP:
+                stopping = True
+                break
+            batch.append(item)
+
+        await _flush(batch)
+
+async def _flush(batch: List[Dict[str, Any]]) -> None:
+    """Write one batch, retrying transient failures, and update hash status"""
+    start = time.perf_counter()
+    error = None
+    for attempt in range(1, WRITE_BEHIND_RETRIES + 1):
+        try:
+            results = await run_db(add_strings_bulk, batch)
+            break
+        except Exception as e:
+            error = getattr(e, "detail", None) or str(e)
+            logger.warning("Write-behind batch of %d failed (attempt %d): %s", len(batch), attempt, error)
+            if attempt < WRITE_BEHIND_RETRIES:
+                await asyncio.sleep(0.5 * attempt)
+    else:
+        results = None
+
+    batch_duration.observe(time.perf_counter() - start)
+    batch_size.observe(len(batch))
+
+    for index, analysis in enumerate(batch):
+        hash_value = analysis["sha256_hash"]
+        _queued.discard(hash_value)
+        if results is None:
+            _failed[hash_value] = error
+            _failed.move_to_end(hash_value)
+            records_total.inc(outcome="failed")
+        else:
+            records_total.inc(outcome=results[index]["status"])
+    while len(_failed) > FAILED_HISTORY_SIZE:
+        _failed.popitem(last=False)
@@ -0,0 +1,85 @@
+from typing import Optional
+import cProfile
+import io
+import logging
+import os
+import pstats
+import random
+import re
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Fraction of requests to profile (0 disables profiling)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+
+# Profiled requests slower than this are dumped; faster ones are discarded
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "500"))
+
+# Where .prof files are written (open them with python -m pstats or snakeviz)
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "string-analyzer-profiles"))
+
+# Lines of the cumulative-time table logged for each slow request
+PROFILE_LOG_LINES = 15
+
+# Only one cProfile profiler can be active per process
+_profile_lock = threading.Lock()
+
+def start() -> Optional[cProfile.Profile]:
+    """
+    Start profiling the current request if it is sampled
+
+    The profiler covers the event loop thread only, so it also sees other
+    requests interleaved on the loop; database calls made in worker
+    threads appear as time spent waiting on them.
+
+    Returns:
+        Optional[cProfile.Profile]: Running profiler, or None if this
+        request is not sampled or another request is being profiled
+    """
+    if PROFILE_SAMPLE_RATE <= 0 or random.random() >= PROFILE_SAMPLE_RATE:
+        return None
+    if not _profile_lock.acquire(blocking=False):
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiling tool is already active
+        _profile_lock.release()
+        return None
+    return profiler
+
+def finish(profiler: Optional[cProfile.Profile], elapsed: float, label: str) -> Optional[str]:
+    """
+    Stop a profiler from start() and dump its stats if the request was slow
+
+    Args:
+        profiler: Profiler returned by start(), or None
+        elapsed: Request duration in seconds
+        label: Request description used in the file name, e.g. "GET /strings/"
+
+    Returns:
+        Optional[str]: Path of the written .prof file, if any
+    """
+    if profiler is None:
+        return None
+    try:
+        profiler.disable()
+    finally:
+        _profile_lock.release()
+
+    if elapsed * 1000 < PROFILE_SLOW_MS:
+        return None
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    name = re.sub(r"[^A-Za-z0-9]+", "_", label).strip("_")
+    path = os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%dT%H%M%S')}-{int(elapsed * 1000)}ms-{name}.prof")
+    profiler.dump_stats(path)
+
+    summary = io.StringIO()
+    pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(PROFILE_LOG_LINES)
+    logger.warning("Slow request %s took %.0f ms; profile written to %s\n%s", label, elapsed * 1000, path, summary.getvalue())
+    return path
@@ -0,0 +1,60 @@
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+from app.utils.metrics import stage
+from typing import Optional
+import json
+
+try:
+    import orjson
+except ImportError:  # optional dependency; the stdlib encoder is used instead
+    orjson = None
+
+def dumps(content) -> bytes:
+    """
+    Encode content as compact UTF-8 JSON
+
+    Uses orjson when it is installed and falls back to the standard
+    library for content orjson rejects (e.g. strings with lone surrogates,
+    which are written as \\u escapes since UTF-8 cannot encode them).
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(content)
+        except TypeError:
+            pass
+    try:
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+    except UnicodeEncodeError:
+        return json.dumps(content, allow_nan=False, separators=(",", ":")).encode("ascii")
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse encoded with orjson, timed as the serialize request stage
+
+    Routes that return one directly skip response_model validation, so it
+    is meant for content built from trusted database rows.
+    """
+
+    def render(self, content) -> bytes:
+        with stage("serialize"):
+            return dumps(content)
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Whether the request's If-None-Match header lists etag (or is "*")
+
+    Uses the weak comparison RFC 9110 prescribes for If-None-Match, so a
+    W/ prefix added by a proxy still matches.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or etag in (candidate.removeprefix("W/") for candidate in candidates)
+
+def not_modified(etag: str, cache_control: Optional[str] = None) -> Response:
+    """Empty 304 Not Modified response repeating the validator headers"""
+    headers = {"ETag": etag}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return Response(status_code=304, headers=headers)
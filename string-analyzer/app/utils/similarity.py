@@ -0,0 +1,73 @@
+from typing import List, Set, Tuple
+import random
+import struct
+import zlib
+
+try:
+    import numpy as np
+except ImportError:  # optional: signatures are computed in pure Python
+    np = None
+
+# Characters per shingle
+SHINGLE_SIZE = 3
+
+# MinHash signature length, split into LSH_BANDS bands of LSH_ROWS values.
+# Two strings share a band bucket with probability s**LSH_ROWS per band, so
+# pairs with Jaccard similarity s become candidates with probability
+# 1 - (1 - s**4)**16: about 0.98 at s=0.7, 0.64 at s=0.5 and 0.12 at s=0.3.
+SIGNATURE_SIZE = 64
+LSH_BANDS = 16
+LSH_ROWS = SIGNATURE_SIZE // LSH_BANDS
+
+# Universal hash family h(x) = (a * x + b) mod p over 32-bit shingle hashes.
+# a * x stays below 2**64, so the numpy path computes it exactly in uint64.
+_PRIME = 4294967291
+_rng = random.Random(20240601)
+_A = [_rng.randrange(1, _PRIME) for _ in range(SIGNATURE_SIZE)]
+_B = [_rng.randrange(0, _PRIME) for _ in range(SIGNATURE_SIZE)]
+if np is not None:
+    _A_ARRAY = np.array(_A, dtype=np.uint64)[:, None]
+    _B_ARRAY = np.array(_B, dtype=np.uint64)[:, None]
+    _PRIME_ARRAY = np.uint64(_PRIME)
+
+_BAND = struct.Struct(f"<B{LSH_ROWS}I")
+
+def shingles(text: str) -> Set[str]:
+    """Overlapping SHINGLE_SIZE-character substrings of the normalized text"""
+    normalized = " ".join(text.lower().split())
+    if len(normalized) <= SHINGLE_SIZE:
+        return {normalized}
+    return {normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+
+def jaccard(left: Set[str], right: Set[str]) -> float:
+    """Exact Jaccard similarity of two shingle sets"""
+    if not left and not right:
+        return 1.0
+    return len(left & right) / len(left | right)
+
+def minhash_signature(text: str) -> List[int]:
+    """
+    MinHash signature of the text's shingles
+
+    Each of the SIGNATURE_SIZE values is the minimum of one hash function
+    over all shingles; the fraction of equal values between two signatures
+    estimates the Jaccard similarity of the shingle sets.
+    """
+    hashes = [zlib.crc32(shingle.encode("utf-8", "surrogatepass")) for shingle in shingles(text)]
+    if np is not None:
+        values = np.array(hashes, dtype=np.uint64)[None, :]
+        return ((_A_ARRAY * values % _PRIME_ARRAY + _B_ARRAY) % _PRIME_ARRAY).min(axis=1).tolist()
+    return [min((a * x + b) % _PRIME for x in hashes) for a, b in zip(_A, _B)]
+
+def lsh_buckets(signature: List[int]) -> List[Tuple[int, int]]:
+    """
+    Locality-sensitive hash buckets of a signature
+
+    Returns:
+        List[Tuple[int, int]]: (band, bucket) per band; strings sharing any
+        bucket are candidate near-duplicates
+    """
+    return [
+        (band, zlib.crc32(_BAND.pack(band, *signature[band * LSH_ROWS:(band + 1) * LSH_ROWS])))
+        for band in range(LSH_BANDS)
+    ]
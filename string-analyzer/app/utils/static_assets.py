@@ -0,0 +1,167 @@
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+from typing import Any, Dict
+from anyio import to_thread
+from app.utils.responses import etag_matches, not_modified
+import asyncio
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip encodings are built
+    brotli = None
+
+# Content-hashed names never change content, so they can be cached for a year
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Plain names (and HTML pages) are revalidated with their ETag on every use
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# Hex digits of the content hash added to file names
+HASH_LENGTH = 12
+
+# Smaller files are only stored uncompressed
+COMPRESS_MIN_BYTES = 256
+
+# Media types worth compressing
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+# Encodings in order of preference, with the ETag suffix of each
+ENCODINGS = {"br": "-br", "gzip": "-gz"}
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles serving every file from memory, precompressed
+
+    load() (run in a worker thread by the first request, so compression
+    stays off the startup path) reads each file once and keeps it with its
+    gzip and, when the brotli package is installed, brotli encodings. Every file except HTML pages is also served under a
+    content-hashed name (css/styles.3f2a9c1b04d2.css) with an immutable
+    Cache-Control, and HTML pages reference assets by those names, so
+    browsers fetch a changed asset after a deploy and never revalidate an
+    unchanged one. Files added after load() fall back to StaticFiles.
+    """
+
+    def __init__(self, directory: str, url_prefix: str = "/static"):
+        super().__init__(directory=directory)
+        self.url_prefix = url_prefix
+        self.assets: Dict[str, Dict[str, Any]] = {}
+        self.hashed_names: Dict[str, str] = {}
+        self.loaded = False
+        self._load_lock = asyncio.Lock()
+
+    def load(self) -> None:
+        """Read, hash and compress every file under the directory"""
+        files = {}
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                full_path = os.path.join(root, name)
+                relative = os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+                with open(full_path, "rb") as handle:
+                    files[relative] = handle.read()
+
+        # Name every non-HTML file after its content first, so pages can refer to those names
+        hashed_names = {}
+        for relative, body in files.items():
+            if not relative.endswith(".html"):
+                stem, extension = os.path.splitext(relative)
+                hashed_names[relative] = f"{stem}.{hashlib.sha256(body).hexdigest()[:HASH_LENGTH]}{extension}"
+
+        assets = {}
+        for relative, body in files.items():
+            if relative.endswith(".html"):
+                body = self._rewrite_references(body, hashed_names)
+            asset = self._build_asset(relative, body)
+            assets[relative] = {**asset, "cache_control": REVALIDATE_CACHE_CONTROL}
+            if relative in hashed_names:
+                assets[hashed_names[relative]] = {**asset, "cache_control": IMMUTABLE_CACHE_CONTROL}
+
+        self.assets = assets
+        self.hashed_names = hashed_names
+        self.loaded = True
+
+    def _rewrite_references(self, html: bytes, hashed_names: Dict[str, str]) -> bytes:
+        """Point src/href attributes at the content-hashed asset names"""
+        prefix = re.escape(self.url_prefix.encode())
+
+        def replace(match: "re.Match[bytes]") -> bytes:
+            relative = match.group(2).decode()
+            if relative not in hashed_names:
+                return match.group(0)
+            return match.group(1) + f"{self.url_prefix}/{hashed_names[relative]}".encode()
+
+        return re.sub(rb'((?:src|href)=["\'])' + prefix + rb'/([^"\'?#]+)', replace, html)
+
+    def _build_asset(self, relative: str, body: bytes) -> Dict[str, Any]:
+        """Media type, ETag and stored encodings of one file"""
+        media_type = mimetypes.guess_type(relative)[0] or "application/octet-stream"
+        if media_type.startswith("text/") or media_type == "application/javascript":
+            media_type += "; charset=utf-8"
+
+        bodies = {"identity": body}
+        if len(body) >= COMPRESS_MIN_BYTES and media_type.startswith(COMPRESSIBLE_TYPES):
+            candidates = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                candidates["br"] = brotli.compress(body, quality=11)
+            bodies.update((encoding, data) for encoding, data in candidates.items() if len(data) < len(body))
+
+        return {
+            "media_type": media_type,
+            "etag": hashlib.sha256(body).hexdigest()[:32],
+            "bodies": bodies,
+        }
+
+    @staticmethod
+    def _accepted_encodings(accept_encoding: str) -> set:
+        """Codings the client accepts (q > 0) from an Accept-Encoding header"""
+        accepted = set()
+        for part in accept_encoding.split(","):
+            coding, _, params = part.strip().partition(";")
+            quality = params.strip()
+            if quality.startswith("q="):
+                try:
+                    if float(quality[2:]) <= 0:
+                        continue
+                except ValueError:
+                    continue
+            accepted.add(coding.strip().lower())
+        return accepted
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        """Serve a loaded asset, choosing its best encoding for the client"""
+        if not self.loaded:
+            # Concurrent first requests wait for a single load
+            async with self._load_lock:
+                if not self.loaded:
+                    await to_thread.run_sync(self.load)
+
+        asset = self.assets.get(path.replace(os.sep, "/"))
+        if asset is None:
+            return await super().get_response(path, scope)
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405)
+
+        accepted = self._accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        encoding = next(
+            (encoding for encoding in ENCODINGS if encoding in accepted and encoding in asset["bodies"]),
+            "identity"
+        )
+        etag = f'"{asset["etag"]}{ENCODINGS.get(encoding, "")}"'
+        headers = {"ETag": etag, "Cache-Control": asset["cache_control"], "Vary": "Accept-Encoding"}
+
+        if etag_matches(Request(scope), etag):
+            response = not_modified(etag, asset["cache_control"])
+            response.headers["Vary"] = "Accept-Encoding"
+            return response
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(asset["bodies"][encoding], media_type=asset["media_type"], headers=headers)
@@ -0,0 +1,26 @@
+"""
+Compare analyze_many with a loop over analyze_string on short strings.
+
+    python -m benchmarks.bench_analyze_many [count]
+"""
+import sys
+
+from benchmarks.common import Timer, make_corpus
+
+from app.utils import analyzer
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    texts = make_corpus(count, min_words=1, max_words=4)
+
+    with Timer() as loop:
+        expected = [analyzer.analyze_string(text) for text in texts]
+    with Timer() as batch:
+        results = analyzer.analyze_many(texts)
+    assert results == expected
+
+    backend = "numpy" if analyzer.np is not None else "pure-python fallback"
+    print(f"{count:,} short strings ({backend})")
+    print(f"analyze_string loop: {loop.elapsed * 1000:8.1f} ms")
+    print(f"analyze_many:        {batch.elapsed * 1000:8.1f} ms")
+    print(f"speedup: {loop.elapsed / batch.elapsed:.1f}x")
@@ -0,0 +1,77 @@
+"""
+Micro-benchmark analyze_string across input sizes and character sets.
+
+    python -m benchmarks.bench_analyzer [--json results.json] [--max-size N]
+
+Inputs are generated from a fixed seed, so runs on different commits
+analyze identical strings. Each case runs for at least MIN_CASE_SECONDS.
+"""
+import random
+import string
+import sys
+import time
+
+from benchmarks.common import percentiles, write_results
+
+from app.utils import analyzer
+
+SIZES = [16, 256, 4096, 65536, 1048576]
+
+# Alphabets for each character set; spaces give every set some words
+CHARSETS = {
+    "ascii_lower": string.ascii_lowercase + " ",
+    "ascii_mixed": string.ascii_letters + string.digits + string.punctuation + " ",
+    "latin_accents": "aàáâäãåæçeèéêëiìíîïnñoòóôöõøuùúûüyý ",
+    "cjk": "".join(chr(code) for code in range(0x4E00, 0x4E80)) + " ",
+    "emoji": "".join(chr(code) for code in range(0x1F600, 0x1F650)) + " ",
+}
+
+MIN_CASE_SECONDS = 0.2
+MIN_CASE_RUNS = 3
+
+
+def make_text(alphabet: str, size: int, seed: int = 42) -> str:
+    """Random text of size characters drawn from alphabet"""
+    rng = random.Random(seed)
+    return "".join(rng.choices(alphabet, k=size))
+
+
+def run_case(text: str):
+    """Time analyze_string on text repeatedly and return per-call latencies"""
+    latencies = []
+    deadline = time.perf_counter() + MIN_CASE_SECONDS
+    while len(latencies) < MIN_CASE_RUNS or time.perf_counter() < deadline:
+        start = time.perf_counter()
+        analyzer.analyze_string(text)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    json_path = args[args.index("--json") + 1] if "--json" in args else None
+    max_size = int(args[args.index("--max-size") + 1]) if "--max-size" in args else max(SIZES)
+
+    results = []
+    print(f"{'case':<24} {'runs':>6} {'p50 us':>12} {'p99 us':>12} {'MB/s':>8}")
+    for charset, alphabet in CHARSETS.items():
+        for size in (size for size in SIZES if size <= max_size):
+            text = make_text(alphabet, size)
+            latencies = run_case(text)
+            stats = percentiles(latencies, unit="us")
+            encoded_bytes = len(text.encode("utf-8"))
+            result = {
+                "name": f"{charset}/{size}",
+                "charset": charset,
+                "size": size,
+                "runs": len(latencies),
+                "ops_per_s": round(len(latencies) / sum(latencies), 1),
+                "mb_per_s": round(encoded_bytes * len(latencies) / sum(latencies) / 1_000_000, 2),
+                **stats,
+            }
+            results.append(result)
+            print(f"{result['name']:<24} {result['runs']:>6} {stats['p50_us']:>12,.1f} "
+                  f"{stats['p99_us']:>12,.1f} {result['mb_per_s']:>8.1f}")
+
+    if json_path:
+        write_results(json_path, "analyzer", {"sizes": SIZES, "max_size": max_size}, results)
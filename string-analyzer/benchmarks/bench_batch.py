@@ -0,0 +1,48 @@
+"""
+Compare single-record ingestion with the bulk ingestion path.
+
+    python -m benchmarks.bench_batch [count]
+"""
+import sys
+
+from benchmarks.common import Timer, make_corpus, use_temp_database
+
+use_temp_database()
+
+from app.models.database import add_string, add_strings_bulk, get_string_by_hash, init_db  # noqa: E402
+from app.utils import analyzer  # noqa: E402
+
+
+def ingest_single(values):
+    """Mirror of POST /strings: analyze, check hash, insert, one value at a time"""
+    for value in values:
+        analysis = analyzer.analyze_string(value)
+        if get_string_by_hash(analysis["sha256_hash"]):
+            continue
+        analysis["text"] = value
+        add_string(analysis)
+
+
+def ingest_batch(values):
+    """Mirror of POST /strings/batch"""
+    analyses = []
+    for value in values:
+        analysis = analyzer.analyze_string(value)
+        analysis["text"] = value
+        analyses.append(analysis)
+    add_strings_bulk(analyses)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    init_db()
+    corpus = make_corpus(2 * count)
+
+    with Timer() as single:
+        ingest_single(corpus[:count])
+    with Timer() as batch:
+        ingest_batch(corpus[count:])
+
+    print(f"single: {count} rows in {single.elapsed:.3f}s ({count / single.elapsed:,.0f} rows/s)")
+    print(f"batch:  {count} rows in {batch.elapsed:.3f}s ({count / batch.elapsed:,.0f} rows/s)")
+    print(f"speedup: {single.elapsed / batch.elapsed:.1f}x")
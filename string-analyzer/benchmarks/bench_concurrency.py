@@ -0,0 +1,64 @@
+"""
+Measure API throughput and latency as client concurrency rises.
+
+    python -m benchmarks.bench_concurrency [requests_per_level]
+
+Requires httpx (see requirements-dev.txt).
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+
+from benchmarks.common import make_corpus, use_temp_database
+
+use_temp_database()
+
+from app.main import app  # noqa: E402
+from app.models.database import init_db  # noqa: E402
+
+CONCURRENCY_LEVELS = [1, 2, 4, 8, 16, 32]
+
+
+async def run_level(client: httpx.AsyncClient, values, concurrency: int):
+    """Fire GET requests for the given values with a fixed number of in-flight requests"""
+    latencies = []
+    queue = asyncio.Queue()
+    for value in values:
+        queue.put_nowait(value)
+
+    async def worker():
+        while not queue.empty():
+            value = queue.get_nowait()
+            start = time.perf_counter()
+            response = await client.get(f"/api/v1/strings/{value}")
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return len(values) / elapsed, statistics.median(latencies), p99
+
+
+async def main(requests_per_level: int):
+    init_db()
+    corpus = make_corpus(500)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post("/api/v1/strings/batch", json=corpus)
+
+        print(f"{'concurrency':>11} {'req/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+        for concurrency in CONCURRENCY_LEVELS:
+            values = [corpus[i % len(corpus)] for i in range(requests_per_level)]
+            throughput, p50, p99 = await run_level(client, values, concurrency)
+            print(f"{concurrency:>11} {throughput:>10,.0f} {p50 * 1000:>8.2f} {p99 * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000))
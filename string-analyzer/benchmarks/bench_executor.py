@@ -0,0 +1,38 @@
+"""
+Measure batch analysis throughput as the number of worker processes grows.
+
+    python -m benchmarks.bench_executor [strings] [words_per_string]
+"""
+import asyncio
+import os
+import sys
+
+from benchmarks.common import Timer, make_corpus
+
+from app.utils import executor
+
+
+async def run(texts):
+    # Warm up the pool so process start-up is not timed
+    await executor.analyze_batch(texts[:executor.ANALYSIS_OFFLOAD_BATCH])
+    with Timer() as timer:
+        await executor.analyze_batch(texts)
+    return timer.elapsed
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    words = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    texts = make_corpus(count, min_words=words, max_words=words)
+    cores = os.cpu_count() or 1
+
+    baseline = None
+    print(f"{count:,} strings of {words} words on {cores} core(s)")
+    print(f"{'workers':>7} {'seconds':>8} {'strings/s':>10} {'speedup':>8}")
+    for workers in sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1))):
+        executor.shutdown_pool()
+        executor.ANALYSIS_WORKERS = workers
+        elapsed = asyncio.run(run(texts))
+        baseline = baseline or elapsed
+        print(f"{workers:>7} {elapsed:>8.2f} {count / elapsed:>10,.0f} {baseline / elapsed:>7.1f}x")
+    executor.shutdown_pool()
@@ -0,0 +1,51 @@
+"""
+Time every list filter combination against a large table, with and
+without the secondary indexes.
+
+    python -m benchmarks.bench_filters [rows]    (default 1,000,000)
+"""
+import sys
+
+from benchmarks.common import Timer, seed_database, use_temp_database
+
+use_temp_database()
+
+from app.db import engine  # noqa: E402
+from app.models.database import StringRecord, get_all_strings, init_db  # noqa: E402
+from app.models.explain import filter_matrix  # noqa: E402
+
+PAGE_SIZE = 100
+
+
+def run_matrix():
+    """Time the first page of every filter combination"""
+    timings = []
+    for filters in filter_matrix():
+        with Timer() as timer:
+            get_all_strings(filters, limit=PAGE_SIZE)
+        timings.append(timer.elapsed)
+    return timings
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    init_db()
+    indexes = [index for index in StringRecord.__table__.indexes if index.name != "ix_string_records_created_at_id"]
+
+    with Timer() as seeding:
+        seed_database(rows)
+    print(f"seeded {rows:,} rows in {seeding.elapsed:.1f}s")
+
+    with engine.begin() as connection:
+        for index in indexes:
+            index.drop(bind=connection)
+    unindexed = run_matrix()
+
+    with engine.begin() as connection:
+        for index in indexes:
+            index.create(bind=connection)
+    indexed = run_matrix()
+
+    print(f"{'filters':<70} {'no index ms':>12} {'indexed ms':>11}")
+    for filters, before, after in zip(filter_matrix(), unindexed, indexed):
+        print(f"{str(filters or '(none)'):<70} {before * 1000:>12.1f} {after * 1000:>11.1f}")
@@ -0,0 +1,89 @@
+"""
+Measure list and get endpoint throughput for large responses.
+
+    python -m benchmarks.bench_list [rows] [--json results.json]
+
+Seeds rows strings (default 10,000), then times a 1,000-row page
+(limit=1000), the full table as an NDJSON stream (stream=true), and
+single-string lookups. Compare commits with --json and benchmarks.compare.
+
+Requires httpx (see requirements-dev.txt).
+"""
+import asyncio
+import sys
+import time
+from urllib.parse import quote
+
+import httpx
+
+from benchmarks.common import make_corpus, percentiles, seed_database, use_temp_database, write_results
+
+use_temp_database()
+
+from app.main import app  # noqa: E402
+from app.models.database import init_db  # noqa: E402
+
+API = "/api/v1/strings"
+MIN_CASE_SECONDS = 3.0
+GET_REQUESTS = 2000
+
+
+async def time_requests(client: httpx.AsyncClient, paths, rows_per_request: int):
+    """Request each path in turn and return throughput and latency figures"""
+    latencies = []
+    for path in paths:
+        start = time.perf_counter()
+        response = await client.get(path)
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.text
+    elapsed = sum(latencies)
+    return {
+        "requests_per_s": round(len(latencies) / elapsed, 1),
+        "rows_per_s": round(len(latencies) * rows_per_request / elapsed, 1),
+        **percentiles(latencies),
+    }
+
+
+async def repeat_for(client: httpx.AsyncClient, path: str, rows_per_request: int):
+    """Repeat one request for at least MIN_CASE_SECONDS"""
+    await client.get(path)  # warm caches and the connection
+    paths = [path]
+    result = await time_requests(client, paths, rows_per_request)
+    count = max(3, int(MIN_CASE_SECONDS * result["requests_per_s"]))
+    return await time_requests(client, [path] * count, rows_per_request)
+
+
+async def main(rows: int, json_path: str = None):
+    init_db()
+    seed_database(rows)
+    page = min(rows, 1000)
+    values = make_corpus(min(rows, 10000), seed=0)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+        cases = [
+            (f"list_page_{page}", await repeat_for(client, f"{API}/?limit={page}", page)),
+            (f"list_stream_{rows}", await repeat_for(client, f"{API}/?stream=true", rows)),
+            ("get", await time_requests(
+                client, [f"{API}/{quote(values[i % len(values)])}" for i in range(GET_REQUESTS)], 1
+            )),
+        ]
+
+    results = [{"name": name, **result} for name, result in cases]
+    print(f"{'case':<20} {'req/s':>10} {'rows/s':>12} {'p50 ms':>9} {'p99 ms':>9}")
+    for result in results:
+        print(f"{result['name']:<20} {result['requests_per_s']:>10,.1f} {result['rows_per_s']:>12,.0f} "
+              f"{result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f}")
+
+    if json_path:
+        write_results(json_path, "list", {"rows": rows}, results)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    json_path = None
+    if "--json" in args:
+        position = args.index("--json")
+        json_path = args[position + 1]
+        del args[position:position + 2]
+    asyncio.run(main(int(args[0]) if args else 10000, json_path))
@@ -0,0 +1,151 @@
+"""
+Measure worker cold start: import, startup and first request.
+
+    python -m benchmarks.bench_startup [runs] [--profile] [--json results.json]
+
+Each run starts a fresh interpreter that imports app.main, runs the
+application's startup handlers through the ASGI lifespan protocol and
+serves one GET /api/v1/strings/ request in process. The database (a
+seeded temporary SQLite file) is migrated beforehand, the way a deploy
+runs python -m app.models.migrations before starting workers.
+
+"ready" is the wall time from spawning the process to the first response,
+including interpreter startup. --profile also prints the application
+modules and top-level packages with the largest cumulative import time,
+from python -X importtime.
+"""
+import asyncio
+import json
+import subprocess
+import sys
+import time
+
+from benchmarks.common import percentiles, write_results
+
+# Phases reported by every child process, in order
+PHASES = ("import", "startup", "first_request", "ready")
+
+# Modules listed by --profile
+PROFILE_TOP = 25
+
+
+async def boot() -> dict:
+    """Child process: import the app, run its lifespan startup and serve one request"""
+    start = time.perf_counter()
+    from app.main import app
+    imported = time.perf_counter()
+
+    import httpx
+
+    messages: asyncio.Queue = asyncio.Queue()
+    started = asyncio.Event()
+    failure = []
+
+    async def receive():
+        return await messages.get()
+
+    async def send(message):
+        if message["type"] == "lifespan.startup.failed":
+            failure.append(message.get("message", ""))
+        if message["type"].startswith("lifespan.startup."):
+            started.set()
+
+    await messages.put({"type": "lifespan.startup"})
+    lifespan = asyncio.create_task(app({"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}, receive, send))
+    await started.wait()
+    if failure:
+        raise RuntimeError(f"startup failed: {failure[0]}")
+    ready = time.perf_counter()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        response = await client.get("/api/v1/strings/", params={"limit": 10})
+    assert response.status_code == 200, response.text
+    served = time.perf_counter()
+    served_at = time.time()
+
+    await messages.put({"type": "lifespan.shutdown"})
+    await lifespan
+    return {
+        "import": imported - start,
+        "startup": ready - imported,
+        "first_request": served - ready,
+        "served_at": served_at,
+    }
+
+
+def run_once() -> dict:
+    """Spawn one child process and return its phase timings in seconds"""
+    spawned_at = time.time()
+    completed = subprocess.run(
+        [sys.executable, "-W", "ignore", "-m", "benchmarks.bench_startup", "--child"],
+        capture_output=True, text=True, check=True
+    )
+    timings = json.loads(completed.stdout.strip().splitlines()[-1])
+    timings["ready"] = timings.pop("served_at") - spawned_at
+    return timings
+
+
+def import_profile() -> None:
+    """Print the app modules and top-level packages with the largest cumulative import time"""
+    completed = subprocess.run(
+        [sys.executable, "-W", "ignore", "-X", "importtime", "-c", "import app.main"],
+        capture_output=True, text=True, check=True
+    )
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        if name.startswith("app.") or "." not in name:
+            entries.append((int(cumulative), int(own), name))
+
+    print(f"{'module':<48} {'cumulative ms':>14} {'self ms':>9}")
+    for cumulative, own, name in sorted(entries, reverse=True)[:PROFILE_TOP]:
+        print(f"{name:<48} {cumulative / 1000:>14.1f} {own / 1000:>9.1f}")
+    print()
+
+
+def main(runs: int, profile: bool = False, json_path: str = None):
+    from benchmarks.common import seed_database, use_temp_database
+    use_temp_database()
+
+    # Migrate and seed once; children inherit DATABASE_URL
+    from app.models.migrations import run_migrations
+    run_migrations()
+    seed_database(1000)
+
+    if profile:
+        import_profile()
+
+    samples = {phase: [] for phase in PHASES}
+    run_once()  # warm the filesystem cache and bytecode
+    for _ in range(runs):
+        timings = run_once()
+        for phase in PHASES:
+            samples[phase].append(timings[phase])
+
+    results = [{"name": phase, "runs": runs, **percentiles(samples[phase])} for phase in PHASES]
+    print(f"{'phase':<16} {'p50 ms':>9} {'mean ms':>9} {'max ms':>9}")
+    for entry in results:
+        print(f"{entry['name']:<16} {entry['p50_ms']:>9.1f} {entry['mean_ms']:>9.1f} {entry['max_ms']:>9.1f}")
+
+    if json_path:
+        write_results(json_path, "startup", {"runs": runs}, results)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if "--child" in args:
+        print(json.dumps(asyncio.run(boot())))
+        sys.exit()
+
+    json_path = None
+    if "--json" in args:
+        position = args.index("--json")
+        json_path = args[position + 1]
+        del args[position:position + 2]
+    profile = "--profile" in args
+    if profile:
+        args.remove("--profile")
+    main(int(args[0]) if args else 10, profile, json_path)
@@ -0,0 +1,104 @@
+"""
+Measure bulk export and import throughput.
+
+    python -m benchmarks.bench_transfer [rows] [--json results.json]
+
+Seeds rows strings (default 100,000; pass 1000000 for the 1M-row
+figures, which takes several minutes to seed), exports them as CSV,
+Parquet and Arrow, then empties the database and imports each file back.
+"import_csv_values" imports a CSV holding only the value column, so every
+row is analyzed again; compare it with "import_csv" to see what trusting
+verified metrics saves.
+
+Parquet and Arrow cases need pyarrow; they are skipped without it.
+"""
+import csv
+import os
+import sys
+import tempfile
+
+from benchmarks.common import Timer, seed_database, use_temp_database, write_results
+
+use_temp_database()
+
+from sqlalchemy import delete  # noqa: E402
+
+from app.db import engines  # noqa: E402
+from app.models import search, transfer  # noqa: E402
+from app.models.database import (  # noqa: E402
+    StringCharacter, StringRecord, StringSimilarityBucket, StringStat, init_db
+)
+
+
+def clear_database() -> None:
+    """Delete every record, index row and counter"""
+    for shard_engine in engines:
+        with shard_engine.begin() as connection:
+            for model in (StringCharacter, StringSimilarityBucket, StringStat, StringRecord):
+                connection.execute(delete(model))
+            search.clear_index(connection)
+
+
+def write_values_csv(source: str, target: str) -> None:
+    """Copy only the value column of an exported CSV"""
+    with open(source, newline="", encoding="utf-8") as reader_handle, \
+            open(target, "w", newline="", encoding="utf-8") as writer_handle:
+        writer = csv.writer(writer_handle, lineterminator="\n")
+        writer.writerow(["value"])
+        for row in csv.DictReader(reader_handle):
+            writer.writerow([row["value"]])
+
+
+def result(name: str, rows: int, seconds: float, path: str) -> dict:
+    """Throughput entry for one export or import"""
+    return {
+        "name": name,
+        "rows": rows,
+        "seconds": round(seconds, 3),
+        "rows_per_s": round(rows / seconds, 1),
+        "file_mb": round(os.path.getsize(path) / 1_000_000, 2),
+    }
+
+
+def main(rows: int, json_path: str = None):
+    init_db()
+    print(f"seeding {rows:,} rows...")
+    seed_database(rows)
+
+    formats = ["csv"] + (["parquet", "arrow"] if transfer.PYARROW_AVAILABLE else [])
+    directory = tempfile.mkdtemp(prefix="string-analyzer-transfer-")
+    paths = {file_format: os.path.join(directory, f"strings.{file_format}") for file_format in formats}
+
+    results = []
+    for file_format, path in paths.items():
+        with Timer() as timer:
+            count = transfer.export_file(path, file_format)
+        results.append(result(f"export_{file_format}", count, timer.elapsed, path))
+
+    paths["csv_values"] = os.path.join(directory, "values.csv")
+    write_values_csv(paths["csv"], paths["csv_values"])
+
+    for name, path in paths.items():
+        clear_database()
+        file_format = "csv" if name == "csv_values" else name
+        with open(path, "rb") as handle, Timer() as timer:
+            summary = transfer.import_file(handle, file_format)
+        assert summary["created"] == rows, summary
+        results.append(result(f"import_{name}", rows, timer.elapsed, path))
+
+    print(f"{'case':<20} {'rows/s':>12} {'seconds':>9} {'file MB':>9}")
+    for entry in results:
+        print(f"{entry['name']:<20} {entry['rows_per_s']:>12,.0f} {entry['seconds']:>9.2f} {entry['file_mb']:>9.2f}")
+
+    if json_path:
+        write_results(json_path, "transfer", {"rows": rows}, results)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    json_path = None
+    if "--json" in args:
+        position = args.index("--json")
+        json_path = args[position + 1]
+        del args[position:position + 2]
+    main(int(args[0]) if args else 100000, json_path)
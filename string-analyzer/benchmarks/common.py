@@ -0,0 +1,124 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Run benchmarks from the string-analyzer directory, e.g.:
+    python -m benchmarks.bench_batch
+
+Scripts that take --json write their results with write_results; compare
+two such files (e.g. from two commits) with python -m benchmarks.compare.
+"""
+import datetime
+import json
+import os
+import platform
+import random
+import string
+import subprocess
+import tempfile
+import time
+from typing import Any, Dict, List, Sequence
+
+
+def use_temp_database() -> str:
+    """
+    Point DATABASE_URL at a fresh SQLite file.
+    Must be called before anything under app is imported.
+    """
+    path = os.path.join(tempfile.mkdtemp(prefix="string-analyzer-bench-"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    return path
+
+
+def make_corpus(count: int, min_words: int = 1, max_words: int = 8, seed: int = 42) -> List[str]:
+    """Generate unique pseudo-random strings made of short lowercase words"""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(count):
+        words = [
+            "".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 9)))
+            for _ in range(rng.randint(min_words, max_words))
+        ]
+        # Suffix keeps every value unique
+        corpus.append(" ".join(words) + f" {i}")
+    return corpus
+
+
+class Timer:
+    """Context manager measuring wall-clock time in seconds"""
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+
+
+def percentiles(latencies: Sequence[float], unit: str = "ms") -> Dict[str, float]:
+    """Mean, p50, p90, p99 and max of latencies in seconds, converted to ms or us"""
+    scale = 1000 if unit == "ms" else 1_000_000
+    ordered = sorted(latencies)
+    if not ordered:
+        return {}
+
+    def pick(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+    return {
+        f"mean_{unit}": round(sum(ordered) / len(ordered) * scale, 3),
+        f"p50_{unit}": round(pick(0.50) * scale, 3),
+        f"p90_{unit}": round(pick(0.90) * scale, 3),
+        f"p99_{unit}": round(pick(0.99) * scale, 3),
+        f"max_{unit}": round(ordered[-1] * scale, 3),
+    }
+
+
+def environment() -> Dict[str, Any]:
+    """Commit, interpreter and machine details recorded alongside results"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "database": os.environ.get("DATABASE_URL", "").split("://")[0] or None,
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def write_results(path: str, benchmark: str, parameters: Dict[str, Any], results: List[Dict[str, Any]]) -> None:
+    """
+    Write benchmark results as JSON.
+
+    Every entry in results needs a unique "name"; benchmarks.compare
+    matches entries by name and compares their numeric fields.
+    """
+    with open(path, "w") as handle:
+        json.dump({
+            "benchmark": benchmark,
+            "environment": environment(),
+            "parameters": parameters,
+            "results": results,
+        }, handle, indent=2)
+    print(f"wrote {path}")
+
+
+def seed_database(rows: int, chunk_size: int = 10000) -> None:
+    """
+    Insert rows synthetic strings straight through add_strings_bulk.
+    Call use_temp_database first; imports the app lazily for that reason.
+    """
+    from app.models.database import add_strings_bulk
+    from app.utils import analyzer
+
+    for start in range(0, rows, chunk_size):
+        values = make_corpus(min(chunk_size, rows - start), seed=start)
+        analyses = analyzer.analyze_many(values)
+        for value, analysis in zip(values, analyses):
+            analysis["text"] = value
+        add_strings_bulk(analyses)
@@ -0,0 +1,65 @@
+"""
+Compare two benchmark result files written with --json.
+
+    python -m benchmarks.compare baseline.json candidate.json [--threshold 10]
+
+Entries are matched by name. For every shared numeric field the change is
+printed; fields ending in _per_s are better when higher, latency fields
+(_ms, _us) when lower. Exits non-zero when a p50 latency or throughput
+field regresses by more than --threshold percent.
+"""
+import json
+import sys
+
+# Fields checked against the threshold; max and p99 are too noisy to gate on
+GATED_SUFFIXES = ("_per_s", "p50_ms", "p50_us")
+
+SKIPPED_FIELDS = {"size", "runs", "requests"}
+
+
+def higher_is_better(field: str) -> bool:
+    return field.endswith("_per_s")
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> bool:
+    """Print per-field changes; return True when nothing regressed past threshold"""
+    print(f"baseline:  {baseline['environment'].get('commit')}  {baseline['environment'].get('timestamp')}")
+    print(f"candidate: {candidate['environment'].get('commit')}  {candidate['environment'].get('timestamp')}")
+    if baseline["parameters"] != candidate["parameters"]:
+        print(f"warning: parameters differ: {baseline['parameters']} vs {candidate['parameters']}")
+
+    before = {entry["name"]: entry for entry in baseline["results"]}
+    passed = True
+    print(f"{'name':<24} {'field':<16} {'baseline':>12} {'candidate':>12} {'change':>8}")
+    for entry in candidate["results"]:
+        old = before.get(entry["name"])
+        if old is None:
+            continue
+        for field, value in entry.items():
+            if field in SKIPPED_FIELDS or not isinstance(value, (int, float)) or not isinstance(old.get(field), (int, float)):
+                continue
+            if not old[field]:
+                continue
+            change = (value - old[field]) / old[field] * 100
+            worse = -change if higher_is_better(field) else change
+            flag = ""
+            if field.endswith(GATED_SUFFIXES) and worse > threshold:
+                flag = "  REGRESSION"
+                passed = False
+            print(f"{entry['name']:<24} {field:<16} {old[field]:>12,.2f} {value:>12,.2f} {change:>+7.1f}%{flag}")
+    return passed
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    threshold = 10.0
+    if "--threshold" in args:
+        position = args.index("--threshold")
+        threshold = float(args[position + 1])
+        del args[position:position + 2]
+    if len(args) != 2:
+        sys.exit(__doc__)
+
+    with open(args[0]) as baseline_file, open(args[1]) as candidate_file:
+        ok = compare(json.load(baseline_file), json.load(candidate_file), threshold)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,151 @@
+"""
+End-to-end load test of the HTTP API: create, get, list-with-filters, delete.
+
+    python -m benchmarks.load_api [--rows N] [--requests N] [--concurrency N]
+                                  [--url URL] [--json results.json]
+
+The database is first seeded with --rows synthetic strings (10,000 by
+default; 1,000,000 for a production-sized table). Without --url the app runs
+in-process on a temporary SQLite database, seeded directly; with --url the
+running server is seeded through POST /strings/batch. Each scenario then
+sends --requests requests with --concurrency in flight, and reports
+throughput and latency percentiles. Unexpected status codes are counted as
+errors. Created strings are deleted again by the delete scenario.
+
+Requires httpx (see requirements-dev.txt).
+"""
+import asyncio
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+from urllib.parse import quote
+
+import httpx
+
+from benchmarks.common import Timer, make_corpus, percentiles, seed_database, use_temp_database, write_results
+
+# Filter combinations exercised by the list scenario, in rotation
+LIST_QUERIES = [
+    {},
+    {"is_palindrome": "false"},
+    {"min_length": "20", "max_length": "40"},
+    {"word_count": "3"},
+    {"contains_character": "q"},
+    {"contains_all": "xz"},
+    {"min_char_count": "e:3"},
+]
+
+API = "/api/v1/strings"
+SEED_BATCH_SIZE = 5000
+
+# (method, path, json body or None, expected status)
+Request = Tuple[str, str, object, int]
+
+
+async def run_scenario(client: httpx.AsyncClient, requests: List[Request], concurrency: int) -> Dict:
+    """Send requests with a fixed number in flight; return throughput and latencies"""
+    latencies = []
+    errors = 0
+    queue = asyncio.Queue()
+    for request in requests:
+        queue.put_nowait(request)
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            method, path, body, expected = queue.get_nowait()
+            start = time.perf_counter()
+            response = await client.request(method, path, json=body)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != expected:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "requests": len(requests),
+        "errors": errors,
+        "requests_per_s": round(len(requests) / elapsed, 1),
+        **percentiles(latencies),
+    }
+
+
+async def seed_over_http(client: httpx.AsyncClient, rows: int) -> None:
+    """Seed a running server through the batch endpoint"""
+    for start in range(0, rows, SEED_BATCH_SIZE):
+        values = make_corpus(min(SEED_BATCH_SIZE, rows - start), seed=start)
+        response = await client.post(f"{API}/batch", json=values, timeout=300)
+        response.raise_for_status()
+
+
+def list_path(filters: Dict[str, str]) -> str:
+    """List endpoint path for one page of 100 with the given filters"""
+    return f"{API}/?" + "&".join(f"{key}={quote(value)}" for key, value in {**filters, "limit": "100"}.items())
+
+
+def build_scenarios(rows: int, count: int) -> List[Tuple[str, Callable[[], List[Request]]]]:
+    """Request lists for each scenario; seeded values are regenerated, not fetched"""
+    rng = random.Random(7)
+    created = [f"load test {value}" for value in make_corpus(count, seed=10_000_000)]
+
+    def seeded_sample() -> List[str]:
+        # Seeded rows come from make_corpus(chunk, seed=chunk_start); rebuild the first chunk
+        population = make_corpus(min(rows, SEED_BATCH_SIZE), seed=0)
+        return [rng.choice(population) for _ in range(count)]
+
+    return [
+        ("create", lambda: [("POST", f"{API}/", {"value": value}, 201) for value in created]),
+        ("get", lambda: [("GET", f"{API}/{quote(value)}", None, 200) for value in seeded_sample()]),
+        ("list", lambda: [("GET", list_path(LIST_QUERIES[i % len(LIST_QUERIES)]), None, 200) for i in range(count)]),
+        ("delete", lambda: [("DELETE", f"{API}/{quote(value)}", None, 204) for value in created]),
+    ]
+
+
+async def main(rows: int, count: int, concurrency: int, url: str = None, json_path: str = None) -> None:
+    if url:
+        client = httpx.AsyncClient(base_url=url, timeout=60)
+    else:
+        use_temp_database()
+        from app.main import app
+        from app.models.database import init_db
+        init_db()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load", timeout=60)
+
+    async with client:
+        with Timer() as seeding:
+            if url:
+                await seed_over_http(client, rows)
+            else:
+                seed_database(rows, chunk_size=SEED_BATCH_SIZE)
+        print(f"seeded {rows:,} rows in {seeding.elapsed:.1f}s")
+
+        results = []
+        print(f"{'scenario':<10} {'req/s':>10} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} {'errors':>7}")
+        for name, build in build_scenarios(rows, count):
+            result = {"name": name, **await run_scenario(client, build(), concurrency)}
+            results.append(result)
+            print(f"{name:<10} {result['requests_per_s']:>10,.0f} {result['p50_ms']:>8.2f} {result['p90_ms']:>8.2f} "
+                  f"{result['p99_ms']:>8.2f} {result['max_ms']:>8.2f} {result['errors']:>7}")
+
+    if json_path:
+        write_results(json_path, "load_api", {
+            "rows": rows, "requests": count, "concurrency": concurrency, "url": url
+        }, results)
+
+
+def _option(args: List[str], name: str, default):
+    return type(default)(args[args.index(name) + 1]) if name in args else default
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    asyncio.run(main(
+        rows=_option(args, "--rows", 10000),
+        count=_option(args, "--requests", 2000),
+        concurrency=_option(args, "--concurrency", 16),
+        url=_option(args, "--url", "") or None,
+        json_path=_option(args, "--json", "") or None,
+    ))
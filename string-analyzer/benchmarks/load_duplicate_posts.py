@@ -0,0 +1,69 @@
+"""
+Fire many identical POST /strings requests at once and check the outcome.
+
+    python -m benchmarks.load_duplicate_posts [rounds] [concurrency] [--url URL]
+
+Each round submits one fresh value `concurrency` times in parallel. Exactly
+one request must return 201 and every other one 409; any 5xx fails the run.
+Without --url the app runs in-process on a temporary SQLite database; pass
+--url http://host:port to load a running server (e.g. against PostgreSQL).
+
+Requires httpx (see requirements-dev.txt). Exits non-zero on failure.
+"""
+import asyncio
+import sys
+import time
+import uuid
+from collections import Counter
+
+import httpx
+
+from benchmarks.common import use_temp_database
+
+
+async def run_round(client: httpx.AsyncClient, concurrency: int) -> Counter:
+    """Post one new value concurrently and count the status codes"""
+    value = f"duplicate race {uuid.uuid4()}"
+    responses = await asyncio.gather(*(
+        client.post("/api/v1/strings/", json={"value": value}) for _ in range(concurrency)
+    ))
+    return Counter(response.status_code for response in responses)
+
+
+async def main(rounds: int, concurrency: int, url: str = None) -> bool:
+    if url:
+        client = httpx.AsyncClient(base_url=url, timeout=60)
+    else:
+        use_temp_database()
+        from app.main import app
+        from app.models.database import init_db
+        init_db()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load")
+
+    totals = Counter()
+    failed_rounds = 0
+    start = time.perf_counter()
+    async with client:
+        for _ in range(rounds):
+            statuses = await run_round(client, concurrency)
+            totals.update(statuses)
+            if statuses[201] != 1 or statuses[409] != concurrency - 1:
+                failed_rounds += 1
+    elapsed = time.perf_counter() - start
+
+    print(f"{rounds} rounds x {concurrency} concurrent POSTs in {elapsed:.2f}s")
+    print("status codes:", dict(sorted(totals.items())))
+    print("rounds without exactly one 201 and only 409s otherwise:", failed_rounds)
+    return failed_rounds == 0 and not any(code >= 500 for code in totals)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    url = None
+    if "--url" in args:
+        position = args.index("--url")
+        url = args[position + 1]
+        del args[position:position + 2]
+    rounds = int(args[0]) if len(args) > 0 else 50
+    concurrency = int(args[1]) if len(args) > 1 else 32
+    sys.exit(0 if asyncio.run(main(rounds, concurrency, url)) else 1)
@@ -0,0 +1,48 @@
+"""
+Shared test fixtures. Run from string-analyzer/:
+    python -m pytest
+
+The suite uses a fresh SQLite database, configured here before anything
+under app is imported.
+"""
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="string-analyzer-tests-"), "test.db")
+for name in ("DATABASE_SHARDS", "RECORD_CACHE_URL", "WRITE_BEHIND", "COMPACT_FREQUENCY_MAPS"):
+    os.environ.pop(name, None)
+
+import pytest  # noqa: E402
+from sqlalchemy import delete  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def migrated():
+    """Apply every migration to the test database once"""
+    from app.models.migrations import run_migrations
+    run_migrations()
+
+
+@pytest.fixture
+def empty_db(migrated):
+    """Delete every record, index row and counter before the test"""
+    from app.db import engines
+    from app.models import search
+    from app.models.database import StringCharacter, StringRecord, StringSimilarityBucket, StringStat, record_cache
+
+    for shard_engine in engines:
+        with shard_engine.begin() as connection:
+            for model in (StringCharacter, StringSimilarityBucket, StringStat, StringRecord):
+                connection.execute(delete(model))
+            search.clear_index(connection)
+    record_cache.clear()
+
+
+@pytest.fixture
+def client(empty_db):
+    """TestClient for the app, started against an empty database"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
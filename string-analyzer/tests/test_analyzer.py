@@ -0,0 +1,73 @@
+"""String analysis: the batch and streaming paths against analyze_string"""
+import random
+
+import pytest
+
+from app.utils import analyzer
+from app.utils.analyzer import analyze_many, analyze_stream, analyze_string
+
+# ASCII whitespace and punctuation, plus non-ASCII characters whose case
+# mapping changes length (İ, ß) or depends on context (Σ), combining marks,
+# astral characters and Unicode whitespace
+ASCII = "abcAB Z09 \t\n\x0b\x0c\r\x1c\x1f.,!'"
+# Capital sigmas between cased letters and case-ignorable characters
+SIGMA = "ΣΣΣΑα'.:́ʰ 1"
+NON_ASCII = "ΣσςİıßẞéÉ́😀　\u0085 ǅ"
+
+
+def random_text(rng: random.Random, alphabet: str) -> str:
+    """A random string, a palindrome about half the time"""
+    text = "".join(rng.choice(alphabet) for _ in range(rng.randrange(12)))
+    if rng.random() < 0.5:
+        text += text[::-1][rng.randrange(2):]
+    return text
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_analyze_many_matches_analyze_string(seed):
+    rng = random.Random(seed)
+    texts = [
+        random_text(rng, ASCII if rng.random() < 0.7 else ASCII + NON_ASCII)
+        for _ in range(rng.randrange(1, 300))
+    ]
+    results = analyze_many(texts)
+    assert len(results) == len(texts)
+    for text, result in zip(texts, results):
+        assert result == analyze_string(text), repr(text)
+
+
+def test_analyze_many_across_vector_blocks():
+    rng = random.Random(42)
+    texts = [random_text(rng, ASCII) for _ in range(2 * analyzer.VECTOR_BLOCK_SIZE + 7)]
+    assert analyze_many(texts) == [analyze_string(text) for text in texts]
+
+
+def test_analyze_many_empty():
+    assert analyze_many([]) == []
+    assert analyze_many([""]) == [analyze_string("")]
+
+
+def random_chunks(rng: random.Random, data):
+    """Split str or bytes at random positions"""
+    cuts = sorted(rng.randrange(len(data) + 1) for _ in range(rng.randrange(4)))
+    return [data[start:end] for start, end in zip([0] + cuts, cuts + [len(data)])]
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_analyze_stream_matches_analyze_string(seed):
+    rng = random.Random(seed)
+    text = random_text(rng, rng.choice([SIGMA, ASCII + NON_ASCII + SIGMA]))
+    expected = analyze_string(text)
+    assert analyze_stream(random_chunks(rng, text)) == expected, repr(text)
+    assert analyze_stream(random_chunks(rng, text.encode())) == expected, repr(text)
+
+
+@pytest.mark.parametrize("chunks", [
+    ["ΟΔΟΣ", "Α"],
+    ["ΟΔΟ", "Σ"],
+    ["ΟΔΟΣ", "'", "", "'Α"],
+    ["Α'", "Σ", "'", " "],
+    ["Σ", "Σ"],
+])
+def test_analyze_stream_final_sigma_across_chunks(chunks):
+    assert analyze_stream(chunks) == analyze_string("".join(chunks))
@@ -0,0 +1,111 @@
+"""
+Bulk inserts: the PostgreSQL COPY payload and the SQLite executemany path.
+
+The live PostgreSQL test runs only when TEST_POSTGRES_URL points at a
+scratch database through psycopg2, the driver COPY is used with
+(postgresql+psycopg2://...); its string_records table is created and emptied.
+"""
+import datetime
+import os
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, delete, select
+from sqlalchemy.orm import Session
+
+from app.models.database import (
+    BULK_INSERT_MIN_ROWS, StringRecord, _bulk_insert, _copy_text, frequency_columns, row_frequency_map
+)
+from app.utils.analyzer import analyze_string
+
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+UNESCAPES = {"\\": "\\", "t": "\t", "n": "\n", "r": "\r"}
+
+
+def parse_copy_field(field: str):
+    """Decode one COPY text-format field the way PostgreSQL does"""
+    if field == "\\N":
+        return None
+    decoded, position = [], 0
+    while position < len(field):
+        if field[position] == "\\":
+            decoded.append(UNESCAPES[field[position + 1]])
+            position += 2
+        else:
+            decoded.append(field[position])
+            position += 1
+    return "".join(decoded)
+
+
+def record_row(value: str, compact: bool = False) -> dict:
+    """string_records row for a value, as add_strings_bulk builds it"""
+    analysis = analyze_string(value)
+    return {
+        "id": str(uuid.uuid4()),
+        "value": value,
+        "length": analysis["length"],
+        "is_palindrome": analysis["is_palindrome"],
+        "unique_characters": analysis["unique_characters"],
+        "word_count": analysis["word_count"],
+        "sha256_hash": analysis["sha256_hash"],
+        "created_at": datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone.utc),
+        **frequency_columns(analysis["character_frequency_map"], compact=compact),
+    }
+
+
+def test_copy_text_writes_null_marker_and_escapes():
+    columns = list(StringRecord.__table__.c)
+    rows = [record_row("tab\there\nnew line \\ back"), record_row("Ünïcode", compact=True)]
+
+    lines = _copy_text(columns, rows).getvalue().split("\n")
+    assert lines[-1] == ""
+    first, second = ([parse_copy_field(field) for field in line.split("\t")] for line in lines[:-1])
+    names = [column.key for column in columns]
+    first, second = dict(zip(names, first)), dict(zip(names, second))
+
+    assert first["value"] == "tab\there\nnew line \\ back"
+    assert first["character_frequency_blob"] is None
+    assert first["is_palindrome"] == "f"
+    assert first["created_at"] == "2024-05-01T12:30:00+00:00"
+    assert second["value"] == "Ünïcode"
+    assert second["character_frequency_blob"] == "\\x" + rows[1]["character_frequency_blob"].hex()
+    assert second["character_frequency_map"] == "null"
+
+
+def test_sqlite_bulk_insert_keeps_nulls(empty_db):
+    from app.db import shard_sessions
+
+    rows = [record_row(f"bulk value {i}") for i in range(BULK_INSERT_MIN_ROWS)]
+    with shard_sessions[0]() as db:
+        _bulk_insert(db, StringRecord.__table__, rows)
+        db.commit()
+        stored = db.execute(select(StringRecord.__table__)).mappings().all()
+
+    assert len(stored) == BULK_INSERT_MIN_ROWS
+    assert all(row["character_frequency_blob"] is None for row in stored)
+    by_hash = {row["sha256_hash"]: row for row in rows}
+    assert all(row_frequency_map(row) == by_hash[row["sha256_hash"]]["character_frequency_map"] for row in stored)
+
+
+@pytest.mark.skipif(not POSTGRES_URL, reason="set TEST_POSTGRES_URL to a scratch PostgreSQL database")
+def test_postgres_copy_keeps_nulls():
+    engine = create_engine(POSTGRES_URL)
+    table = StringRecord.__table__
+    table.create(engine, checkfirst=True)
+    rows = [record_row(f"copy value {i}\twith tab") for i in range(BULK_INSERT_MIN_ROWS)]
+    rows.append(record_row("compact \\ value", compact=True))
+
+    with Session(engine) as db:
+        db.execute(delete(table))
+        _bulk_insert(db, table, rows)
+        db.commit()
+        stored = db.execute(select(table)).mappings().all()
+
+    assert len(stored) == len(rows)
+    by_hash = {row["sha256_hash"]: row for row in rows}
+    for row in stored:
+        expected = by_hash[row["sha256_hash"]]
+        assert row["value"] == expected["value"]
+        assert row["character_frequency_blob"] == expected["character_frequency_blob"]
+        assert row_frequency_map(row) == analyze_string(expected["value"])["character_frequency_map"]
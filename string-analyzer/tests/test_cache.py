@@ -0,0 +1,88 @@
+"""
+Record cache invalidation: a value read before a delete of its key is
+never cached, and deletes of other keys do not discard it.
+
+The Redis tests run only when TEST_REDIS_URL points at a scratch Redis
+server and the redis package is installed; they use their own key prefixes.
+"""
+import os
+import uuid
+
+import pytest
+
+from app.utils.cache import LRUCache, RedisCache
+
+REDIS_URL = os.getenv("TEST_REDIS_URL")
+
+
+@pytest.fixture
+def redis_cache():
+    redis = pytest.importorskip("redis")
+    run = uuid.uuid4().hex
+    return RedisCache(
+        redis.Redis.from_url(REDIS_URL), ttl=60,
+        prefix=f"test:{run}:record:", version_prefix=f"test:{run}:version:"
+    )
+
+
+def caches():
+    yield pytest.param(lambda: LRUCache(max_size=100, ttl=60), id="local")
+    yield pytest.param(
+        "redis_cache", id="redis",
+        marks=pytest.mark.skipif(not REDIS_URL, reason="set TEST_REDIS_URL to a scratch Redis server")
+    )
+
+
+@pytest.fixture(params=list(caches()))
+def cache(request):
+    if request.param == "redis_cache":
+        return request.getfixturevalue("redis_cache")
+    return request.param()
+
+
+def test_set_after_delete_of_the_key_is_ignored(cache):
+    version = cache.version("a")
+    cache.delete("a")
+    cache.set("a", {"value": "stale"}, version)
+    assert cache.get("a") is None
+
+    cache.set("a", {"value": "fresh"}, cache.version("a"))
+    assert cache.get("a") == {"value": "fresh"}
+
+
+def test_set_survives_deletes_of_other_keys(cache):
+    version = cache.version("a")
+    for i in range(50):
+        cache.delete(f"other {i}")
+    cache.set("a", {"value": "a"}, version)
+    assert cache.get("a") == {"value": "a"}
+
+
+def test_delete_removes_the_value(cache):
+    cache.set("a", {"value": "a"}, cache.version("a"))
+    cache.delete("a")
+    assert cache.get("a") is None
+
+
+def test_local_clear_invalidates_every_key():
+    cache = LRUCache(max_size=100, ttl=60)
+    version = cache.version("a")
+    cache.clear()
+    cache.set("a", {"value": "stale"}, version)
+    assert cache.get("a") is None
+
+
+def test_inserts_keep_cached_records(client):
+    from app.models.database import record_cache
+    from app.utils.analyzer import compute_sha256
+
+    assert client.post("/api/v1/strings/", json={"value": "cached"}).status_code == 201
+    assert client.get(f"/api/v1/strings/by-hash/{compute_sha256('cached')}").status_code == 200
+    assert record_cache.get(compute_sha256("cached")) is not None
+
+    for i in range(20):
+        assert client.post("/api/v1/strings/", json={"value": f"insert {i}"}).status_code == 201
+    assert record_cache.get(compute_sha256("cached")) is not None
+
+    assert client.delete("/api/v1/strings/cached").status_code == 204
+    assert record_cache.get(compute_sha256("cached")) is None
@@ -0,0 +1,46 @@
+"""Analysis offloading: when a batch leaves the event loop and how it is split"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from app.utils import executor
+from app.utils.analyzer import analyze_string
+
+
+def test_chunks_respect_count_and_size(monkeypatch):
+    monkeypatch.setattr(executor, "ANALYSIS_CHUNK_SIZE", 3)
+    monkeypatch.setattr(executor, "ANALYSIS_CHUNK_CHARS", 10)
+    texts = ["a"] * 4 + ["b" * 25, "c" * 6, "d" * 6, "e"]
+
+    chunks = list(executor._chunks(texts))
+    assert chunks == [["a"] * 3, ["a"], ["b" * 25], ["c" * 6], ["d" * 6, "e"]]
+    assert [text for chunk in chunks for text in chunk] == texts
+
+
+class RecordingPool(ThreadPoolExecutor):
+    """Stand-in for the process pool that records the chunks it is given"""
+
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.chunks = []
+
+    def submit(self, function, *args):
+        self.chunks.append(args[0])
+        return super().submit(function, *args)
+
+
+def test_few_large_strings_are_offloaded(monkeypatch):
+    pool = RecordingPool()
+    monkeypatch.setattr(executor, "get_pool", lambda: pool)
+    monkeypatch.setattr(executor, "ANALYSIS_WORKERS", 2)
+    monkeypatch.setattr(executor, "ANALYSIS_OFFLOAD_CHARS", 1000)
+    monkeypatch.setattr(executor, "ANALYSIS_CHUNK_CHARS", 1000)
+    texts = ["Σ racecar " * 60, "ab", "x" * 1500]
+
+    results = asyncio.run(executor.analyze_batch(texts))
+    pool.shutdown()
+    assert results == [analyze_string(text) for text in texts]
+    assert pool.chunks == [texts[:2], texts[2:]]
+
+    # Small batches stay inline
+    asyncio.run(executor.analyze_batch(["ab", "cd"]))
+    assert len(pool.chunks) == 2
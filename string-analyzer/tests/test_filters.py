@@ -0,0 +1,57 @@
+"""Natural language filter parsing"""
+import pytest
+from fastapi import HTTPException
+
+from app.utils.filters import parse_nlp_filter
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("single word palindromic strings", {"is_palindrome": True, "word_count": 1}),
+    ("strings that are not palindromes", {"is_palindrome": False}),
+    ("strings with exactly 3 words", {"word_count": 3}),
+    ("strings between 5 and 10 characters", {"min_length": 5, "max_length": 10}),
+    ("strings longer than 5", {"min_length": 6}),
+    ("strings longer than 5 characters", {"min_length": 6}),
+    ("strings shorter than ten letters", {"max_length": 9}),
+    ("strings of length 4", {"min_length": 4, "max_length": 4}),
+    ("strings containing the letter z", {"contains_character": "z"}),
+    ("strings containing the first vowel", {"contains_character": "a"}),
+    # Word comparisons are word-count ranges, not lengths
+    ("strings with more than 2 words", {"min_word_count": 3}),
+    ("strings with fewer than 3 words", {"max_word_count": 2}),
+    ("strings longer than 5 words", {"min_word_count": 6}),
+    ("strings with less than two words", {"max_word_count": 1}),
+    ("strings between 2 and 4 words", {"min_word_count": 2, "max_word_count": 4}),
+    ("palindromes with at least two words", {"is_palindrome": True, "min_word_count": 2}),
+    ("strings with at most 1 word", {"max_word_count": 1}),
+    ("strings shorter than 10 characters with more than one word", {"max_length": 9, "min_word_count": 2}),
+])
+def test_parse_nlp_filter(query, expected):
+    assert parse_nlp_filter(query) == expected
+
+
+@pytest.mark.parametrize("query, status_code", [
+    ("", 400),
+    ("show me something nice", 400),
+    ("strings shorter than 0 characters", 400),
+    ("strings with fewer than 0 words", 400),
+    ("strings longer than 10 and shorter than 5 characters", 422),
+    ("strings with more than 5 words and fewer than 3 words", 422),
+])
+def test_parse_nlp_filter_rejects(query, status_code):
+    with pytest.raises(HTTPException) as error:
+        parse_nlp_filter(query)
+    assert error.value.status_code == status_code
+
+
+def test_filter_by_word_count_range(client):
+    for value in ("one", "two words", "now three words", "and now four words"):
+        assert client.post("/api/v1/strings/", json={"value": value}).status_code == 201
+
+    response = client.get("/api/v1/strings/filter-by-natural-language", params={"query": "strings with more than 2 words"})
+    assert response.status_code == 200
+    assert response.json()["interpreted_query"]["parsed_filters"] == {"min_word_count": 3}
+    assert sorted(record["value"] for record in response.json()["results"]) == ["and now four words", "now three words"]
+
+    response = client.get("/api/v1/strings/filter-by-natural-language", params={"query": "fewer than 3 words"})
+    assert sorted(record["value"] for record in response.json()["results"]) == ["one", "two words"]
@@ -0,0 +1,29 @@
+"""JSON encoding of responses, with and without orjson"""
+import json
+
+import pytest
+
+from app.utils import responses
+
+CONTENT = {"value": "Ünïcode Σ", "counts": {"a": 1}, "ok": True}
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def encoder(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(responses, "orjson", None)
+    elif responses.orjson is None:
+        pytest.skip("orjson is not installed")
+
+
+def test_dumps_compact_utf8(encoder):
+    encoded = responses.dumps(CONTENT)
+    assert json.loads(encoded) == CONTENT
+    assert "Ünïcode Σ".encode() in encoded
+    assert b" " not in encoded.replace("Ünïcode Σ".encode(), b"")
+
+
+def test_dumps_escapes_lone_surrogates(encoder):
+    encoded = responses.dumps({"value": "a\ud800b"})
+    assert encoded == b'{"value":"a\\ud800b"}'
+    assert json.loads(encoded) == {"value": "a\ud800b"}
@@ -0,0 +1,85 @@
+"""String endpoints: keyset pagination, conditional GETs and stream analysis"""
+from app.utils.analyzer import analyze_string, compute_sha256
+
+VALUES = [f"value {i}" for i in range(25)]
+
+
+def create(client, *values):
+    for value in values:
+        assert client.post("/api/v1/strings/", json={"value": value}).status_code == 201
+
+
+def test_list_pages_through_every_record_once(client):
+    create(client, *VALUES)
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 10, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/v1/strings/", params=params).json()
+        seen.extend(record["value"] for record in page["results"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+        assert page["count"] == 10
+
+    assert pages == 3
+    assert sorted(seen) == sorted(VALUES)
+
+
+def test_list_rejects_a_bad_cursor(client):
+    assert client.get("/api/v1/strings/", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_list_etag_revalidates_until_a_write(client):
+    create(client, "first")
+    response = client.get("/api/v1/strings/", params={"min_length": 1})
+    etag = response.headers["etag"]
+
+    cached = client.get("/api/v1/strings/", params={"min_length": 1}, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert cached.content == b""
+
+    # Another query has another ETag
+    other = client.get("/api/v1/strings/", params={"min_length": 2}, headers={"If-None-Match": etag})
+    assert other.status_code == 200
+
+    create(client, "second")
+    fresh = client.get("/api/v1/strings/", params={"min_length": 1}, headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+    assert fresh.json()["count"] == 2
+
+
+def test_stats_etag(client):
+    create(client, "racecar")
+    etag = client.get("/api/v1/strings/stats").headers["etag"]
+    assert client.get("/api/v1/strings/stats", headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+
+    assert client.delete("/api/v1/strings/racecar").status_code == 204
+    assert client.get("/api/v1/strings/stats", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_record_etag_is_its_hash(client):
+    create(client, "Racecar")
+    response = client.get("/api/v1/strings/Racecar")
+    assert response.headers["etag"] == f'"{compute_sha256("Racecar")}"'
+
+    cached = client.get(
+        f"/api/v1/strings/by-hash/{compute_sha256('Racecar')}", headers={"If-None-Match": response.headers["etag"]}
+    )
+    assert cached.status_code == 304
+
+
+def test_analyze_stream_matches_stored_analysis(client):
+    text = "ΟΔΟΣ Σ'ΑΣ racecar " * 5000
+    body = text.encode()
+    chunks = [body[start:start + 4097] for start in range(0, len(body), 4097)]
+
+    response = client.post("/api/v1/strings/analyze-stream", content=iter(chunks))
+    assert response.status_code == 200
+    assert response.json() == analyze_string(text)
+
+    assert client.post("/api/v1/strings/analyze-stream", content=b"\xff").status_code == 400
+    assert client.post("/api/v1/strings/analyze-stream", content=b"").status_code == 400
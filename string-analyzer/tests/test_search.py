@@ -0,0 +1,31 @@
+"""Substring search through the portable trigram fallback"""
+import pytest
+
+
+@pytest.fixture
+def trigram_backend(client, monkeypatch):
+    """Switch the test database to the trigram table fallback"""
+    from app.db import engines
+    from app.models import search
+
+    search.search_metadata.create_all(engines[0])
+    monkeypatch.setattr(search, "_backend", "trigram")
+    yield
+    search.search_metadata.drop_all(engines[0])
+
+
+def search_values(client, query):
+    response = client.get("/api/v1/strings/", params={"q": query})
+    assert response.status_code == 200
+    return sorted(record["value"] for record in response.json()["results"])
+
+
+def test_trigram_search_folds_non_ascii_case(client, trigram_backend):
+    for value in ("ÜBER Straße", "über alles", "ΟΔΟΣ ΣΑΣ", "plain Text"):
+        assert client.post("/api/v1/strings/", json={"value": value}).status_code == 201
+
+    assert search_values(client, "über") == ["ÜBER Straße", "über alles"]
+    assert search_values(client, "ÜBER") == ["ÜBER Straße", "über alles"]
+    assert search_values(client, "οδος") == ["ΟΔΟΣ ΣΑΣ"]
+    assert search_values(client, '"ος σα"') == ["ΟΔΟΣ ΣΑΣ"]
+    assert search_values(client, "TEXT pl") == ["plain Text"]
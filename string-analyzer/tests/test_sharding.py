@@ -0,0 +1,22 @@
+"""Shard report on migrated and unmigrated shards"""
+import os
+
+from sqlalchemy import create_engine
+
+from app.db import engines
+from app.models import sharding
+
+
+def test_shard_report_lists_unmigrated_shards(client, monkeypatch, tmp_path):
+    assert client.post("/api/v1/strings/", json={"value": "sharded"}).status_code == 201
+    new_shard = create_engine("sqlite:///" + os.path.join(tmp_path, "new-shard.db"))
+    monkeypatch.setattr(sharding, "SHARD_COUNT", 2)
+    monkeypatch.setattr(sharding, "engines", [engines[0], new_shard])
+
+    assert sharding.shard_report() == [
+        {"shard": 0, "records": 1, "misplaced": 0, "migrations_pending": False},
+        {"shard": 1, "records": 0, "misplaced": 0, "migrations_pending": True},
+    ]
+    # Reporting does not migrate the new shard
+    with new_shard.connect() as connection:
+        assert not connection.dialect.has_table(connection, "string_records")
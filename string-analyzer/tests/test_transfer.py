@@ -0,0 +1,109 @@
+"""Bulk export and import through the API"""
+import csv
+import io
+import json
+from urllib.parse import quote
+
+import pytest
+
+from app.models import transfer
+from app.utils.analyzer import analyze_string, compute_sha256
+
+VALUES = ["racecar", "Hello, World", "tab\tand\nnewline", "Ünïcode Σας", "a b c d"]
+
+ARROW_FORMATS = ["parquet", "arrow"] if transfer.PYARROW_AVAILABLE else []
+
+
+def import_csv(client, rows):
+    """POST rows (dicts keyed by column) as a CSV import"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(rows[0]), lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(rows)
+    response = client.post("/api/v1/strings/import?format=csv", content=buffer.getvalue().encode())
+    assert response.status_code == 200, response.text
+    return response.json()["summary"]
+
+
+def forged_row(value, **metrics):
+    """CSV row for value with a matching hash and the given metrics"""
+    analysis = analyze_string(value)
+    row = {
+        "value": value,
+        "sha256_hash": compute_sha256(value),
+        "length": analysis["length"],
+        "is_palindrome": str(analysis["is_palindrome"]).lower(),
+        "unique_characters": analysis["unique_characters"],
+        "word_count": analysis["word_count"],
+        "character_frequency_map": json.dumps(analysis["character_frequency_map"]),
+    }
+    row.update(metrics)
+    return row
+
+
+@pytest.mark.parametrize("file_format", ["csv"] + ARROW_FORMATS)
+def test_export_import_round_trip(client, file_format):
+    for value in VALUES:
+        assert client.post("/api/v1/strings/", json={"value": value}).status_code == 201
+    before = client.get("/api/v1/strings/", params={"limit": 100}).json()["results"]
+    stats = client.get("/api/v1/strings/stats").json()
+
+    exported = client.get("/api/v1/strings/export", params={"format": file_format})
+    assert exported.status_code == 200
+    assert exported.headers["content-type"].startswith(transfer.MEDIA_TYPES[file_format].split(";")[0])
+
+    # Importing into the same database only finds duplicates
+    summary = client.post(f"/api/v1/strings/import?format={file_format}", content=exported.content).json()["summary"]
+    assert summary["duplicate"] == len(VALUES)
+
+    for value in VALUES:
+        assert client.delete(f"/api/v1/strings/{quote(value)}").status_code == 204
+    summary = client.post(f"/api/v1/strings/import?format={file_format}", content=exported.content).json()["summary"]
+    assert summary == {"created": len(VALUES), "duplicate": 0, "verified": len(VALUES), "reanalyzed": 0, "invalid": 0}
+
+    after = client.get("/api/v1/strings/", params={"limit": 100}).json()["results"]
+    assert sorted(after, key=lambda record: record["id"]) == sorted(before, key=lambda record: record["id"])
+    assert client.get("/api/v1/strings/stats").json() == stats
+
+
+def test_import_reanalyzes_inconsistent_metrics(client):
+    summary = import_csv(client, [
+        forged_row("forged length", length=-50),
+        forged_row("forged unique", unique_characters=99),
+        forged_row("forged map", character_frequency_map=json.dumps({"q": 1000})),
+        forged_row("forged sum", character_frequency_map=json.dumps({"f": 1})),
+        forged_row("forged bool", is_palindrome="maybe"),
+        forged_row("forged palindrome", is_palindrome="true"),
+        forged_row("Never odd or even", is_palindrome="false"),
+        forged_row("honest row"),
+    ])
+    assert summary == {"created": 8, "duplicate": 0, "verified": 1, "reanalyzed": 7, "invalid": 0}
+
+    for value in ("forged length", "forged unique", "forged map", "forged sum", "forged bool"):
+        record = client.get(f"/api/v1/strings/by-hash/{compute_sha256(value)}").json()
+        expected = analyze_string(value)
+        assert record["length"] == expected["length"]
+        assert record["unique_characters"] == expected["unique_characters"]
+        assert record["character_frequency_map"] == expected["character_frequency_map"]
+
+    palindromes = client.get("/api/v1/strings/", params={"is_palindrome": "true"}).json()["results"]
+    assert [record["value"] for record in palindromes] == ["Never odd or even"]
+    assert client.get(f"/api/v1/strings/by-hash/{compute_sha256('forged palindrome')}").json()["is_palindrome"] is False
+
+    stats = client.get("/api/v1/strings/stats").json()
+    assert stats["palindromes"] == 1
+    assert stats["total_characters"] == sum(len(value) for value in (
+        "forged length", "forged unique", "forged map", "forged sum", "forged bool",
+        "forged palindrome", "Never odd or even", "honest row"
+    ))
+
+
+def test_import_rejects_non_integer_counts(client):
+    # A string count used to fail the whole batch with a 500
+    summary = import_csv(client, [
+        forged_row("xx", character_frequency_map=json.dumps({"x": "2"})),
+        forged_row("yy", character_frequency_map=json.dumps({"y": True, "yy": 1})),
+    ])
+    assert summary["created"] == 2
+    assert summary["reanalyzed"] == 2
+    assert client.get(f"/api/v1/strings/by-hash/{compute_sha256('xx')}").json()["character_frequency_map"] == {"x": 2}